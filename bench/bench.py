@@ -0,0 +1,433 @@
+#!/usr/bin/env python
+"""
+Benchmarks for Plyvel.
+
+This measures the throughput and latency of the most important code
+paths (point reads and writes, write batches, iterators, raw iterators,
+prefixed databases, snapshots, and custom comparators) for various
+value sizes and key distributions.
+
+Results are printed as JSON lines (one object per benchmark), so that
+results from different runs can be stored and compared::
+
+    python bench/bench.py --output before.jsonl
+    python bench/bench.py --output after.jsonl
+    python bench/bench.py --compare before.jsonl after.jsonl
+
+Use --help for all options.
+"""
+
+from __future__ import print_function
+
+import argparse
+import fnmatch
+import itertools
+import json
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+import plyvel
+
+
+# Python 2 does not have a monotonic clock
+clock = getattr(time, 'perf_counter', time.time)
+
+
+#
+# Key distributions and data sets
+#
+
+def sequential_keys(n):
+    return [('{0:016d}'.format(i)).encode('ascii') for i in range(n)]
+
+
+def random_keys(n, rng):
+    keys = set()
+    while len(keys) < n:
+        keys.add(('{0:016x}'.format(rng.getrandbits(64))).encode('ascii'))
+    return list(keys)
+
+
+def prefixed_keys(n, rng, n_prefixes=16):
+    # Keys sharing a small number of prefixes, like multiple 'tables' in a
+    # single database.
+    return [
+        ('t{0:02d}-{1:016x}'.format(
+            i % n_prefixes, rng.getrandbits(64))).encode('ascii')
+        for i in range(n)]
+
+
+KEY_DISTRIBUTIONS = {
+    'sequential': lambda n, rng: sequential_keys(n),
+    'random': random_keys,
+    'prefixed': prefixed_keys,
+}
+
+
+def make_value(size, rng):
+    # Half random, half repeated data, so that values are compressible
+    # to some degree, like real data.
+    n_random = size // 2
+    random_part = bytes(bytearray(
+        rng.getrandbits(8) for _ in range(n_random)))
+    return random_part + b'x' * (size - n_random)
+
+
+class Dataset(object):
+    def __init__(self, n, value_size, distribution, seed, reverse=False):
+        rng = random.Random(seed)
+        self.n = n
+        self.value_size = value_size
+        self.distribution = distribution
+        self.keys = KEY_DISTRIBUTIONS[distribution](n, rng)
+        self.sorted_keys = sorted(self.keys, reverse=reverse)
+        self.value = make_value(value_size, rng)
+        self.read_order = list(self.keys)
+        rng.shuffle(self.read_order)
+
+
+class ReverseComparator(object):
+    """Python callback comparator (reverse bytewise order)."""
+
+    def __call__(self, a, b):
+        if a < b:
+            return 1
+        if a > b:
+            return -1
+        return 0
+
+
+#
+# Benchmarks
+#
+
+BENCHMARKS = []
+
+
+def benchmark(name, needs_data=True, bytewise_only=False):
+    def decorator(func):
+        BENCHMARKS.append((name, func, needs_data, bytewise_only))
+        return func
+    return decorator
+
+
+def fill(db, dataset):
+    value = dataset.value
+    with db.write_batch() as wb:
+        for key in dataset.keys:
+            wb.put(key, value)
+
+
+@benchmark('put', needs_data=False)
+def bench_put(db, dataset):
+    value = dataset.value
+    put = db.put
+    for key in dataset.keys:
+        put(key, value)
+    return dataset.n
+
+
+@benchmark('put_sync', needs_data=False)
+def bench_put_sync(db, dataset):
+    value = dataset.value
+    put = db.put
+    n = min(dataset.n, 1000)  # synchronous writes are slow
+    for key in dataset.keys[:n]:
+        put(key, value, sync=True)
+    return n
+
+
+@benchmark('write_batch', needs_data=False)
+def bench_write_batch(db, dataset):
+    value = dataset.value
+    keys = dataset.keys
+    for i in range(0, len(keys), 1000):
+        with db.write_batch() as wb:
+            for key in keys[i:i + 1000]:
+                wb.put(key, value)
+    return dataset.n
+
+
+@benchmark('get')
+def bench_get(db, dataset):
+    get = db.get
+    for key in dataset.read_order:
+        get(key)
+    return dataset.n
+
+
+@benchmark('get_missing')
+def bench_get_missing(db, dataset):
+    get = db.get
+    for key in dataset.read_order:
+        get(key + b'-missing')
+    return dataset.n
+
+
+@benchmark('snapshot_get')
+def bench_snapshot_get(db, dataset):
+    snapshot = db.snapshot()
+    get = snapshot.get
+    for key in dataset.read_order:
+        get(key)
+    snapshot.close()
+    return dataset.n
+
+
+@benchmark('prefixed_get')
+def bench_prefixed_get(db, dataset):
+    # All keys share the first byte of the first key.
+    prefix = dataset.keys[0][:1]
+    get = db.prefixed_db(prefix).get
+    n = 0
+    for key in dataset.read_order:
+        if key.startswith(prefix):
+            get(key[1:])
+            n += 1
+    return n
+
+
+@benchmark('iterate_forward')
+def bench_iterate_forward(db, dataset):
+    n = 0
+    for _ in db.iterator():
+        n += 1
+    return n
+
+
+@benchmark('iterate_reverse')
+def bench_iterate_reverse(db, dataset):
+    n = 0
+    for _ in db.iterator(reverse=True):
+        n += 1
+    return n
+
+
+@benchmark('iterate_keys')
+def bench_iterate_keys(db, dataset):
+    n = 0
+    for _ in db.iterator(include_value=False):
+        n += 1
+    return n
+
+
+@benchmark('iterate_range')
+def bench_iterate_range(db, dataset):
+    keys = dataset.sorted_keys
+    start, stop = keys[len(keys) // 4], keys[3 * len(keys) // 4]
+    n = 0
+    for _ in db.iterator(start=start, stop=stop):
+        n += 1
+    return n
+
+
+# Prefix iteration assumes the bytewise key order.
+@benchmark('iterate_prefixed_db', bytewise_only=True)
+def bench_iterate_prefixed_db(db, dataset):
+    prefix = dataset.keys[0][:1]
+    n = 0
+    for _ in db.prefixed_db(prefix):
+        n += 1
+    return n
+
+
+@benchmark('raw_iterator')
+def bench_raw_iterator(db, dataset):
+    it = db.raw_iterator()
+    it.seek_to_first()
+    n = 0
+    while it.valid():
+        it.key()
+        it.value()
+        it.next()
+        n += 1
+    it.close()
+    return n
+
+
+@benchmark('raw_iterator_seek')
+def bench_raw_iterator_seek(db, dataset):
+    it = db.raw_iterator()
+    seek = it.seek
+    for key in dataset.read_order:
+        seek(key)
+    it.close()
+    return dataset.n
+
+
+#
+# Running
+#
+
+def run_one(name, func, needs_data, dataset, args):
+    """Run a single benchmark, returning a result dict."""
+    timings = []
+    ops = None
+    for _ in range(args.repeat):
+        db_dir = tempfile.mkdtemp(prefix='plyvel-bench-', dir=args.tmp_dir)
+        try:
+            kwargs = dict(create_if_missing=True, error_if_exists=True)
+            if args.comparator:
+                kwargs.update(comparator=ReverseComparator(),
+                              comparator_name=b'bench-reverse')
+            db = plyvel.DB(db_dir, **kwargs)
+            if needs_data:
+                fill(db, dataset)
+            start = clock()
+            ops = func(db, dataset)
+            timings.append(clock() - start)
+            db.close()
+        finally:
+            shutil.rmtree(db_dir)
+
+    best = min(timings)
+    return {
+        'benchmark': name,
+        'distribution': dataset.distribution,
+        'value_size': dataset.value_size,
+        'comparator': 'python' if args.comparator else 'bytewise',
+        'n': ops,
+        'seconds': best,
+        'ops_per_second': ops / best if best > 0 else None,
+        'latency_us': best / ops * 1e6 if ops else None,
+        'repeat': args.repeat,
+    }
+
+
+def environment():
+    return {
+        'plyvel_version': plyvel.__version__,
+        'leveldb_version': plyvel.__leveldb_version__,
+        'python_version': platform.python_version(),
+        'python_implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+    }
+
+
+def run(args):
+    out = open(args.output, 'w') if args.output else sys.stdout
+    env = environment()
+    try:
+        combinations = itertools.product(
+            args.distributions, args.value_sizes)
+        for distribution, value_size in combinations:
+            dataset = Dataset(args.n, value_size, distribution, args.seed,
+                              reverse=args.comparator)
+            for name, func, needs_data, bytewise_only in BENCHMARKS:
+                if not any(fnmatch.fnmatch(name, pattern)
+                           for pattern in args.benchmarks):
+                    continue
+                if bytewise_only and args.comparator:
+                    continue
+                result = run_one(name, func, needs_data, dataset, args)
+                result.update(env)
+                print(json.dumps(result, sort_keys=True), file=out)
+                out.flush()
+                if args.output:
+                    print(format_result(result), file=sys.stderr)
+    finally:
+        if args.output:
+            out.close()
+
+
+def format_result(result):
+    return '{benchmark:<20} {distribution:<10} {value_size:>6}B ' \
+        '{comparator:<8} {ops_per_second:>12,.0f} ops/s ' \
+        '{latency_us:>9.2f} us/op'.format(**dict(
+            result,
+            ops_per_second=result['ops_per_second'] or 0,
+            latency_us=result['latency_us'] or 0))
+
+
+#
+# Comparing
+#
+
+def result_key(result):
+    return (result['benchmark'], result['distribution'],
+            result['value_size'], result['comparator'])
+
+
+def load_results(filename):
+    with open(filename) as fp:
+        return {result_key(r): r for r in map(json.loads, fp) if r}
+
+
+def compare(args):
+    old = load_results(args.compare[0])
+    new = load_results(args.compare[1])
+    exit_code = 0
+    for key in sorted(set(old) & set(new)):
+        old_ops = old[key]['ops_per_second']
+        new_ops = new[key]['ops_per_second']
+        change = (new_ops - old_ops) / old_ops * 100
+        flag = ''
+        if change < -args.threshold:
+            flag = '  REGRESSION'
+            exit_code = 1
+        print('{0:<20} {1:<10} {2:>6}B {3:<8} {4:>12,.0f} -> {5:>12,.0f} '
+              'ops/s ({6:+.1f}%){7}'.format(
+                  key[0], key[1], key[2], key[3], old_ops, new_ops, change,
+                  flag))
+    return exit_code
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument(
+        '-n', type=int, default=100000,
+        help="number of keys per data set (default: %(default)s)")
+    parser.add_argument(
+        '--value-sizes', type=int, nargs='+', default=[16, 100, 1000],
+        metavar='SIZE', help="value sizes in bytes (default: %(default)s)")
+    parser.add_argument(
+        '--distributions', nargs='+', default=sorted(KEY_DISTRIBUTIONS),
+        choices=sorted(KEY_DISTRIBUTIONS), metavar='DISTRIBUTION',
+        help="key distributions (default: %(default)s)")
+    parser.add_argument(
+        '--benchmarks', nargs='+', default=['*'], metavar='PATTERN',
+        help="only run benchmarks matching these glob patterns; "
+             "available: " + ', '.join(b[0] for b in BENCHMARKS))
+    parser.add_argument(
+        '--comparator', action='store_true',
+        help="use a Python callback comparator instead of the default one")
+    parser.add_argument(
+        '--repeat', type=int, default=3,
+        help="number of runs per benchmark; the best run is reported "
+             "(default: %(default)s)")
+    parser.add_argument(
+        '--seed', type=int, default=12345,
+        help="random seed (default: %(default)s)")
+    parser.add_argument(
+        '--tmp-dir', default=None,
+        help="directory for temporary databases")
+    parser.add_argument(
+        '--output', '-o', default=None,
+        help="write JSON lines to this file instead of standard output")
+    parser.add_argument(
+        '--compare', nargs=2, metavar=('OLD', 'NEW'), default=None,
+        help="compare two result files instead of running benchmarks")
+    parser.add_argument(
+        '--threshold', type=float, default=10.0,
+        help="throughput decrease (in percent) reported as a regression "
+             "when comparing (default: %(default)s)")
+    args = parser.parse_args()
+
+    if args.compare:
+        sys.exit(compare(args))
+
+    if args.tmp_dir is not None and not os.path.isdir(args.tmp_dir):
+        parser.error("--tmp-dir does not exist")
+    run(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -6,7 +6,11 @@ Plyvel, a fast and feature-rich Python interface to LevelDB.
 from ._plyvel import (  # noqa
     __leveldb_version__,
     DB,
+    Cache,
+    Env,
+    ProcessPoolScanner,
     repair_db,
+    bulk_load,
     destroy_db,
     Error,
     IOError,
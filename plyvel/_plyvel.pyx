@@ -16,32 +16,46 @@ Plyvel, a Python LevelDB interface.
 Use plyvel.DB() to create or open a database.
 """
 
+import array
+import binascii
+import collections
+import multiprocessing
+import re
 import sys
 import threading
-from weakref import ref as weakref_ref
+import time
+import weakref
+from multiprocessing.pool import ThreadPool
 
 cimport cython
 
-from cpython cimport bool
+from cpython cimport array, bool
 from cpython.buffer cimport (
     Py_buffer,
+    PyObject_CheckBuffer,
     PyObject_GetBuffer,
+    PyBuffer_FillInfo,
     PyBuffer_Release,
+    PyBUF_ANY_CONTIGUOUS,
+    PyBUF_FORMAT,
     PyBUF_SIMPLE,
 )
+from cpython.ref cimport PyObject, Py_INCREF, Py_XDECREF
 
-from libc.stdint cimport uint64_t
-from libc.stdlib cimport malloc, free
-from libc.string cimport const_char
+from libc.stdint cimport uint64_t, SIZE_MAX
+from libc.string cimport memcpy
+from libc.stdlib cimport calloc, malloc, free
+from libc.string cimport const_char, memset
 from libcpp.string cimport string
+from libcpp.vector cimport vector
 from libcpp cimport bool as c_bool
 
 cimport plyvel.leveldb as leveldb
 from plyvel.leveldb cimport (
     BytewiseComparator,
-    Cache,
     Comparator,
     DestroyDB,
+    Env_Default,
     NewBloomFilterPolicy,
     NewLRUCache,
     Options,
@@ -53,12 +67,22 @@ from plyvel.leveldb cimport (
     WriteOptions,
 )
 
-from plyvel.comparator cimport NewPlyvelCallbackComparator
+from plyvel.comparator cimport (
+    NewPlyvelCallbackComparator,
+    NewPlyvelNativeComparator,
+)
+from plyvel.env cimport PlyvelEnv
+from plyvel.table_reader cimport ReadTableKeyRange
+from plyvel.table_writer cimport PlyvelTableWriter
+from plyvel.write_batch cimport AppendWriteBatch
 
 
 __leveldb_version__ = '%d.%d' % (leveldb.kMajorVersion,
                                  leveldb.kMinorVersion)
 
+# Python 2 does not have a monotonic clock
+monotonic = getattr(time, 'monotonic', time.time)
+
 
 #
 # Errors and error handling
@@ -94,6 +118,137 @@ cdef int raise_for_status(Status st) except -1:
     raise Error(st.ToString())
 
 
+#
+# Statistics
+#
+
+cdef enum:
+    N_LATENCY_BUCKETS = 32
+    N_STATS_OPS = 6
+
+
+cdef enum StatsOp:
+    STATS_GET
+    STATS_GET_MANY
+    STATS_PUT
+    STATS_DELETE
+    STATS_WRITE
+    STATS_ITERATE
+
+
+stats_op_names = ['get', 'get_many', 'put', 'delete', 'write', 'iterate']
+
+
+cdef struct OpStats:
+    uint64_t count
+    uint64_t bytes
+    uint64_t not_found
+    uint64_t calls
+    uint64_t total_latency_us
+    # Bucket i counts calls that took less than 2**i microseconds (but
+    # at least 2**(i - 1) microseconds).
+    uint64_t latency_us[N_LATENCY_BUCKETS]
+
+
+cdef struct DBStats:
+    OpStats ops[N_STATS_OPS]
+    # Cache miss proxies: memory usage when statistics were enabled or
+    # reset, to report how much was loaded into memory since then.
+    uint64_t memory_usage_base
+    uint64_t block_cache_usage_base
+
+
+cdef inline uint64_t stats_start(DB db) nogil:
+    # Statistics are only collected if enabled; otherwise this is the
+    # only cost. All updates happen while holding the GIL, and the stats
+    # pointer is checked again afterwards, since statistics may be
+    # disabled while the GIL was released.
+    if db._stats is NULL:
+        return 0
+    return Env_Default().NowMicros()
+
+
+cdef inline void stats_record(DB db, StatsOp op, uint64_t start,
+                              uint64_t count, uint64_t n_bytes,
+                              uint64_t not_found):
+    cdef OpStats* op_stats
+    cdef uint64_t elapsed
+    cdef int bucket = 0
+
+    if db._stats is NULL:
+        return
+
+    op_stats = &db._stats.ops[<int>op]
+    op_stats.count += count
+    op_stats.bytes += n_bytes
+    op_stats.not_found += not_found
+
+    if start == 0:
+        return
+
+    elapsed = Env_Default().NowMicros() - start
+    op_stats.calls += 1
+    op_stats.total_latency_us += elapsed
+    while elapsed > 0 and bucket < N_LATENCY_BUCKETS - 1:
+        elapsed >>= 1
+        bucket += 1
+    op_stats.latency_us[bucket] += 1
+
+
+cdef uint64_t memory_usage(DB db):
+    # Memory used by the memtables and the block cache
+    value = db.get_property(b'leveldb.approximate-memory-usage')
+    return int(value) if value is not None else 0
+
+
+cdef uint64_t block_cache_usage(DB db):
+    # Only known if the database has an explicitly configured cache
+    if db.options.block_cache is NULL:
+        return 0
+    return db.options.block_cache.TotalCharge()
+
+
+cdef void stats_reset(DB db):
+    memset(db._stats, 0, sizeof(DBStats))
+    db._stats.memory_usage_base = memory_usage(db)
+    db._stats.block_cache_usage_base = block_cache_usage(db)
+
+
+cdef dict stats_to_dict(DB db):
+    cdef DBStats* stats = db._stats
+    cdef OpStats* op_stats
+    cdef int i
+    cdef dict out = {}
+    for i in range(N_STATS_OPS):
+        op_stats = &stats.ops[i]
+        out[stats_op_names[i]] = {
+            'count': op_stats.count,
+            'bytes': op_stats.bytes,
+            'not_found': op_stats.not_found,
+            'not_found_ratio': (
+                <double>op_stats.not_found / op_stats.count
+                if op_stats.count else 0.0),
+            'calls': op_stats.calls,
+            'total_latency_us': op_stats.total_latency_us,
+            'latency_us': [op_stats.latency_us[j]
+                           for j in range(N_LATENCY_BUCKETS)],
+        }
+
+    # Growth of the block cache means that blocks were read from table
+    # files, i.e. that reads missed the cache.
+    current = memory_usage(db)
+    out['cache'] = {
+        'memory_usage': current,
+        'memory_usage_delta': current - stats.memory_usage_base,
+    }
+    if db.options.block_cache is not NULL:
+        current = block_cache_usage(db)
+        out['cache']['block_cache_usage'] = current
+        out['cache']['block_cache_usage_delta'] = (
+            current - stats.block_cache_usage_base)
+    return out
+
+
 #
 # Utilities
 #
@@ -102,17 +257,192 @@ cdef inline db_get(DB db, bytes key, object default, ReadOptions read_options):
     cdef string value
     cdef Status st
     cdef Slice key_slice = Slice(key, len(key))
+    cdef uint64_t start = stats_start(db)
 
     with nogil:
         st = db._db.Get(read_options, key_slice, &value)
 
     if st.IsNotFound():
+        stats_record(db, STATS_GET, start, 1, 0, 1)
         return default
     raise_for_status(st)
 
+    stats_record(db, STATS_GET, start, 1, value.size(), 0)
     return value
 
 
+cdef inline db_get_view(DB db, bytes key, object default,
+                        ReadOptions read_options):
+    cdef ValueBuffer buf = ValueBuffer.__new__(ValueBuffer)
+    cdef Status st
+    cdef Slice key_slice = Slice(key, len(key))
+    cdef uint64_t start = stats_start(db)
+
+    # Read directly into the string owned by the buffer object, so that
+    # the value is never copied into a Python object.
+    with nogil:
+        st = db._db.Get(read_options, key_slice, &buf.owned)
+
+    if st.IsNotFound():
+        stats_record(db, STATS_GET, start, 1, 0, 1)
+        return default
+    raise_for_status(st)
+
+    stats_record(db, STATS_GET, start, 1, buf.owned.size(), 0)
+
+    buf.data = buf.owned.data()
+    buf.size = buf.owned.size()
+    return memoryview(buf)
+
+
+cdef list db_get_many(DB db, object keys, bytes prefix, object default,
+                      ReadOptions read_options):
+    cdef list key_list = []
+    cdef vector[Slice] key_slices
+    cdef vector[string] values
+    cdef vector[Status] statuses
+    cdef leveldb.Snapshot* implicit_snapshot = NULL
+    cdef size_t i, n
+    cdef uint64_t start
+    cdef uint64_t n_bytes = 0
+    cdef uint64_t not_found = 0
+
+    # Keep references to all (prefixed) keys, so that the slices
+    # pointing into them remain valid while the GIL is released.
+    for key in keys:
+        if not isinstance(key, bytes):
+            raise TypeError("keys must be byte strings")
+        if prefix is not None:
+            key = prefix + key
+        key_list.append(key)
+        key_slices.push_back(Slice(<bytes>key, len(key)))
+
+    n = key_slices.size()
+    values.resize(n)
+    statuses.resize(n)
+    start = stats_start(db)
+
+    # All lookups run without the GIL, and against a single snapshot
+    # so that the results are consistent with each other.
+    with nogil:
+        if read_options.snapshot is NULL:
+            implicit_snapshot = <leveldb.Snapshot*>db._db.GetSnapshot()
+            read_options.snapshot = implicit_snapshot
+        for i in range(n):
+            statuses[i] = db._db.Get(read_options, key_slices[i], &values[i])
+        if implicit_snapshot is not NULL:
+            db._db.ReleaseSnapshot(implicit_snapshot)
+
+    cdef list out = []
+    for i in range(n):
+        if statuses[i].IsNotFound():
+            not_found += 1
+            out.append(default)
+            continue
+        raise_for_status(statuses[i])
+        n_bytes += values[i].size()
+        out.append(values[i])
+
+    stats_record(db, STATS_GET_MANY, start, n, n_bytes, not_found)
+    return out
+
+
+cdef db_delete_range(DB db, bytes db_prefix, start, stop, include_start,
+                     include_stop, prefix, bool sync, size_t max_batch_size,
+                     bool compact):
+    cdef WriteOptions write_options
+    write_options.sync = sync
+
+    if max_batch_size < 1:
+        raise ValueError("'max_batch_size' must be a positive integer")
+
+    cdef Iterator it = Iterator(
+        db=db, db_prefix=db_prefix, reverse=False, start=start, stop=stop,
+        include_start=include_start, include_stop=include_stop,
+        prefix=prefix, include_key=False, include_value=False,
+        verify_checksums=False, fill_cache=False, snapshot=None)
+    try:
+        count = it.delete_remaining(write_options, max_batch_size)
+    finally:
+        it.close()
+        # Batches may have been written even if an error occurred.
+        if db.value_cache is not None:
+            db.value_cache.clear()
+
+    if compact and count:
+        db.compact_range(start=it.start, stop=it.stop)
+    elif count and db.scheduler is not None:
+        db.scheduler.add_tombstone_range(it.start, it.stop)
+
+    return count
+
+
+cdef array.array make_uint64_array_template():
+    # Python 2 has no 'Q' typecode, but 'L' is 64 bits wide on most
+    # 64-bit platforms.
+    try:
+        return array.array('Q')
+    except ValueError:
+        template = array.array('L')
+        if template.itemsize != 8:
+            raise ImportError("No 64-bit array typecode available")
+        return template
+
+
+cdef array.array uint64_array_template = make_uint64_array_template()
+
+
+cdef array.array offsets_to_array(vector[uint64_t]& offsets):
+    cdef array.array out = array.clone(uint64_array_template,
+                                       offsets.size(), zero=False)
+    memcpy(out.data.as_voidptr, offsets.data(),
+           offsets.size() * sizeof(uint64_t))
+    return out
+
+
+cdef int get_offsets_buffer(object obj, Py_buffer* buf) except -1:
+    # Offsets must be native 64-bit integers, e.g. array.array('Q') (or
+    # 'L' on Python 2) or numpy.uint64 arrays.
+    if isinstance(obj, array.array) and not PyObject_CheckBuffer(obj):
+        # Python 2 arrays do not support the new buffer protocol, so
+        # wrap their memory directly.
+        if obj.itemsize != 8 or obj.typecode not in ('Q', 'q', 'L', 'l'):
+            raise TypeError("offsets must be an array of 64-bit integers")
+        address, length = obj.buffer_info()
+        PyBuffer_FillInfo(buf, obj, <void*><size_t>address, length * 8, 1,
+                          PyBUF_SIMPLE)
+        return 0
+    PyObject_GetBuffer(obj, buf, PyBUF_FORMAT | PyBUF_ANY_CONTIGUOUS)
+    fmt = buf.format if buf.format is not NULL else b'B'
+    if fmt[:1] in (b'@', b'='):
+        fmt = fmt[1:]
+    elif fmt[:1] == (b'<' if sys.byteorder == 'little' else b'>'):
+        fmt = fmt[1:]
+    if buf.itemsize != 8 or fmt not in (b'Q', b'q', b'L', b'l'):
+        PyBuffer_Release(buf)
+        raise TypeError("offsets must be an array of 64-bit integers")
+    return 0
+
+
+cdef int check_offsets(Py_buffer* offsets, Py_buffer* data,
+                       Py_ssize_t n_entries) except -1:
+    cdef const uint64_t* p = <const uint64_t*>offsets.buf
+    cdef Py_ssize_t i
+    if n_entries < 0:
+        raise ValueError("offsets must not be empty")
+    if offsets.len // 8 != n_entries + 1:
+        raise ValueError("offsets must have exactly one item more than the "
+                         "number of entries")
+    if p[0] != 0:
+        raise ValueError("offsets must start with 0")
+    for i in range(n_entries):
+        if p[i + 1] < p[i]:
+            raise ValueError("offsets must not decrease")
+    if p[n_entries] > <uint64_t>data.len:
+        raise ValueError("offsets exceed the size of the data")
+    return 0
+
+
 cdef bytes to_file_system_name(name):
     if isinstance(name, bytes):
         return name
@@ -150,13 +480,246 @@ cdef bytes bytes_increment(bytes s):
     return None
 
 
+cdef list split_key_range_by_count(DB db, bytes start, bytes stop, int n):
+    # Split the key range into (at most) n parts with about the same
+    # number of keys, and return the boundary keys, like
+    # split_key_range(). This counts the keys first, and then skips to
+    # each split key, without creating Python objects for the other keys.
+    cdef int i
+    cdef uint64_t count, position = 0, target
+    cdef list boundaries = [start]
+    cdef Slice key_slice
+    cdef RawIterator it
+
+    count = db.count(start=start, stop=stop)
+    it = db.raw_iterator()
+    try:
+        if start is None:
+            it.seek_to_first()
+        else:
+            it.seek(start)
+        for i in range(1, n):
+            target = count * i // n
+            if target == 0:
+                continue
+            with nogil:
+                while position < target and it._iter.Valid():
+                    it._iter.Next()
+                    position += 1
+            raise_for_status(it._iter.status())
+            if not it._iter.Valid():
+                break  # keys were deleted since counting
+            key_slice = it._iter.key()
+            key = key_slice.data()[:key_slice.size()]
+            if stop is not None and key >= stop:
+                break
+            if boundaries[-1] is None or key > boundaries[-1]:
+                boundaries.append(key)
+    finally:
+        it.close()
+
+    boundaries.append(stop)
+    return boundaries
+
+
+cdef list split_key_range(DB db, bytes start, bytes stop, int n):
+    # Split the key range into (at most) n parts of about the same size
+    # on disk, and return the boundary keys. The first and last
+    # boundaries are the original start and stop keys (which may be
+    # None). Candidate split keys are found by bisecting the key space
+    # (interpreting keys as big-endian numbers), using
+    # GetApproximateSizes() to measure the size of each candidate part.
+    # This only makes sense for the default bytewise comparator.
+    cdef int i
+    cdef list boundaries = [start]
+
+    if n <= 1 or db.options.comparator is not BytewiseComparator():
+        return [start, stop]
+
+    lo_key = start if start is not None else b''
+    hi_key = stop if stop is not None else b'\xff' * (len(lo_key) + 8)
+
+    # Use 8 bytes of resolution beyond the common prefix
+    width = 0
+    while (width < len(lo_key) and width < len(hi_key)
+           and lo_key[width] == hi_key[width]):
+        width += 1
+    width += 8
+
+    def to_int(key):
+        return int(binascii.hexlify(key[:width].ljust(width, b'\0')) or b'0', 16)
+
+    def to_key(number):
+        return binascii.unhexlify(('%x' % number).rjust(2 * width, '0').encode('ascii'))
+
+    lo = to_int(lo_key)
+    hi = to_int(hi_key) if stop is not None else 256 ** width
+    if hi - lo < 2:
+        return [start, stop]
+
+    total = db.approximate_size(lo_key, hi_key)
+    if total == 0:
+        # No size information, since all data in the range is still in
+        # the memtable. Split at evenly spaced keys instead; splitting
+        # the key space evenly would put all keys in a single part if
+        # they share a common prefix.
+        return split_key_range_by_count(db, start, stop, n)
+
+    targets = [total * i // n for i in range(1, n)]
+    lows = [lo] * (n - 1)
+    highs = [hi] * (n - 1)
+    for j in range(8 * width):
+        mids = [(l + h) // 2 for l, h in zip(lows, highs)]
+        sizes = db.approximate_sizes(*[(lo_key, to_key(m)) for m in mids])
+        for i in range(n - 1):
+            if sizes[i] < targets[i]:
+                lows[i] = mids[i]
+            else:
+                highs[i] = mids[i]
+        if all(h - l <= 1 for l, h in zip(lows, highs)):
+            break
+    split_points = highs
+
+    for point in split_points:
+        key = to_key(point)
+        if key <= lo_key or (stop is not None and key >= stop):
+            continue
+        if boundaries[-1] is not None and key <= boundaries[-1]:
+            continue
+        boundaries.append(key)
+    boundaries.append(stop)
+    return boundaries
+
+
+def drain_iterator(Iterator it):
+    out = []
+    for chunk in it:
+        out.extend(chunk)
+    return out
+
+
+def iterate_chunks(Iterator it):
+    # Entry by entry iteration over a chunked iterator, which releases
+    # the GIL while reading each chunk.
+    for chunk in it:
+        for entry in chunk:
+            yield entry
+
+
+#
+# Level and compaction statistics; see DB.level_info() and
+# DB.compaction_stats(). LevelDB only exposes these as text, in the
+# formats produced by Version::DebugString() and DBImpl::GetProperty().
+#
+
+level_header_re = re.compile(br'^--- level (\d+) ---$')
+sstable_re = re.compile(
+    br"^ (\d+):(\d+)\['(.*)' @ \d+ : \d+ \.\. '(.*)' @ \d+ : \d+\]$")
+stats_row_re = re.compile(
+    br'^\s*(\d+)\s+(\d+)\s+(\d+)\s+(\d+)\s+(\d+)\s+(\d+)\s*$')
+escaped_byte_re = re.compile(br'\\x([0-9a-f]{2})')
+
+
+def unescape_byte(match):
+    # LevelDB only escapes non-printable bytes, so other escape-like
+    # sequences are part of the key itself.
+    byte = binascii.unhexlify(match.group(1))
+    if b' ' <= byte <= b'~':
+        return match.group(0)
+    return byte
+
+
+cdef c_bool has_escaped_bytes(bytes text):
+    # Whether the text may contain escaped non-printable bytes. Since
+    # LevelDB does not escape backslashes, such sequences can also be
+    # part of the key itself, so the text cannot be decoded reliably.
+    for match in escaped_byte_re.finditer(text):
+        if not b' ' <= binascii.unhexlify(match.group(1)) <= b'~':
+            return True
+    return False
+
+
+cdef list parse_sstables(bytes text):
+    cdef list levels = []
+    for line in text.splitlines():
+        match = level_header_re.match(line)
+        if match is not None:
+            levels.append({
+                'level': int(match.group(1)),
+                'num_files': 0,
+                'size': 0,
+                'files': [],
+            })
+            continue
+        match = sstable_re.match(line)
+        if match is None or not levels:
+            continue
+        level = levels[-1]
+        size = int(match.group(2))
+        level['num_files'] += 1
+        level['size'] += size
+        level['files'].append({
+            'number': int(match.group(1)),
+            'size': size,
+            # These are escaped; see DB.level_info()
+            'smallest_key': match.group(3),
+            'largest_key': match.group(4),
+        })
+    return levels
+
+
+cdef tuple read_table_key_range(DB db, dict f):
+    # Keys without any escape sequences are printed as they are.
+    smallest = f['smallest_key']
+    largest = f['largest_key']
+    if not has_escaped_bytes(smallest) and not has_escaped_bytes(largest):
+        return smallest, largest
+
+    # Otherwise, read the exact keys from the table file itself. Files
+    # use a .ldb extension, or .sst for files written by older versions
+    # (see TableFileName() and SSTTableFileName() in db/filename.cc).
+    cdef string smallest_key, largest_key
+    cdef string fname
+    cdef uint64_t file_size = f['size']
+    cdef Status st
+    base = to_file_system_name(db.name) + ('/%06d' % f['number']).encode('ascii')
+    for extension in (b'.ldb', b'.sst'):
+        fname = base + extension
+        with nogil:
+            st = ReadTableKeyRange(db.options.env, fname, file_size,
+                                   &smallest_key, &largest_key)
+        if st.ok():
+            return smallest_key, largest_key
+
+    # The file was removed by a compaction after the file list was
+    # obtained, so this information is already outdated; decode the
+    # printed keys as well as possible.
+    return (escaped_byte_re.sub(unescape_byte, smallest),
+            escaped_byte_re.sub(unescape_byte, largest))
+
+
+cdef dict parse_compaction_stats(bytes text):
+    cdef dict out = {}
+    for line in text.splitlines():
+        match = stats_row_re.match(line)
+        if match is not None:
+            # Level, files, size (MB), time (s), read (MB), write (MB)
+            out[int(match.group(1))] = (
+                int(match.group(4)),
+                int(match.group(5)) * 1024 * 1024,
+                int(match.group(6)) * 1024 * 1024)
+    return out
+
+
 cdef int parse_options(Options *options, c_bool create_if_missing,
                        c_bool error_if_exists, object paranoid_checks,
                        object write_buffer_size, object max_open_files,
-                       object lru_cache_size, object block_size,
+                       object lru_cache_size, Cache block_cache,
+                       object block_size,
                        object block_restart_interval, object max_file_size,
                        object compression, int bloom_filter_bits,
-                       object comparator, bytes comparator_name) except -1:
+                       object comparator, bytes comparator_name,
+                       object reuse_logs=None, Env env=None) except -1:
     cdef size_t c_lru_cache_size
 
     options.create_if_missing = create_if_missing
@@ -171,11 +734,19 @@ cdef int parse_options(Options *options, c_bool create_if_missing,
     if max_open_files is not None:
         options.max_open_files = max_open_files
 
+    if lru_cache_size is not None and block_cache is not None:
+        raise TypeError(
+            "'lru_cache_size' cannot be used together with 'block_cache'")
+
     if lru_cache_size is not None:
         c_lru_cache_size = lru_cache_size
         with nogil:
             options.block_cache = NewLRUCache(c_lru_cache_size)
 
+    if block_cache is not None:
+        # Shared cache; owned by the Cache instance, not by these options.
+        options.block_cache = block_cache._cache
+
     if block_size is not None:
         options.block_size = block_size
 
@@ -185,6 +756,14 @@ cdef int parse_options(Options *options, c_bool create_if_missing,
     if max_file_size is not None:
         options.max_file_size = max_file_size
 
+    if reuse_logs is not None:
+        options.reuse_logs = reuse_logs
+
+    if env is not None:
+        # Shared environment; owned by the Env instance.
+        env.check_initialized()
+        options.env = env._env
+
     if compression is None:
         options.compression = leveldb.kNoCompression
     else:
@@ -201,6 +780,20 @@ cdef int parse_options(Options *options, c_bool create_if_missing,
         with nogil:
             options.filter_policy = NewBloomFilterPolicy(bloom_filter_bits)
 
+    if isinstance(comparator, (bytes, unicode)):
+        # Built-in native comparator, selected by name
+        if comparator_name is not None:
+            raise TypeError(
+                "'comparator_name' cannot be used with built-in comparators")
+        if isinstance(comparator, unicode):
+            comparator = comparator.encode('UTF-8')
+        options.comparator = NewPlyvelNativeComparator(comparator)
+        if options.comparator is NULL:
+            options.comparator = BytewiseComparator()
+            raise ValueError(
+                "unknown built-in comparator: %r" % comparator.decode('UTF-8'))
+        return 0
+
     if (comparator is None) != (comparator_name is None):
         raise ValueError(
             "'comparator' and 'comparator_name' must be specified together")
@@ -209,8 +802,291 @@ cdef int parse_options(Options *options, c_bool create_if_missing,
         if not callable(comparator):
             raise TypeError("custom comparator object must be callable")
 
+        # Optional key shortening functions; see FindShortestSeparator()
+        # and FindShortSuccessor() in leveldb/comparator.h
         options.comparator = NewPlyvelCallbackComparator(
-            comparator_name, comparator)
+            comparator_name, comparator,
+            getattr(comparator, 'find_shortest_separator', None),
+            getattr(comparator, 'find_short_successor', None))
+
+
+#
+# Cache
+#
+
+@cython.final
+cdef class Cache:
+    cdef leveldb.Cache* _cache
+    cdef readonly size_t capacity
+
+    def __init__(self, size_t capacity):
+        self.capacity = capacity
+        with nogil:
+            self._cache = NewLRUCache(capacity)
+
+    def __dealloc__(self):
+        # All DB instances using this cache keep a reference to it, so
+        # this is only reached after they have all been closed.
+        if self._cache is not NULL:
+            del self._cache
+            self._cache = NULL
+
+    def __repr__(self):
+        return '<plyvel.Cache with capacity %d at 0x%s>' % (
+            self.capacity,
+            hex(id(self)),
+        )
+
+    cdef int check_initialized(self) except -1:
+        if self._cache is NULL:
+            raise RuntimeError("Cache is not initialized")
+        return 0
+
+    property usage:
+        def __get__(self):
+            self.check_initialized()
+            return self._cache.TotalCharge()
+
+    def prune(self):
+        self.check_initialized()
+        with nogil:
+            self._cache.Prune()
+
+
+#
+# Environment
+#
+
+@cython.final
+cdef class Env:
+    cdef PlyvelEnv* _env
+    cdef readonly int background_threads
+
+    def __init__(self, *, rate_limit=None, int background_threads=1):
+        if background_threads < 1:
+            raise ValueError("'background_threads' must be a positive integer")
+        self.background_threads = background_threads
+        self._env = new PlyvelEnv(background_threads,
+                                  parse_rate_limit(rate_limit))
+
+    def __dealloc__(self):
+        # All DB instances using this environment keep a reference to
+        # it, so this is only reached after they have all been closed.
+        if self._env is not NULL:
+            with nogil:
+                del self._env
+            self._env = NULL
+
+    def __repr__(self):
+        return '<plyvel.Env with %d background thread(s) at 0x%s>' % (
+            self.background_threads,
+            hex(id(self)),
+        )
+
+    cdef int check_initialized(self) except -1:
+        if self._env is NULL:
+            raise RuntimeError("Env is not initialized")
+        return 0
+
+    property rate_limit:
+        def __get__(self):
+            self.check_initialized()
+            cdef uint64_t rate_limit = self._env.RateLimit()
+            return rate_limit if rate_limit > 0 else None
+
+        def __set__(self, rate_limit):
+            self.check_initialized()
+            self._env.SetRateLimit(parse_rate_limit(rate_limit))
+
+    def stats(self):
+        cdef uint64_t bytes_read, bytes_written, throttled_us
+        self.check_initialized()
+        self._env.GetStats(&bytes_read, &bytes_written, &throttled_us)
+        return {
+            'bytes_read': bytes_read,
+            'bytes_written': bytes_written,
+            'throttled_us': throttled_us,
+        }
+
+
+cdef uint64_t parse_rate_limit(rate_limit) except? 0:
+    if rate_limit is None:
+        return 0
+    if rate_limit < 1:
+        raise ValueError("'rate_limit' must be None or a positive integer")
+    return rate_limit
+
+
+#
+# Value cache
+#
+
+@cython.final
+cdef class ValueCacheEntry:
+    cdef ValueCacheEntry prev
+    cdef ValueCacheEntry next
+    cdef bytes key
+    cdef object value  # None for keys that do not exist
+    cdef double expires
+
+
+@cython.final
+cdef class ValueCache:
+    """In-process LRU cache for values returned by DB.get().
+
+    This is an internal helper class that is not exposed in the
+    external Python API; see DB.enable_value_cache().
+
+    Entries are kept in a circular doubly linked list (most recently
+    used first) anchored at `root`, and indexed by key in `entries`.
+    """
+    cdef dict entries
+    cdef ValueCacheEntry root
+    cdef size_t max_entries
+    cdef double ttl
+
+    # Incremented by each invalidation. A value read from LevelDB is
+    # only cached if no write happened while reading it.
+    cdef uint64_t epoch
+
+    cdef uint64_t hits
+    cdef uint64_t misses
+    cdef uint64_t evictions
+    cdef uint64_t expirations
+
+    def __init__(self, size_t max_entries, double ttl):
+        self.entries = {}
+        self.root = ValueCacheEntry()
+        self.root.prev = self.root.next = self.root
+        self.max_entries = max_entries
+        self.ttl = ttl
+
+    cdef inline void unlink(self, ValueCacheEntry entry):
+        entry.prev.next = entry.next
+        entry.next.prev = entry.prev
+
+    cdef inline void link_first(self, ValueCacheEntry entry):
+        entry.prev = self.root
+        entry.next = self.root.next
+        self.root.next.prev = entry
+        self.root.next = entry
+
+    cdef inline void remove(self, ValueCacheEntry entry):
+        self.unlink(entry)
+        entry.prev = entry.next = None
+        del self.entries[entry.key]
+
+    cdef object get(self, DB db, bytes key, object default,
+                    ReadOptions read_options):
+        cdef uint64_t start = stats_start(db)
+        cdef ValueCacheEntry entry = self.entries.get(key)
+        cdef uint64_t epoch
+
+        if entry is not None:
+            if self.ttl > 0 and entry.expires <= monotonic():
+                self.remove(entry)
+                self.expirations += 1
+            else:
+                self.unlink(entry)
+                self.link_first(entry)
+                self.hits += 1
+                # Hits are regular gets for callers (and for DB.stats())
+                if entry.value is None:
+                    stats_record(db, STATS_GET, start, 1, 0, 1)
+                    return default
+                stats_record(db, STATS_GET, start, 1, len(entry.value), 0)
+                return entry.value
+
+        self.misses += 1
+        epoch = self.epoch
+        value = db_get(db, key, None, read_options)
+        if self.epoch == epoch:
+            self.insert(key, value)
+        return default if value is None else value
+
+    cdef insert(self, bytes key, object value):
+        cdef ValueCacheEntry entry = self.entries.get(key)
+        if entry is None:
+            if len(self.entries) >= self.max_entries:
+                self.remove(self.root.prev)
+                self.evictions += 1
+            entry = ValueCacheEntry()
+            entry.key = key
+            self.entries[key] = entry
+        else:
+            self.unlink(entry)
+        entry.value = value
+        if self.ttl > 0:
+            entry.expires = monotonic() + self.ttl
+        self.link_first(entry)
+
+    cdef invalidate(self, bytes key):
+        cdef ValueCacheEntry entry = self.entries.get(key)
+        self.epoch += 1
+        if entry is not None:
+            self.remove(entry)
+
+    cdef invalidate_many(self, list keys):
+        cdef ValueCacheEntry entry
+        self.epoch += 1
+        for key in keys:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.remove(entry)
+
+    cdef clear(self):
+        cdef ValueCacheEntry entry = self.root.next
+        cdef ValueCacheEntry next_entry
+        self.epoch += 1
+        while entry is not self.root:
+            next_entry = entry.next
+            entry.prev = entry.next = None
+            entry = next_entry
+        self.root.prev = self.root.next = self.root
+        self.entries.clear()
+
+    cdef dict stats(self):
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+            'size': len(self.entries),
+            'max_entries': self.max_entries,
+            'ttl': self.ttl if self.ttl > 0 else None,
+        }
+
+    cdef void reset_stats(self):
+        self.hits = self.misses = self.evictions = self.expirations = 0
+
+
+#
+# Buffers
+#
+
+@cython.final
+cdef class ValueBuffer:
+    """Read-only buffer exposing a value without copying it.
+
+    This is an internal helper class that is not exposed in the
+    external Python API; users only see memoryview instances wrapping
+    it. The data either points into `owned`, or into the current entry
+    of the `owner` iterator, which refuses to move or close while any
+    exported buffers are alive.
+    """
+    cdef string owned
+    cdef const_char* data
+    cdef Py_ssize_t size
+    cdef BaseIterator owner
+
+    def __getbuffer__(self, Py_buffer* buffer, int flags):
+        PyBuffer_FillInfo(buffer, self, <void*>self.data, self.size, 1, flags)
+        if self.owner is not None:
+            self.owner.exports += 1
+
+    def __releasebuffer__(self, Py_buffer* buffer):
+        if self.owner is not None:
+            self.owner.exports -= 1
 
 
 #
@@ -223,61 +1099,142 @@ cdef class DB:
     cdef Options options
     cdef object name
     cdef object lock
-    cdef dict iterators
+    cdef PyObject* open_iterators  # see BaseIterator.link()
+
+    # Owned references to a shared Cache and Env. These are not regular
+    # object attributes, since the garbage collector could clear those
+    # before __dealloc__() closes the C++ DB instance that uses them.
+    cdef PyObject* block_cache
+    cdef c_bool owns_block_cache
+    cdef PyObject* env
+    cdef DBStats* _stats
+    cdef c_bool callback_comparator
+    cdef ValueCache value_cache
+    cdef CompactionScheduler scheduler
+    cdef dict table_key_ranges  # see level_info()
+
+    # Async writers, which are closed before the database
+    cdef object async_writers
+
+    # Writes running without the GIL on other threads; see begin_write()
+    cdef object writes_cond
+    cdef int writes_in_flight
+    cdef c_bool closing
 
     def __init__(self, name, *, bool create_if_missing=False,
                  bool error_if_exists=False, paranoid_checks=None,
                  write_buffer_size=None, max_open_files=None,
-                 lru_cache_size=None, block_size=None,
+                 lru_cache_size=None, Cache block_cache=None, block_size=None,
                  block_restart_interval=None, max_file_size=None,
                  compression='snappy', int bloom_filter_bits=0,
-                 object comparator=None, bytes comparator_name=None):
+                 object comparator=None, bytes comparator_name=None,
+                 reuse_logs=None, Env env=None):
         cdef Status st
         cdef string fsname
         self.name = name
 
+        # Keep references to a shared cache and environment, so that
+        # they outlive this DB.
+        if block_cache is not None:
+            Py_INCREF(block_cache)
+            self.block_cache = <PyObject*>block_cache
+        self.owns_block_cache = lru_cache_size is not None
+        if env is not None:
+            Py_INCREF(env)
+            self.env = <PyObject*>env
+
         fsname = to_file_system_name(name)
         parse_options(
             &self.options, create_if_missing, error_if_exists, paranoid_checks,
-            write_buffer_size, max_open_files, lru_cache_size, block_size,
-            block_restart_interval, max_file_size, compression, bloom_filter_bits,
-            comparator, comparator_name)
+            write_buffer_size, max_open_files, lru_cache_size, block_cache,
+            block_size, block_restart_interval, max_file_size, compression,
+            bloom_filter_bits, comparator, comparator_name, reuse_logs, env)
+        self.callback_comparator = (
+            comparator is not None
+            and not isinstance(comparator, (bytes, unicode)))
+        self.table_key_ranges = {}
         with nogil:
             st = leveldb.DB_Open(self.options, fsname, &self._db)
         raise_for_status(st)
 
-        # Keep weak references to open iterators, since deleting a C++
-        # DB instance results in a segfault if associated Iterator
-        # instances are not deleted beforehand (as mentioned in
-        # leveldb/db.h). We don't use weakref.WeakValueDictionary here
-        # for performance reasons.
+        # Open iterators are tracked (see BaseIterator.link()), since
+        # deleting a C++ DB instance results in a segfault if associated
+        # Iterator instances are not deleted beforehand (as mentioned in
+        # leveldb/db.h).
         self.lock = threading.Lock()
-        self.iterators = dict()
+
+        # The same applies to async writers, which write from a
+        # background thread, and to other writes on other threads.
+        self.async_writers = weakref.WeakSet()
+        self.writes_cond = threading.Condition(threading.Lock())
 
     cpdef close(self):
         # If the constructor raised an exception (and hence never
-        # completed), self.iterators can be None. In that case no
-        # iterators need to be cleaned anyway.
+        # completed), self.lock can be None. In that case no iterators
+        # need to be cleaned anyway.
         cdef BaseIterator iterator
-        if self.iterators is not None:
+        cdef PyObject* p
+
+        # Refuse to close while value views point into iterator memory,
+        # before anything has been torn down.
+        p = self.open_iterators
+        while p is not NULL:
+            (<BaseIterator>p).check_exports()
+            p = (<BaseIterator>p).next_open
+
+        # The scheduler may be compacting; wait for it to finish.
+        if self.scheduler is not None:
+            self.scheduler.stop()
+
+        # Async writers write all submitted updates before they stop.
+        if self.async_writers is not None:
+            for writer in list(self.async_writers):
+                writer.close()
+
+        # Wait for writes on other threads (e.g. by a group commit
+        # leader), and refuse new ones.
+        if self.writes_cond is not None:
+            with self.writes_cond:
+                self.closing = True
+                while self.writes_in_flight > 0:
+                    self.writes_cond.wait()
+
+        if self.lock is not None:
             with self.lock:
-                while self.iterators:
-                    iterator = self.iterators.popitem()[1]()
-                    if iterator is not None:
-                        iterator.close()
+                while self.open_iterators is not NULL:
+                    # Closing an iterator unlinks it.
+                    iterator = <BaseIterator>self.open_iterators
+                    iterator.close()
 
         if self._db is not NULL:
             del self._db
             self._db = NULL
 
+        if self.env is not NULL:
+            self.options.env = Env_Default()
+        Py_XDECREF(self.env)
+        self.env = NULL
+
         if self.options.block_cache is not NULL:
-            del self.options.block_cache
+            # A shared cache is deleted by its Cache instance instead
+            if self.owns_block_cache:
+                del self.options.block_cache
             self.options.block_cache = NULL
+        Py_XDECREF(self.block_cache)
+        self.block_cache = NULL
 
         if self.options.filter_policy is not NULL:
             del self.options.filter_policy
             self.options.filter_policy = NULL
 
+        if self._stats is not NULL:
+            free(self._stats)
+            self._stats = NULL
+
+        if self.value_cache is not None:
+            self.value_cache.clear()
+            self.value_cache = None
+
         if self.options.comparator is not NULL:
             # The built-in BytewiseComparator must not be deleted
             if self.options.comparator is not BytewiseComparator():
@@ -291,6 +1248,22 @@ cdef class DB:
     def __dealloc__(self):
         self.close()
 
+    cdef int begin_write(self) except -1:
+        # Register a write that runs without holding the GIL, so that
+        # close() waits for it instead of deleting the C++ DB instance
+        # underneath it. Each call must be paired with end_write().
+        with self.writes_cond:
+            if self._db is NULL or self.closing:
+                raise RuntimeError("Database is closed")
+            self.writes_in_flight += 1
+        return 0
+
+    cdef void end_write(self):
+        with self.writes_cond:
+            self.writes_in_flight -= 1
+            if self.writes_in_flight == 0:
+                self.writes_cond.notify_all()
+
     def __repr__(self):
         return '<plyvel.DB with name %r%s at 0x%s>' % (
             self.name,
@@ -307,8 +1280,33 @@ cdef class DB:
         read_options.verify_checksums = verify_checksums
         read_options.fill_cache = fill_cache
 
+        if self.value_cache is not None:
+            return self.value_cache.get(self, key, default, read_options)
+
         return db_get(self, key, default, read_options)
 
+    def get_view(self, bytes key not None, default=None, *,
+                 bool verify_checksums=False, bool fill_cache=True):
+        if self._db is NULL:
+            raise RuntimeError("Database is closed")
+
+        cdef ReadOptions read_options
+        read_options.verify_checksums = verify_checksums
+        read_options.fill_cache = fill_cache
+
+        return db_get_view(self, key, default, read_options)
+
+    def get_many(self, keys not None, default=None, *,
+                 bool verify_checksums=False, bool fill_cache=True):
+        if self._db is NULL:
+            raise RuntimeError("Database is closed")
+
+        cdef ReadOptions read_options
+        read_options.verify_checksums = verify_checksums
+        read_options.fill_cache = fill_cache
+
+        return db_get_many(self, keys, None, default, read_options)
+
     def put(self, bytes key not None, value not None, *, bool sync=False):
         if self._db is NULL:
             raise RuntimeError("Database is closed")
@@ -319,6 +1317,7 @@ cdef class DB:
         cdef Slice key_slice = Slice(key, len(key))
         cdef Py_buffer value_buffer
         cdef Status st
+        cdef uint64_t start = stats_start(self)
         PyObject_GetBuffer(value, &value_buffer, PyBUF_SIMPLE)
         try:
             with nogil:
@@ -329,6 +1328,10 @@ cdef class DB:
         finally:
             PyBuffer_Release(&value_buffer)
         raise_for_status(st)
+        stats_record(self, STATS_PUT, start, 1,
+                     key_slice.size() + value_buffer.len, 0)
+        if self.value_cache is not None:
+            self.value_cache.invalidate(key)
 
     def delete(self, bytes key not None, *, bool sync=False):
         if self._db is NULL:
@@ -339,9 +1342,13 @@ cdef class DB:
         write_options.sync = sync
 
         cdef Slice key_slice = Slice(key, len(key))
+        cdef uint64_t start = stats_start(self)
         with nogil:
             st = self._db.Delete(write_options, key_slice)
         raise_for_status(st)
+        stats_record(self, STATS_DELETE, start, 1, key_slice.size(), 0)
+        if self.value_cache is not None:
+            self.value_cache.invalidate(key)
 
     def write_batch(self, *, bool transaction=False, bool sync=False):
         if self._db is NULL:
@@ -349,6 +1356,35 @@ cdef class DB:
 
         return WriteBatch(self, None, transaction, sync)
 
+    def group_commit_writer(self, *, double max_delay=0.001,
+                            size_t max_batch_size=1024 * 1024,
+                            bool sync=True):
+        if self._db is NULL:
+            raise RuntimeError("Database is closed")
+
+        return GroupCommitWriter(self, max_delay, max_batch_size, sync)
+
+    def async_writer(self, *, size_t max_pending_bytes=64 * 1024 * 1024,
+                     bool sync=False):
+        if self._db is NULL:
+            raise RuntimeError("Database is closed")
+
+        return AsyncWriter(self, max_pending_bytes, sync)
+
+    def compaction_scheduler(self, *, size_t min_garbage=1024 * 1024,
+                             double max_duty_cycle=0.1,
+                             max_bytes_per_second=None, double interval=60,
+                             bool paused=False):
+        if self._db is NULL:
+            raise RuntimeError("Database is closed")
+        if self.scheduler is not None:
+            raise RuntimeError("Compaction scheduler is already running")
+
+        self.scheduler = CompactionScheduler(
+            self, min_garbage, max_duty_cycle, max_bytes_per_second,
+            interval, paused)
+        return self.scheduler
+
     def __iter__(self):
         if self._db is NULL:
             raise RuntimeError("Database is closed")
@@ -358,7 +1394,8 @@ cdef class DB:
     def iterator(self, *, reverse=False, start=None, stop=None,
                  include_start=True, include_stop=False, prefix=None,
                  include_key=True, include_value=True,
-                 bool verify_checksums=False, bool fill_cache=True):
+                 bool verify_checksums=False, bool fill_cache=True,
+                 chunk_size=None):
         return Iterator(
             self,  # db
             None,  # db_prefix
@@ -373,8 +1410,44 @@ cdef class DB:
             verify_checksums,
             fill_cache,
             None,  # snapshot
+            chunk_size,
         )
 
+    def count(self, *, start=None, stop=None, include_start=True,
+              include_stop=False, prefix=None, bool verify_checksums=False,
+              bool fill_cache=True):
+        cdef Iterator it = Iterator(
+            db=self, db_prefix=None, reverse=False, start=start,
+            stop=stop, include_start=include_start, include_stop=include_stop,
+            prefix=prefix, include_key=False, include_value=False,
+            verify_checksums=verify_checksums, fill_cache=fill_cache,
+            snapshot=None)
+        try:
+            return it.count_remaining()
+        finally:
+            it.close()
+
+    def keys(self, *, reverse=False, start=None, stop=None,
+             include_start=True, include_stop=False, prefix=None,
+             bool verify_checksums=False, bool fill_cache=True):
+        cdef Iterator it = Iterator(
+            db=self, db_prefix=None, reverse=reverse, start=start,
+            stop=stop, include_start=include_start, include_stop=include_stop,
+            prefix=prefix, include_key=True, include_value=False,
+            verify_checksums=verify_checksums, fill_cache=fill_cache,
+            snapshot=None)
+        try:
+            return it.remaining_keys()
+        finally:
+            it.close()
+
+    def delete_range(self, start=None, stop=None, *, include_start=True,
+                     include_stop=False, prefix=None, bool sync=False,
+                     size_t max_batch_size=1024 * 1024, bool compact=False):
+        return db_delete_range(
+            self, None, start, stop, include_start, include_stop, prefix,
+            sync, max_batch_size, compact)
+
     def raw_iterator(self, *, bool verify_checksums=False, bool fill_cache=True):
         return RawIterator(
             self,  # db
@@ -399,21 +1472,58 @@ cdef class DB:
 
         return value if result else None
 
+    def level_info(self):
+        cdef dict key_ranges = {}
+        levels = parse_sstables(self.get_property(b'leveldb.sstables'))
+
+        # Table files are immutable, so their key ranges can be cached.
+        for level in levels:
+            for f in level['files']:
+                key_range = self.table_key_ranges.get(f['number'])
+                if key_range is None:
+                    key_range = read_table_key_range(self, f)
+                key_ranges[f['number']] = key_range
+                f['smallest_key'], f['largest_key'] = key_range
+        self.table_key_ranges = key_ranges
+        return levels
+
+    def compaction_stats(self):
+        cdef list out = []
+        levels = self.level_info()
+        stats = parse_compaction_stats(self.get_property(b'leveldb.stats'))
+        for level in levels:
+            seconds, bytes_read, bytes_written = stats.get(
+                level['level'], (0, 0, 0))
+            out.append({
+                'level': level['level'],
+                'num_files': level['num_files'],
+                'size': level['size'],
+                'time': seconds,
+                'bytes_read': bytes_read,
+                'bytes_written': bytes_written,
+            })
+        return out
+
     def compact_range(self, *, bytes start=None, bytes stop=None):
         if self._db is NULL:
             raise RuntimeError("Database is closed")
 
         cdef Slice start_slice
         cdef Slice stop_slice
+        cdef Slice* start_ptr = NULL
+        cdef Slice* stop_ptr = NULL
 
+        # A NULL pointer means the range is open on that side.
         if start is not None:
             start_slice = Slice(start, len(start))
+            start_ptr = &start_slice
 
         if stop is not None:
             stop_slice = Slice(stop, len(stop))
+            stop_ptr = &stop_slice
 
         with nogil:
-            self._db.CompactRange(&start_slice, &stop_slice)
+            self._db.CompactRange(start_ptr, stop_ptr)
 
     def approximate_size(self, bytes start not None, bytes stop not None):
         if self._db is NULL:
@@ -446,9 +1556,110 @@ cdef class DB:
             free(c_ranges)
             free(sizes)
 
+    def parallel_scan(self, *, bytes start=None, bytes stop=None,
+                      bytes prefix=None, workers=None, fn=None,
+                      bool ordered=True, include_key=True, include_value=True,
+                      bool verify_checksums=False, bool fill_cache=True):
+        if self._db is NULL:
+            raise RuntimeError("Database is closed")
+
+        if prefix is not None:
+            if start is not None or stop is not None:
+                raise TypeError(
+                    "'prefix' cannot be used together with 'start' or 'stop'")
+            start = prefix
+            stop = bytes_increment(prefix)
+
+        if workers is None:
+            workers = multiprocessing.cpu_count()
+        if workers < 1:
+            raise ValueError("'workers' must be a positive integer")
+
+        # All partitions are read from the same snapshot, so that the
+        # results are consistent with each other.
+        boundaries = split_key_range(self, start, stop, workers)
+        partitions = list(zip(boundaries[:-1], boundaries[1:]))
+        snapshot = self.snapshot()
+
+        def scan(partition):
+            # Chunked iteration releases the GIL while stepping.
+            with snapshot.iterator(
+                    start=partition[0], stop=partition[1],
+                    include_key=include_key, include_value=include_value,
+                    verify_checksums=verify_checksums, fill_cache=fill_cache,
+                    chunk_size=1000) as it:
+                if fn is None:
+                    return drain_iterator(it)
+                return fn(iterate_chunks(it))
+
+        pool = ThreadPool(min(workers, len(partitions)))
+        try:
+            if ordered:
+                return pool.map(scan, partitions)
+            return list(pool.imap_unordered(scan, partitions))
+        finally:
+            pool.close()
+            pool.join()
+            snapshot.close()
+
     def prefixed_db(self, bytes prefix not None):
         return PrefixedDB(db=self, prefix=prefix)
 
+    def enable_stats(self):
+        if self._db is NULL:
+            raise RuntimeError("Database is closed")
+
+        if self._stats is NULL:
+            self._stats = <DBStats*>calloc(1, sizeof(DBStats))
+            if self._stats is NULL:
+                raise MemoryError()
+            stats_reset(self)
+
+    def disable_stats(self):
+        if self._stats is not NULL:
+            free(self._stats)
+            self._stats = NULL
+
+    def stats(self, *, bool reset=False):
+        if self._stats is NULL:
+            return None
+
+        out = stats_to_dict(self)
+        if reset:
+            stats_reset(self)
+        return out
+
+    def reset_stats(self):
+        if self._stats is not NULL:
+            stats_reset(self)
+
+    def enable_value_cache(self, size_t max_entries, *, ttl=None):
+        if self._db is NULL:
+            raise RuntimeError("Database is closed")
+
+        if max_entries < 1:
+            raise ValueError("'max_entries' must be a positive integer")
+        if ttl is not None and ttl <= 0:
+            raise ValueError("'ttl' must be a positive number")
+
+        if self.value_cache is not None:
+            self.value_cache.clear()
+        self.value_cache = ValueCache(max_entries, ttl or 0)
+
+    def disable_value_cache(self):
+        if self.value_cache is not None:
+            self.value_cache.clear()
+            self.value_cache = None
+
+    def value_cache_stats(self, *, bool reset=False):
+        if self.value_cache is None:
+            return None
+
+        out = self.value_cache.stats()
+        if reset:
+            self.value_cache.reset_stats()
+        return out
+
 
 cdef class PrefixedDB:
     cdef readonly DB db
@@ -472,6 +1683,25 @@ cdef class PrefixedDB:
             verify_checksums=verify_checksums,
             fill_cache=fill_cache)
 
+    def get_view(self, bytes key not None, default=None, *,
+                 bool verify_checksums=False, bool fill_cache=True):
+        return self.db.get_view(
+            self.prefix + key,
+            default=default,
+            verify_checksums=verify_checksums,
+            fill_cache=fill_cache)
+
+    def get_many(self, keys not None, default=None, *,
+                 bool verify_checksums=False, bool fill_cache=True):
+        if self.db._db is NULL:
+            raise RuntimeError("Database is closed")
+
+        cdef ReadOptions read_options
+        read_options.verify_checksums = verify_checksums
+        read_options.fill_cache = fill_cache
+
+        return db_get_many(self.db, keys, self.prefix, default, read_options)
+
     def put(self, bytes key not None, value not None, *,
             bool sync=False):
         return self.db.put(self.prefix + key, value, sync=sync)
@@ -488,7 +1718,8 @@ cdef class PrefixedDB:
     def iterator(self, *, reverse=False, start=None, stop=None,
                  include_start=True, include_stop=False, prefix=None,
                  include_key=True, include_value=True,
-                 bool verify_checksums=False, bool fill_cache=True):
+                 bool verify_checksums=False, bool fill_cache=True,
+                 chunk_size=None):
         return Iterator(
             self.db,
             self.prefix,
@@ -503,8 +1734,50 @@ cdef class PrefixedDB:
             verify_checksums,
             fill_cache,
             None,  # snapshot
+            chunk_size,
         )
 
+    def count(self, *, start=None, stop=None, include_start=True,
+              include_stop=False, prefix=None, bool verify_checksums=False,
+              bool fill_cache=True):
+        cdef Iterator it = Iterator(
+            db=self.db, db_prefix=self.prefix, reverse=False, start=start,
+            stop=stop, include_start=include_start, include_stop=include_stop,
+            prefix=prefix, include_key=False, include_value=False,
+            verify_checksums=verify_checksums, fill_cache=fill_cache,
+            snapshot=None)
+        try:
+            return it.count_remaining()
+        finally:
+            it.close()
+
+    def keys(self, *, reverse=False, start=None, stop=None,
+             include_start=True, include_stop=False, prefix=None,
+             bool verify_checksums=False, bool fill_cache=True):
+        cdef Iterator it = Iterator(
+            db=self.db, db_prefix=self.prefix, reverse=reverse, start=start,
+            stop=stop, include_start=include_start, include_stop=include_stop,
+            prefix=prefix, include_key=True, include_value=False,
+            verify_checksums=verify_checksums, fill_cache=fill_cache,
+            snapshot=None)
+        try:
+            return it.remaining_keys()
+        finally:
+            it.close()
+
+    def delete_range(self, start=None, stop=None, *, include_start=True,
+                     include_stop=False, prefix=None, bool sync=False,
+                     size_t max_batch_size=1024 * 1024, bool compact=False):
+        return db_delete_range(
+            self.db, self.prefix, start, stop, include_start, include_stop,
+            prefix, sync, max_batch_size, compact)
+
+    def clear(self, *, bool sync=False, size_t max_batch_size=1024 * 1024,
+              bool compact=False):
+        return db_delete_range(
+            self.db, self.prefix, None, None, True, False, None, sync,
+            max_batch_size, compact)
+
     def snapshot(self):
         return Snapshot(db=self.db, prefix=self.prefix)
 
@@ -513,7 +1786,8 @@ cdef class PrefixedDB:
 
 
 def repair_db(name, *, paranoid_checks=None, write_buffer_size=None,
-              max_open_files=None, lru_cache_size=None, block_size=None,
+              max_open_files=None, lru_cache_size=None,
+              Cache block_cache=None, block_size=None,
               block_restart_interval=None, max_file_size=None,
               compression='snappy', int bloom_filter_bits=0, comparator=None,
               bytes comparator_name=None):
@@ -526,14 +1800,91 @@ def repair_db(name, *, paranoid_checks=None, write_buffer_size=None,
     error_if_exists = True
     parse_options(
         &options, create_if_missing, error_if_exists, paranoid_checks,
-        write_buffer_size, max_open_files, lru_cache_size, block_size,
-        block_restart_interval, max_file_size, compression, bloom_filter_bits,
-        comparator, comparator_name)
+        write_buffer_size, max_open_files, lru_cache_size, block_cache,
+        block_size, block_restart_interval, max_file_size, compression,
+        bloom_filter_bits, comparator, comparator_name)
     with nogil:
         st = RepairDB(fsname, options)
     raise_for_status(st)
 
 
+def bulk_load(name, items not None, *, block_size=None,
+              block_restart_interval=None, max_file_size=None,
+              compression='snappy', int bloom_filter_bits=0, comparator=None,
+              bytes comparator_name=None):
+    cdef Options options = Options()
+    cdef Status st
+    cdef string fsname
+    cdef PlyvelTableWriter* writer = NULL
+    cdef Slice key_slice
+    cdef Py_buffer value_buffer
+
+    fsname = to_file_system_name(name)
+    parse_options(
+        &options, False, False, None, None, None, None, None, block_size,
+        block_restart_interval, max_file_size, compression, bloom_filter_bits,
+        comparator, comparator_name)
+
+    try:
+        writer = new PlyvelTableWriter(fsname, options)
+        with nogil:
+            st = writer.Open()
+        raise_for_status(st)
+
+        for key, value in items:
+            if not isinstance(key, bytes):
+                raise TypeError("keys must be byte strings")
+            if value is None:
+                raise TypeError("values must not be None")
+
+            key_slice = Slice(<bytes>key, len(key))
+            if not writer.InOrder(key_slice):
+                raise ValueError(
+                    "keys must be unique and sorted; got %r after a larger "
+                    "(or equal) key" % key)
+
+            PyObject_GetBuffer(value, &value_buffer, PyBUF_SIMPLE)
+            try:
+                with nogil:
+                    st = writer.Add(
+                        key_slice,
+                        Slice(<const_char *>value_buffer.buf,
+                              value_buffer.len))
+            finally:
+                PyBuffer_Release(&value_buffer)
+            raise_for_status(st)
+
+        with nogil:
+            st = writer.Finish()
+        raise_for_status(st)
+
+        # Register the table files in a new manifest.
+        with nogil:
+            if writer.NumFiles() > 0:
+                st = RepairDB(fsname, options)
+            else:
+                st = create_empty_db(fsname, options)
+        raise_for_status(st)
+
+    finally:
+        del writer
+        if options.block_cache is not NULL:
+            del options.block_cache
+        if options.filter_policy is not NULL:
+            del options.filter_policy
+        if options.comparator is not BytewiseComparator():
+            del options.comparator
+
+
+cdef Status create_empty_db(string fsname, Options options) nogil:
+    cdef leveldb.DB* db = NULL
+    cdef Status st
+    options.create_if_missing = True
+    st = leveldb.DB_Open(options, fsname, &db)
+    del db
+    return st
+
+
 def destroy_db(name):
     cdef Options options = Options()
     cdef Status st
@@ -556,11 +1907,19 @@ cdef class WriteBatch:
     cdef DB db
     cdef bytes prefix
     cdef c_bool transaction
+    cdef size_t data_size
+
+    # Keys to invalidate in the value cache of the database after
+    # writing, or None if keys are not tracked, in which case the
+    # whole value cache is cleared instead.
+    cdef list cached_keys
 
     def __init__(self, DB db not None, bytes prefix, bool transaction, sync):
         self.db = db
         self.prefix = prefix
         self.transaction = transaction
+        if db.value_cache is not None:
+            self.cached_keys = []
 
         self.write_options = WriteOptions()
         if sync is not None:
@@ -588,6 +1947,9 @@ cdef class WriteBatch:
                     Slice(<const_char *>value_buffer.buf, value_buffer.len))
         finally:
             PyBuffer_Release(&value_buffer)
+        self.data_size += key_slice.size() + value_buffer.len
+        if self.cached_keys is not None:
+            self.cached_keys.append(key)
 
     def delete(self, bytes key not None):
         if self.db._db is NULL:
@@ -599,6 +1961,137 @@ cdef class WriteBatch:
         cdef Slice key_slice = Slice(key, len(key))
         with nogil:
             self._write_batch.Delete(key_slice)
+        self.data_size += key_slice.size()
+        if self.cached_keys is not None:
+            self.cached_keys.append(key)
+
+    def put_many(self, items not None):
+        if self.db._db is NULL:
+            raise RuntimeError("Database is closed")
+
+        # Prefixed keys are built in a reusable buffer, which avoids
+        # creating a new byte string for each key.
+        cdef string key_buf = self.prefix if self.prefix is not None else b''
+        cdef size_t prefix_len = key_buf.size()
+        cdef Slice key_slice
+        cdef Py_buffer value_buffer
+
+        for key, value in items:
+            if not isinstance(key, bytes):
+                raise TypeError("keys must be byte strings")
+            if value is None:
+                raise TypeError("values must not be None")
+
+            if prefix_len > 0:
+                key_buf.resize(prefix_len)
+                key_buf.append(<const_char*><bytes>key, len(key))
+                key_slice = Slice(key_buf)
+            else:
+                key_slice = Slice(<bytes>key, len(key))
+
+            PyObject_GetBuffer(value, &value_buffer, PyBUF_SIMPLE)
+            try:
+                self._write_batch.Put(
+                    key_slice,
+                    Slice(<const_char *>value_buffer.buf, value_buffer.len))
+            finally:
+                PyBuffer_Release(&value_buffer)
+            self.data_size += key_slice.size() + value_buffer.len
+            if self.cached_keys is not None:
+                self.cached_keys.append(
+                    key if prefix_len == 0 else self.prefix + key)
+
+    def delete_many(self, keys not None):
+        if self.db._db is NULL:
+            raise RuntimeError("Database is closed")
+
+        cdef string key_buf = self.prefix if self.prefix is not None else b''
+        cdef size_t prefix_len = key_buf.size()
+        cdef Slice key_slice
+
+        for key in keys:
+            if not isinstance(key, bytes):
+                raise TypeError("keys must be byte strings")
+
+            if prefix_len > 0:
+                key_buf.resize(prefix_len)
+                key_buf.append(<const_char*><bytes>key, len(key))
+                key_slice = Slice(key_buf)
+            else:
+                key_slice = Slice(<bytes>key, len(key))
+
+            self._write_batch.Delete(key_slice)
+            self.data_size += key_slice.size()
+            if self.cached_keys is not None:
+                self.cached_keys.append(
+                    key if prefix_len == 0 else self.prefix + key)
+
+    def put_packed(self, key_offsets not None, keys not None,
+                   value_offsets not None, values not None):
+        if self.db._db is NULL:
+            raise RuntimeError("Database is closed")
+
+        cdef Py_buffer key_offsets_buffer
+        cdef Py_buffer keys_buffer
+        cdef Py_buffer value_offsets_buffer
+        cdef Py_buffer values_buffer
+        cdef Py_ssize_t n = -1
+
+        get_offsets_buffer(key_offsets, &key_offsets_buffer)
+        try:
+            get_offsets_buffer(value_offsets, &value_offsets_buffer)
+            try:
+                PyObject_GetBuffer(keys, &keys_buffer, PyBUF_SIMPLE)
+                try:
+                    PyObject_GetBuffer(values, &values_buffer, PyBUF_SIMPLE)
+                    try:
+                        n = key_offsets_buffer.len // 8 - 1
+                        check_offsets(&key_offsets_buffer, &keys_buffer, n)
+                        check_offsets(&value_offsets_buffer, &values_buffer, n)
+                        self.put_packed_buffers(
+                            <const uint64_t*>key_offsets_buffer.buf,
+                            <const_char*>keys_buffer.buf,
+                            <const uint64_t*>value_offsets_buffer.buf,
+                            <const_char*>values_buffer.buf,
+                            n)
+                    finally:
+                        PyBuffer_Release(&values_buffer)
+                finally:
+                    PyBuffer_Release(&keys_buffer)
+            finally:
+                PyBuffer_Release(&value_offsets_buffer)
+        finally:
+            PyBuffer_Release(&key_offsets_buffer)
+
+    cdef void put_packed_buffers(self, const uint64_t* key_offsets,
+                                 const_char* keys,
+                                 const uint64_t* value_offsets,
+                                 const_char* values, Py_ssize_t n):
+        cdef string key_buf = self.prefix if self.prefix is not None else b''
+        cdef size_t prefix_len = key_buf.size()
+        cdef Slice key_slice
+        cdef Py_ssize_t i
+
+        with nogil:
+            for i in range(n):
+                if prefix_len > 0:
+                    key_buf.resize(prefix_len)
+                    key_buf.append(keys + key_offsets[i],
+                                   key_offsets[i + 1] - key_offsets[i])
+                    key_slice = Slice(key_buf)
+                else:
+                    key_slice = Slice(keys + key_offsets[i],
+                                      key_offsets[i + 1] - key_offsets[i])
+                self._write_batch.Put(
+                    key_slice,
+                    Slice(values + value_offsets[i],
+                          value_offsets[i + 1] - value_offsets[i]))
+
+        self.data_size += (key_offsets[n] + n * prefix_len
+                           + value_offsets[n])
+
+        # Do not create key objects; clear the whole cache instead.
+        self.cached_keys = None
 
     def clear(self):
         if self.db._db is NULL:
@@ -606,33 +2099,795 @@ cdef class WriteBatch:
 
         with nogil:
             self._write_batch.Clear()
+        self.data_size = 0
+        self.cached_keys = [] if self.db.value_cache is not None else None
 
     def write(self):
         if self.db._db is NULL:
             raise RuntimeError("Database is closed")
 
         cdef Status st
+        cdef uint64_t start = stats_start(self.db)
         with nogil:
             st = self.db._db.Write(self.write_options, self._write_batch)
         raise_for_status(st)
+        stats_record(self.db, STATS_WRITE, start, 1, self.data_size, 0)
+        self.invalidate_cached()
+
+    cdef invalidate_cached(self):
+        cdef ValueCache value_cache = self.db.value_cache
+        if value_cache is None:
+            return
+        if self.cached_keys is None:
+            value_cache.clear()
+        else:
+            value_cache.invalidate_many(self.cached_keys)
+
+    def __enter__(self):
+        if self.db._db is NULL:
+            raise RuntimeError("Database is closed")
+
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if self.db._db is NULL:
+            raise RuntimeError("Database is closed")
+
+        if self.transaction and exc_type is not None:
+            # Exception occurred in transaction; do not write the batch
+            self.clear()
+            return
+
+        self.write()
+        self.clear()
+
+
+#
+# Group commit
+#
+
+@cython.final
+cdef class CommitGroup:
+    # Bookkeeping for callers whose updates are written together. The
+    # status of the write is kept, instead of an exception instance,
+    # so that each caller raises its own exception.
+    cdef c_bool done
+    cdef Status status
+
+
+@cython.final
+cdef class GroupCommitWriter:
+    cdef DB db
+    cdef WriteOptions write_options
+    cdef readonly double max_delay
+    cdef readonly size_t max_batch_size
+    cdef object cond
+    cdef c_bool leader_active
+
+    # The pending group, which collects updates until a leader writes it
+    cdef leveldb.WriteBatch* _write_batch
+    cdef size_t data_size
+    cdef CommitGroup group
+
+    def __init__(self, DB db not None, double max_delay,
+                 size_t max_batch_size, bool sync):
+        if max_delay < 0:
+            raise ValueError("'max_delay' must not be negative")
+
+        self.db = db
+        self.max_delay = max_delay
+        self.max_batch_size = max_batch_size
+        self.write_options = WriteOptions()
+        self.write_options.sync = sync
+        self.cond = threading.Condition(threading.Lock())
+        self.group = CommitGroup()
+        self._write_batch = new leveldb.WriteBatch()
+
+    def __dealloc__(self):
+        del self._write_batch
+
+    def __repr__(self):
+        return '<plyvel.GroupCommitWriter for %r at 0x%s>' % (
+            self.db,
+            hex(id(self)),
+        )
+
+    def put(self, bytes key not None, value not None):
+        if self.db._db is NULL:
+            raise RuntimeError("Database is closed")
+
+        cdef Slice key_slice = Slice(key, len(key))
+        cdef Py_buffer value_buffer
+        cdef CommitGroup group
+        PyObject_GetBuffer(value, &value_buffer, PyBUF_SIMPLE)
+        try:
+            with self.cond:
+                self._write_batch.Put(
+                    key_slice,
+                    Slice(<const_char *>value_buffer.buf, value_buffer.len))
+                self.data_size += key_slice.size() + value_buffer.len
+                group = self.group
+                self.commit(group)
+        finally:
+            PyBuffer_Release(&value_buffer)
+
+        if self.db.value_cache is not None:
+            self.db.value_cache.invalidate(key)
+
+    def delete(self, bytes key not None):
+        if self.db._db is NULL:
+            raise RuntimeError("Database is closed")
+
+        cdef Slice key_slice = Slice(key, len(key))
+        cdef CommitGroup group
+        with self.cond:
+            self._write_batch.Delete(key_slice)
+            self.data_size += key_slice.size()
+            group = self.group
+            self.commit(group)
+
+        if self.db.value_cache is not None:
+            self.db.value_cache.invalidate(key)
+
+    def write(self, WriteBatch write_batch not None):
+        if self.db._db is NULL:
+            raise RuntimeError("Database is closed")
+
+        if write_batch.db is not self.db:
+            raise ValueError(
+                "Write batch does not belong to the same database")
+
+        cdef Status st
+        cdef CommitGroup group
+        with self.cond:
+            st = AppendWriteBatch(self._write_batch,
+                                  write_batch._write_batch)
+            raise_for_status(st)
+            self.data_size += write_batch.data_size
+            group = self.group
+            self.commit(group)
+
+        write_batch.invalidate_cached()
+
+        # Like WriteBatch.__exit__(), allow reuse of the batch
+        write_batch.clear()
+
+    cdef commit(self, CommitGroup group):
+        # This must be called with self.cond held. The first caller
+        # that finds no active leader becomes the leader: it
+        # optionally waits a little for other callers to join the
+        # pending group, and then writes all their updates at once.
+        # The other callers are released when their group is written.
+        cdef CommitGroup pending
+        cdef leveldb.WriteBatch* write_batch
+        cdef size_t data_size
+        cdef double deadline, remaining
+        cdef Status st
+        cdef uint64_t start
+
+        if self.data_size >= self.max_batch_size:
+            # Wake up a leader waiting for more updates.
+            self.cond.notify_all()
+
+        while not group.done:
+            if self.leader_active:
+                self.cond.wait()
+                continue
+
+            self.leader_active = True
+            try:
+                if self.max_delay > 0:
+                    deadline = monotonic() + self.max_delay
+                    while self.data_size < self.max_batch_size:
+                        remaining = deadline - monotonic()
+                        if remaining <= 0:
+                            break
+                        self.cond.wait(remaining)
+
+                # Keeps DB.close() from deleting the database while
+                # the lock is released for writing.
+                self.db.begin_write()
+
+                # Swap in a new pending group, so that other callers
+                # can continue adding updates while this one is written.
+                write_batch = self._write_batch
+                data_size = self.data_size
+                pending = self.group
+                self._write_batch = new leveldb.WriteBatch()
+                self.data_size = 0
+                self.group = CommitGroup()
+
+                self.cond.release()
+                try:
+                    start = stats_start(self.db)
+                    with nogil:
+                        st = self.db._db.Write(self.write_options,
+                                               write_batch)
+                        del write_batch
+                    pending.status = st
+                    if st.ok():
+                        stats_record(self.db, STATS_WRITE, start, 1,
+                                     data_size, 0)
+                finally:
+                    self.db.end_write()
+                    self.cond.acquire()
+                pending.done = True
+            finally:
+                self.leader_active = False
+                self.cond.notify_all()
+
+        raise_for_status(group.status)
+
+
+#
+# Background writes
+#
+
+def run_async_writer(writer_ref, wakeup, list keepalive):
+    # Body of the background thread of an AsyncWriter. While idle, the
+    # thread only has a weak reference to the writer, so that an unused
+    # writer can be garbage collected, which stops the thread. While
+    # updates are pending, `keepalive` holds a strong reference, so
+    # that submitted updates are always written.
+    while True:
+        wakeup.wait()
+        wakeup.clear()
+        writer = writer_ref()
+        if writer is None:
+            return
+        if not (<AsyncWriter>writer).write_pending():
+            return  # closing, and all updates are written
+        writer = None
+
+
+@cython.final
+@cython.no_gc_clear
+cdef class AsyncWriter:
+    cdef DB db
+    cdef WriteOptions write_options
+    cdef readonly size_t max_pending_bytes
+    cdef object cond
+    cdef object thread
+    cdef object wakeup
+    cdef list keepalive
+    cdef object future_class
+    cdef c_bool closing
+    cdef object __weakref__
+
+    # Updates that have not been handed to LevelDB yet, and their keys
+    # for value cache invalidation (see WriteBatch.cached_keys)
+    cdef leveldb.WriteBatch* _write_batch
+    cdef list futures
+    cdef list cached_keys
+
+    # Bytes submitted but not yet written, including the batch that
+    # is being written by the background thread
+    cdef readonly size_t pending_bytes
+
+    # Sequence numbers (in number of submissions) used for flushing
+    cdef uint64_t submitted
+    cdef uint64_t written
+
+    def __init__(self, DB db not None, size_t max_pending_bytes, bool sync):
+        # Python 2 requires the 'futures' backport for this feature, so
+        # only import it when needed.
+        from concurrent.futures import Future
+
+        self.db = db
+        self.max_pending_bytes = max_pending_bytes
+        self.write_options = WriteOptions()
+        self.write_options.sync = sync
+        self.future_class = Future
+        self.cond = threading.Condition(threading.Lock())
+        self.futures = []
+        self.cached_keys = []
+        self._write_batch = new leveldb.WriteBatch()
+
+        self.wakeup = threading.Event()
+        self.keepalive = []
+        self.thread = threading.Thread(
+            target=run_async_writer,
+            args=(weakref.ref(self), self.wakeup, self.keepalive),
+            name='plyvel-async-writer')
+        self.thread.daemon = True
+        self.thread.start()
+
+        # DB.close() closes the writer, which writes pending updates.
+        db.async_writers.add(self)
+
+    def __dealloc__(self):
+        # Only reached when no updates are pending (see keepalive);
+        # wake up the background thread so that it exits.
+        if self.wakeup is not None:
+            self.wakeup.set()
+        del self._write_batch
+
+    def __repr__(self):
+        return '<plyvel.AsyncWriter for %r%s at 0x%s>' % (
+            self.db,
+            ' (closed)' if self.closing else '',
+            hex(id(self)),
+        )
+
+    property closed:
+        def __get__(self):
+            return self.closing
+
+    def put(self, bytes key not None, value not None):
+        cdef Slice key_slice = Slice(key, len(key))
+        cdef Py_buffer value_buffer
+        PyObject_GetBuffer(value, &value_buffer, PyBUF_SIMPLE)
+        try:
+            with self.cond:
+                self.wait_for_capacity()
+                self._write_batch.Put(
+                    key_slice,
+                    Slice(<const_char *>value_buffer.buf, value_buffer.len))
+                if self.cached_keys is not None:
+                    self.cached_keys.append(key)
+                return self.submit(key_slice.size() + value_buffer.len)
+        finally:
+            PyBuffer_Release(&value_buffer)
+
+    def delete(self, bytes key not None):
+        cdef Slice key_slice = Slice(key, len(key))
+        with self.cond:
+            self.wait_for_capacity()
+            self._write_batch.Delete(key_slice)
+            if self.cached_keys is not None:
+                self.cached_keys.append(key)
+            return self.submit(key_slice.size())
+
+    def write(self, WriteBatch write_batch not None):
+        if write_batch.db is not self.db:
+            raise ValueError(
+                "Write batch does not belong to the same database")
+
+        cdef Status st
+        with self.cond:
+            self.wait_for_capacity()
+            st = AppendWriteBatch(self._write_batch,
+                                  write_batch._write_batch)
+            raise_for_status(st)
+            if write_batch.cached_keys is None:
+                self.cached_keys = None
+            elif self.cached_keys is not None:
+                self.cached_keys.extend(write_batch.cached_keys)
+            future = self.submit(write_batch.data_size)
+
+        # Like WriteBatch.__exit__(), allow reuse of the batch
+        write_batch.clear()
+        return future
+
+    def flush(self):
+        cdef uint64_t target
+        with self.cond:
+            target = self.submitted
+            while self.written < target:
+                self.cond.wait()
+
+    def close(self):
+        with self.cond:
+            if self.closing:
+                return
+            self.closing = True
+            self.cond.notify_all()
+        self.wakeup.set()
+
+        # Closing from a future callback (which runs on the background
+        # thread) cannot wait for the thread itself.
+        if self.thread is not threading.current_thread():
+            self.thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    cdef wait_for_capacity(self):
+        # This must be called with self.cond held. Block (apply
+        # backpressure) while too much data is pending. A single large
+        # update is always accepted when nothing else is pending.
+        if self.closing:
+            raise RuntimeError("Writer is closed")
+        if self.db._db is NULL:
+            raise RuntimeError("Database is closed")
+
+        while self.pending_bytes >= self.max_pending_bytes:
+            self.cond.wait()
+            if self.closing:
+                raise RuntimeError("Writer is closed")
+
+    cdef submit(self, size_t n_bytes):
+        # This must be called with self.cond held, right after adding
+        # updates to the pending batch.
+        future = self.future_class()
+        future.set_running_or_notify_cancel()
+        self.futures.append(future)
+        self.pending_bytes += n_bytes
+        self.submitted += 1
+        if not self.keepalive:
+            self.keepalive.append(self)
+        self.wakeup.set()
+        return future
+
+    cdef c_bool write_pending(self) except *:
+        # Called by the background thread: write all pending updates,
+        # and return whether the writer is still open.
+        cdef leveldb.WriteBatch* write_batch = NULL
+        cdef list futures
+        cdef list cached_keys
+        cdef ValueCache value_cache
+        cdef size_t n_bytes = 0
+        cdef Status st
+        cdef uint64_t start
+
+        while True:
+            with self.cond:
+                if not self.futures:
+                    del self.keepalive[:]
+                    return not self.closing
+
+                # Swap in a new batch, so that other threads can add
+                # updates while this one is written.
+                write_batch = self._write_batch
+                futures = self.futures
+                cached_keys = self.cached_keys
+                n_bytes = self.pending_bytes
+                self._write_batch = new leveldb.WriteBatch()
+                self.futures = []
+                self.cached_keys = []
+
+            error = None
+            if self.db._db is NULL:
+                error = RuntimeError("Database is closed")
+                del write_batch
+            else:
+                start = stats_start(self.db)
+                with nogil:
+                    st = self.db._db.Write(self.write_options, write_batch)
+                    del write_batch
+                try:
+                    raise_for_status(st)
+                except Exception as exc:
+                    error = exc
+                else:
+                    stats_record(self.db, STATS_WRITE, start, 1, n_bytes, 0)
+                    value_cache = self.db.value_cache
+                    if value_cache is not None:
+                        if cached_keys is None:
+                            value_cache.clear()
+                        else:
+                            value_cache.invalidate_many(cached_keys)
+
+            for future in futures:
+                if error is None:
+                    future.set_result(None)
+                else:
+                    future.set_exception(error)
+
+            with self.cond:
+                self.pending_bytes -= n_bytes
+                self.written += len(futures)
+                self.cond.notify_all()
+
+
+#
+# Compaction scheduling
+#
+
+cdef enum:
+    # Maximum number of tombstone ranges kept by a CompactionScheduler
+    MAX_TOMBSTONE_RANGES = 1000
+
+
+@cython.final
+cdef class TombstoneRange:
+    cdef bytes start
+    cdef bytes stop
+    cdef c_bool flushed  # seen in a table file
+    cdef c_bool in_upper_level  # see CompactionScheduler.plan()
+
+    def __init__(self, bytes start, bytes stop):
+        self.start = start
+        self.stop = stop
+
+
+def run_compaction_scheduler(scheduler_ref, wakeup):
+    # Body of the background thread of a CompactionScheduler. Between
+    # slices, the thread only has a weak reference to the scheduler, so
+    # that a scheduler (and its database) that is no longer used can be
+    # garbage collected, which stops the thread.
+    delay = 0
+    while True:
+        wakeup.wait(delay)
+        wakeup.clear()
+        scheduler = scheduler_ref()
+        if scheduler is None:
+            return
+        delay = (<CompactionScheduler>scheduler).run_slice()
+        scheduler = None
+        if delay is not None and delay < 0:
+            return  # closing
+
+
+@cython.final
+@cython.no_gc_clear
+cdef class CompactionScheduler:
+    """Background thread that compacts the key ranges with the most
+    garbage, one small slice at a time.
+
+    Candidate slices are the key ranges of the table files in all but
+    the deepest non-empty level. Compacting such a range merges the file
+    into the levels below it, which drops overwritten entries and
+    tombstones. See .plan() for the garbage estimates.
+    """
+    cdef DB db
+    cdef readonly size_t min_garbage
+    cdef readonly double max_duty_cycle
+    cdef readonly object max_bytes_per_second
+    cdef readonly double interval
+    cdef object cond
+    cdef object thread
+    cdef object wakeup
+    cdef c_bool paused
+    cdef c_bool closing
+    cdef object error
+    cdef object __weakref__
+
+    # Key ranges deleted using DB.delete_range(), as (start, stop)
+    # tuples; None means an open range.
+    cdef list tombstone_ranges
+
+    cdef uint64_t n_slices
+    cdef uint64_t n_bytes
+    cdef double n_seconds
+
+    def __init__(self, DB db not None, size_t min_garbage,
+                 double max_duty_cycle, max_bytes_per_second,
+                 double interval, bool paused):
+        if not 0 < max_duty_cycle <= 1:
+            raise ValueError("'max_duty_cycle' must be between 0 and 1")
+        if max_bytes_per_second is not None and max_bytes_per_second <= 0:
+            raise ValueError(
+                "'max_bytes_per_second' must be None or a positive number")
+        if interval <= 0:
+            raise ValueError("'interval' must be a positive number")
+
+        self.db = db
+        self.min_garbage = min_garbage
+        self.max_duty_cycle = max_duty_cycle
+        self.max_bytes_per_second = max_bytes_per_second
+        self.interval = interval
+        self.paused = paused
+        self.cond = threading.Condition(threading.Lock())
+        self.tombstone_ranges = []
+
+        self.wakeup = threading.Event()
+        self.thread = threading.Thread(
+            target=run_compaction_scheduler,
+            args=(weakref.ref(self), self.wakeup),
+            name='plyvel-compaction-scheduler')
+        self.thread.daemon = True
+        self.thread.start()
+
+    def __dealloc__(self):
+        # Wake up the background thread, so that it exits.
+        if self.wakeup is not None:
+            self.wakeup.set()
+
+    def __repr__(self):
+        return '<plyvel.CompactionScheduler for %r%s at 0x%s>' % (
+            self.db,
+            ' (closed)' if self.closing else
+            ' (paused)' if self.paused else '',
+            hex(id(self)),
+        )
+
+    property closed:
+        def __get__(self):
+            return self.closing
 
-    def __enter__(self):
-        if self.db._db is NULL:
-            raise RuntimeError("Database is closed")
+    property is_paused:
+        def __get__(self):
+            return self.paused
+
+    def pause(self):
+        with self.cond:
+            self.paused = True
+        self.wakeup.set()
+
+    def resume(self):
+        with self.cond:
+            self.paused = False
+        self.wakeup.set()
+
+    def close(self):
+        self.stop()
+        if self.error is not None:
+            error, self.error = self.error, None
+            raise error
+
+    cdef stop(self):
+        with self.cond:
+            self.closing = True
+        self.wakeup.set()
+        self.thread.join()
+        if self.db.scheduler is self:
+            self.db.scheduler = None
 
+    def __enter__(self):
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
-        if self.db._db is NULL:
-            raise RuntimeError("Database is closed")
+        self.close()
 
-        if self.transaction and exc_type is not None:
-            # Exception occurred in transaction; do not write the batch
-            self.clear()
+    def stats(self):
+        with self.cond:
+            return {
+                'slices': self.n_slices,
+                'bytes': self.n_bytes,
+                'time': self.n_seconds,
+            }
+
+    cdef add_tombstone_range(self, bytes start, bytes stop):
+        # Tombstone ranges are compared using Python's (bytewise)
+        # ordering, so they are only used with the default comparator.
+        if self.db.options.comparator is not BytewiseComparator():
             return
+        with self.cond:
+            self.tombstone_ranges.append(TombstoneRange(start, stop))
+            del self.tombstone_ranges[:-MAX_TOMBSTONE_RANGES]
+        self.wakeup.set()
+
+    def plan(self):
+        cdef list candidates = []
+        cdef list ranges = []
+        cdef list hinted = []
+        cdef list unflushed
+        cdef TombstoneRange t
+
+        levels = self.db.level_info()
+        deepest = max([level['level'] for level in levels
+                       if level['num_files']] or [0])
+        with self.cond:
+            tombstone_ranges = list(self.tombstone_ranges)
+        for t in tombstone_ranges:
+            t.in_upper_level = False
+
+        for level in levels[:deepest]:
+            for f in level['files']:
+                candidates.append({
+                    'start': f['smallest_key'],
+                    'stop': f['largest_key'],
+                    'level': level['level'],
+                    'file_size': f['size'],
+                })
+                ranges.append((f['smallest_key'], f['largest_key']))
+
+                # Parts of this file's range that were deleted using
+                # DB.delete_range(); all data below it is garbage.
+                for t in tombstone_ranges:
+                    lo = f['smallest_key'] if t.start is None else max(
+                        t.start, f['smallest_key'])
+                    hi = f['largest_key'] if t.stop is None else min(
+                        t.stop, f['largest_key'])
+                    if lo < hi:
+                        hinted.append((len(candidates) - 1, lo, hi))
+                        t.in_upper_level = t.flushed = True
+
+        # Tombstones that were flushed to disk, but are not in any upper
+        # level anymore, have been compacted into the deepest level.
+        with self.cond:
+            self.tombstone_ranges = [
+                t for t in self.tombstone_ranges
+                if not t.flushed or t.in_upper_level
+                or t not in tombstone_ranges]
+
+        # Tombstones that are still in the memtable are candidates by
+        # themselves, since all data on disk in their range is garbage.
+        # (Compacting a range flushes the memtable.)
+        unflushed = [t for t in tombstone_ranges if not t.flushed]
+
+        if not candidates and not unflushed:
+            return []
+
+        largest_key = max([f['largest_key'] for level in levels
+                           for f in level['files']] or [b''])
+        sizes = self.db.approximate_sizes(
+            *(ranges + [(lo, hi) for i, lo, hi in hinted] + [
+                (b'' if t.start is None else t.start,
+                 largest_key + b'\0' if t.stop is None else t.stop)
+                for t in unflushed]))
+
+        for candidate, size in zip(candidates, sizes):
+            # Entries in this file overwrite (or delete) at most this
+            # much data in the deeper levels.
+            candidate['size'] = size
+            candidate['garbage'] = min(
+                candidate['file_size'],
+                max(size - candidate['file_size'], 0))
+
+        for (i, lo, hi), size in zip(hinted, sizes[len(ranges):]):
+            candidate = candidates[i]
+            candidate['garbage'] = max(candidate['garbage'], size)
+
+        empty = []
+        for t, size in zip(unflushed, sizes[len(ranges) + len(hinted):]):
+            if size == 0:
+                # Nothing (left) to reclaim, e.g. after compaction
+                empty.append(t)
+                continue
+            candidates.append({
+                'start': t.start,
+                'stop': t.stop,
+                'level': None,
+                'file_size': 0,
+                'size': size,
+                'garbage': size,
+            })
+        if empty:
+            with self.cond:
+                self.tombstone_ranges = [
+                    t for t in self.tombstone_ranges if t not in empty]
+
+        candidates.sort(key=lambda c: c['garbage'], reverse=True)
+        return candidates
+
+    cdef object run_slice(self):
+        # Compact a single slice. Returns the number of seconds to wait
+        # before the next one, None to wait until woken up, or -1 if the
+        # scheduler is closing.
+        cdef double start, elapsed, delay
+        with self.cond:
+            if self.closing:
+                return -1
+            if self.paused:
+                return None
 
-        self.write()
-        self.clear()
+        try:
+            if self.db._db is NULL:
+                raise RuntimeError("Database is closed")
+            candidates = self.plan()
+            if candidates and candidates[0]['garbage'] >= max(
+                    self.min_garbage, 1):
+                candidate = candidates[0]
+                start = monotonic()
+                self.db.compact_range(
+                    start=candidate['start'], stop=candidate['stop'])
+                elapsed = monotonic() - start
+            else:
+                candidate = None
+        except Exception as exc:
+            with self.cond:
+                self.error = exc
+                self.closing = True
+            # Allow starting a new scheduler, and break the reference
+            # cycle with the database.
+            if self.db.scheduler is self:
+                self.db.scheduler = None
+            return -1
+
+        if candidate is None:
+            # Nothing to do; check again later, or when new tombstone
+            # ranges are added.
+            return self.interval
+
+        # Time budget: spend at most a fraction of the time on
+        # compactions. I/O budget: on average, do not compact more than
+        # the configured number of bytes per second.
+        delay = elapsed * (1 / self.max_duty_cycle - 1)
+        if self.max_bytes_per_second is not None:
+            delay = max(
+                delay,
+                candidate['size'] / self.max_bytes_per_second - elapsed)
+
+        with self.cond:
+            self.n_slices += 1
+            self.n_bytes += candidate['size']
+            self.n_seconds += elapsed
+        return delay
 
 
 #
@@ -651,12 +2906,73 @@ cdef enum IteratorDirection:
     REVERSE
 
 
+cdef enum:
+    # See Iterator.collect_forward_batched()
+    MAX_BOUNDS_CHECK_INTERVAL = 16
+
+    # Number of entries buffered at once by Iterator.count_remaining()
+    # and Iterator.remaining_keys()
+    SCAN_CHUNK_SIZE = 4096
+
+    # Number of Next() steps RawIterator.seek_many() tries before it
+    # falls back to a (more expensive) Seek()
+    MAX_SEQUENTIAL_STEPS = 8
+
+
+cdef struct EntryBuffer:
+    # Contiguous key and value data, with Arrow-style offsets (each
+    # starting with a 0) that delimit the individual entries.
+    string keys
+    string values
+    vector[uint64_t] key_offsets
+    vector[uint64_t] value_offsets
+
+
+cdef inline void append_key(string* keys, vector[uint64_t]* offsets,
+                            Slice key) nogil:
+    keys.append(key.data(), key.size())
+    offsets.push_back(keys.size())
+
+
+cdef inline Slice buffered_key(string* keys, vector[uint64_t]* offsets,
+                               size_t i) nogil:
+    return Slice(keys.data() + offsets[0][i],
+                 offsets[0][i + 1] - offsets[0][i])
+
+
+cdef inline void truncate_entries(EntryBuffer* buf, size_t n) nogil:
+    buf.keys.resize(buf.key_offsets[n])
+    buf.key_offsets.resize(n + 1)
+    buf.values.resize(buf.value_offsets[n])
+    buf.value_offsets.resize(n + 1)
+
+
+cdef inline void clear_entries(EntryBuffer* buf) nogil:
+    # Keeps the allocated memory, so that buffers can be reused.
+    buf.keys.clear()
+    buf.values.clear()
+    buf.key_offsets.clear()
+    buf.value_offsets.clear()
+
+
+@cython.no_gc_clear
 cdef class BaseIterator:
+    # The database reference must not be cleared by the garbage
+    # collector before __dealloc__() unlinks this iterator from it.
     cdef DB db
     cdef leveldb.Iterator* _iter
 
-    # Iterators need to be weak referencable to ensure a proper cleanup
-    # from DB.close()
+    # Open iterators of a database form an intrusive doubly linked
+    # list, headed by DB.open_iterators. The list holds borrowed
+    # references; iterators unlink themselves when they are closed,
+    # which also happens when they are deallocated.
+    cdef PyObject* prev_open
+    cdef PyObject* next_open
+
+    # Number of live buffers exported by RawIterator.value_view(), which
+    # point into memory owned by the LevelDB iterator.
+    cdef Py_ssize_t exports
+
     cdef object __weakref__
 
     def __init__(self, DB db, bool verify_checksums, bool fill_cache,
@@ -674,18 +2990,35 @@ cdef class BaseIterator:
 
         with nogil:
             self._iter = db._db.NewIterator(read_options)
+        self.link()
+
+    cdef inline void link(self):
+        self.next_open = self.db.open_iterators
+        if self.next_open is not NULL:
+            (<BaseIterator>self.next_open).prev_open = <PyObject*>self
+        self.db.open_iterators = <PyObject*>self
 
-        # Store a weak reference on the db (needed when closing db)
-        iterator_id = id(self)
-        ref_dict = db.iterators
-        ref_dict[iterator_id] = weakref_ref(
-            self,
-            lambda wr: ref_dict.pop(iterator_id))
+    cdef inline void unlink(self):
+        if self.prev_open is not NULL:
+            (<BaseIterator>self.prev_open).next_open = self.next_open
+        else:
+            self.db.open_iterators = self.next_open
+        if self.next_open is not NULL:
+            (<BaseIterator>self.next_open).prev_open = self.prev_open
+        self.prev_open = self.next_open = NULL
+
+    cdef inline int check_exports(self) except -1:
+        if self.exports > 0:
+            raise BufferError(
+                "Cannot move or close iterator while value views exist")
+        return 0
 
     cpdef close(self):
+        self.check_exports()
         if self._iter is not NULL:
             del self._iter
             self._iter = NULL
+            self.unlink()
 
     def __dealloc__(self):
         self.close()
@@ -708,17 +3041,30 @@ cdef class Iterator(BaseIterator):
     cdef bytes stop
     cdef Slice start_slice
     cdef Slice stop_slice
+    cdef c_bool has_start
+    cdef c_bool has_stop
     cdef c_bool include_start
     cdef c_bool include_stop
     cdef c_bool include_key
     cdef c_bool include_value
     cdef bytes db_prefix
     cdef size_t db_prefix_len
+    cdef size_t chunk_size
+
+    # Bound checks: bytewise comparisons use memcmp() directly, a pure
+    # prefix range uses a prefix check, and with Python comparators,
+    # .collect() checks the bounds for groups of entries at once.
+    cdef c_bool bytewise
+    cdef c_bool prefix_bounds
+    cdef bytes prefix
+    cdef Slice prefix_slice
+    cdef c_bool batch_bounds
 
     def __init__(self, DB db, bytes db_prefix, bool reverse, bytes start,
                  bytes stop, bool include_start, bool include_stop,
                  bytes prefix, bool include_key, bool include_value,
-                 bool verify_checksums, bool fill_cache, Snapshot snapshot):
+                 bool verify_checksums, bool fill_cache, Snapshot snapshot,
+                 chunk_size=None):
 
         super(Iterator, self).__init__(
             db=db,
@@ -727,6 +3073,8 @@ cdef class Iterator(BaseIterator):
             snapshot=snapshot)
 
         self.comparator = <leveldb.Comparator*>db.options.comparator
+        self.bytewise = self.comparator is BytewiseComparator()
+        self.batch_bounds = db.callback_comparator
         self.direction = FORWARD if not reverse else REVERSE
 
         if db_prefix is None:
@@ -744,17 +3092,21 @@ cdef class Iterator(BaseIterator):
             else:
                 # Adapt start and stop keys to use the database key
                 # prefix.
-                if start is None:
-                    start = db_prefix
-                    include_start = True
+                if start is None and stop is None:
+                    # The whole PrefixedDB is a pure prefix range.
+                    prefix = db_prefix
                 else:
-                    start = db_prefix + start
-
-                if stop is None:
-                    stop = bytes_increment(db_prefix)
-                    include_stop = False
-                else:
-                    stop = db_prefix + stop
+                    if start is None:
+                        start = db_prefix
+                        include_start = True
+                    else:
+                        start = db_prefix + start
+
+                    if stop is None:
+                        stop = bytes_increment(db_prefix)
+                        include_stop = False
+                    else:
+                        stop = db_prefix + stop
 
         if prefix is not None:
             if start is not None or stop is not None:
@@ -766,20 +3118,33 @@ cdef class Iterator(BaseIterator):
             stop = bytes_increment(prefix)
             include_start = True
             include_stop = False
+            if self.bytewise:
+                self.prefix = prefix
+                self.prefix_slice = Slice(prefix, len(prefix))
+                self.prefix_bounds = True
 
         if start is not None:
             self.start = start
             self.start_slice = Slice(start, len(start))
+            self.has_start = True
 
         if stop is not None:
             self.stop = stop
             self.stop_slice = Slice(stop, len(stop))
+            self.has_stop = True
 
         self.include_start = include_start
         self.include_stop = include_stop
         self.include_key = include_key
         self.include_value = include_value
 
+        if chunk_size is None:
+            self.chunk_size = 0
+        elif chunk_size < 1:
+            raise ValueError("'chunk_size' must be a positive integer")
+        else:
+            self.chunk_size = chunk_size
+
         if self.direction == FORWARD:
             self.seek_to_start()
         else:
@@ -811,6 +3176,13 @@ cdef class Iterator(BaseIterator):
             value_slice = self._iter.value()
             value = value_slice.data()[:value_slice.size()]
 
+        if self.db._stats is not NULL:
+            stats_record(self.db, STATS_ITERATE, 0, 1,
+                         key_slice.size() + value_slice.size(), 0)
+
+        return self.make_entry(key, value)
+
+    cdef inline object make_entry(self, bytes key, bytes value):
         if self.include_key and self.include_value:
             return (key, value)
         if self.include_key:
@@ -819,12 +3191,79 @@ cdef class Iterator(BaseIterator):
             return value
         return None
 
+    cdef inline int compare(self, Slice a, Slice b) nogil:
+        if self.bytewise:
+            return a.compare(b)
+        return self.comparator.Compare(a, b)
+
+    cdef inline c_bool before_stop(self, Slice key) nogil:
+        """Check a key against the stop key, while moving forward."""
+        if self.prefix_bounds:
+            return key.starts_with(self.prefix_slice)
+        return self.compare(key, self.stop_slice) < (
+            1 if self.include_stop else 0)
+
+    cdef inline c_bool after_start(self, Slice key) nogil:
+        """Check a key against the start key, while moving backward."""
+        if self.prefix_bounds:
+            return key.starts_with(self.prefix_slice)
+        return self.compare(key, self.start_slice) >= (
+            0 if self.include_start else 1)
+
+    cdef inline c_bool in_range(self, Slice key, c_bool forward) nogil:
+        if forward:
+            return not self.has_stop or self.before_stop(key)
+        return not self.has_start or self.after_start(key)
+
+    cdef size_t find_out_of_range(self, string* keys,
+                                  vector[uint64_t]* offsets, size_t n,
+                                  c_bool forward) nogil:
+        """Find the first of `n` buffered keys that is out of range.
+
+        Keys are in iteration order, so out of range keys can only be
+        at the end, and a binary search suffices. Returns `n` if all
+        keys are within range.
+        """
+        cdef size_t lo = 0
+        cdef size_t hi = n
+        cdef size_t mid
+        while lo < hi:
+            mid = lo + (hi - lo) // 2
+            if self.in_range(buffered_key(keys, offsets, mid), forward):
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    cdef inline void buffer_current(self, EntryBuffer* buf) nogil:
+        """Append the current iterator key/value to a buffer.
+
+        This is the GIL-less counterpart of .current(). Excluded keys or
+        values are stored as empty strings.
+        """
+        cdef Slice sl
+        if self.include_key:
+            sl = self._iter.key()
+            buf.keys.append(sl.data() + self.db_prefix_len,
+                            sl.size() - self.db_prefix_len)
+        buf.key_offsets.push_back(buf.keys.size())
+        if self.include_value:
+            sl = self._iter.value()
+            buf.values.append(sl.data(), sl.size())
+        buf.value_offsets.push_back(buf.values.size())
+
     def __next__(self):
         """Return the next iterator entry.
 
         Note: Cython will also create a .next() method that does the
         same as this method.
         """
+        if self.chunk_size > 0:
+            chunk = self.next_chunk(self.chunk_size)
+            if not chunk:
+                raise StopIteration
+            return chunk
+
         if self.direction == FORWARD:
             return self.real_next()
         else:
@@ -836,7 +3275,359 @@ cdef class Iterator(BaseIterator):
         else:
             return self.real_next()
 
+    def next_chunk(self, size_t n):
+        cdef EntryBuffer buf
+        cdef list out = []
+        cdef size_t i
+
+        self.collect(n, &buf)
+
+        for i in range(buf.key_offsets.size() - 1):
+            key = (buf.keys.data()[buf.key_offsets[i]:buf.key_offsets[i + 1]]
+                   if self.include_key else None)
+            value = (buf.values.data()[buf.value_offsets[i]:buf.value_offsets[i + 1]]
+                     if self.include_value else None)
+            out.append(self.make_entry(key, value))
+
+        return out
+
+    def next_columns(self, n=None, *, value_typecode=None):
+        cdef EntryBuffer buf
+        cdef array.array values
+        cdef size_t i
+        cdef size_t itemsize
+        cdef size_t n_entries
+
+        if value_typecode is not None:
+            if not self.include_value:
+                raise TypeError(
+                    "'value_typecode' requires an iterator that includes values")
+            values = array.array(value_typecode)
+            itemsize = values.itemsize
+
+        self.collect(SIZE_MAX if n is None else <size_t>n, &buf)
+        n_entries = buf.key_offsets.size() - 1
+
+        key_offsets = key_data = value_offsets = value_data = None
+
+        if self.include_key:
+            key_offsets = offsets_to_array(buf.key_offsets)
+            key_data = buf.keys
+
+        if value_typecode is not None:
+            for i in range(n_entries):
+                if buf.value_offsets[i + 1] - buf.value_offsets[i] != itemsize:
+                    raise ValueError(
+                        "value of size %d does not match typecode %r" % (
+                            buf.value_offsets[i + 1] - buf.value_offsets[i],
+                            value_typecode))
+            array.extend_buffer(values, <char*>buf.values.data(), n_entries)
+            value_data = values
+        elif self.include_value:
+            value_offsets = offsets_to_array(buf.value_offsets)
+            value_data = buf.values
+
+        return key_offsets, key_data, value_offsets, value_data
+
+    cdef int collect(self, size_t n, EntryBuffer* buf) except -1:
+        """Collect (at most) `n` entries in iteration order into `buf`.
+
+        The first entry goes through the regular state machine; the
+        remaining entries are stepped and bounds-checked in a single
+        nogil section.
+        """
+        cdef size_t count = 0
+
+        if self._iter is NULL:
+            raise RuntimeError("Database or iterator is closed")
+
+        buf.key_offsets.push_back(0)
+        buf.value_offsets.push_back(0)
+
+        if n == 0:
+            return 0
+
+        if self.direction == FORWARD:
+            if not self.step_next():
+                return 0
+            # The iterator is now positioned at the first entry; see
+            # .real_next().
+            if self.batch_bounds and self.has_stop:
+                count = self.collect_forward_batched(n, buf)
+            else:
+                with nogil:
+                    while True:
+                        self.buffer_current(buf)
+                        count += 1
+                        if count >= n:
+                            break
+                        self._iter.Next()
+                        if not self._iter.Valid() or (
+                                self.has_stop and not self.before_stop(
+                                    self._iter.key())):
+                            self.state = AFTER_STOP
+                            break
+        else:
+            if not self.step_prev():
+                return 0
+            # The iterator is now positioned at the first entry; see
+            # .real_prev().
+            if self.batch_bounds and self.has_start:
+                count = self.collect_reverse_batched(n, buf)
+            else:
+                with nogil:
+                    self.buffer_current(buf)
+                    count += 1
+                self.finish_prev()
+                with nogil:
+                    while count < n and self.state == IN_BETWEEN:
+                        self.buffer_current(buf)
+                        count += 1
+                        self._iter.Prev()
+                        if not self._iter.Valid() or (
+                                self.has_start and not self.after_start(
+                                    self._iter.key())):
+                            self.state = BEFORE_START
+
+        raise_for_status(self._iter.status())
+
+        if self.db._stats is not NULL:
+            stats_record(self.db, STATS_ITERATE, 0, count,
+                         buf.keys.size() + buf.values.size(), 0)
+        return 0
+
+    # With Python comparators, each comparison needs the GIL, so the
+    # batched variants below do not check every entry against the
+    # bounds. Instead, they only check entries at (exponentially
+    # growing, but capped) intervals, and use a binary search over the
+    # unchecked keys to find the exact boundary once an entry turned
+    # out to be out of range. The cap limits how far the iterator steps
+    # past the boundary, since stepping itself also invokes the
+    # comparator inside LevelDB.
+
+    cdef size_t collect_forward_batched(self, size_t n,
+                                        EntryBuffer* buf) nogil:
+        # Full keys of the unchecked entries, starting at index `checked`
+        cdef string keys
+        cdef vector[uint64_t] offsets
+        cdef size_t count = 0
+        cdef size_t checked, n_unchecked
+        cdef size_t interval = 1
+        cdef c_bool past_stop = False
+
+        # The first entry has been checked by .step_next().
+        self.buffer_current(buf)
+        count = checked = 1
+        offsets.push_back(0)
+
+        while count < n:
+            self._iter.Next()
+            if not self._iter.Valid():
+                self.state = AFTER_STOP
+                break
+            if count - checked >= interval:
+                if not self.before_stop(self._iter.key()):
+                    past_stop = True
+                    break
+                # All entries up to here are within range.
+                checked = count
+                keys.clear()
+                offsets.resize(1)
+                if interval < MAX_BOUNDS_CHECK_INTERVAL:
+                    interval *= 2
+            self.buffer_current(buf)
+            append_key(&keys, &offsets, self._iter.key())
+            count += 1
+
+        if checked < count:
+            n_unchecked = self.find_out_of_range(
+                &keys, &offsets, count - checked, True)
+            if checked + n_unchecked < count:
+                past_stop = True
+                count = checked + n_unchecked
+                truncate_entries(buf, count)
+
+        if past_stop:
+            self.state = AFTER_STOP
+        return count
+
+    cdef size_t collect_reverse_batched(self, size_t n,
+                                        EntryBuffer* buf) nogil:
+        # Full keys of the unchecked entries, starting at index `checked`
+        cdef string keys
+        cdef vector[uint64_t] offsets
+        cdef size_t count = 0
+        cdef size_t checked, n_unchecked
+        cdef size_t interval = 1
+        cdef c_bool before_start = False
+
+        # The first entry has been checked by .step_prev(). Unlike
+        # forward iteration, the iterator is positioned at the entry
+        # that will be returned next; see .real_prev().
+        self.buffer_current(buf)
+        count = checked = 1
+        offsets.push_back(0)
+
+        while True:
+            self._iter.Prev()
+            if not self._iter.Valid():
+                before_start = True
+                break
+            if count >= n:
+                # Check the entry for the next call, and hence (since
+                # keys are ordered) all unchecked entries at once.
+                if self.after_start(self._iter.key()):
+                    checked = count
+                else:
+                    before_start = True
+                break
+            if count - checked >= interval:
+                if not self.after_start(self._iter.key()):
+                    before_start = True
+                    break
+                checked = count
+                keys.clear()
+                offsets.resize(1)
+                if interval < MAX_BOUNDS_CHECK_INTERVAL:
+                    interval *= 2
+            self.buffer_current(buf)
+            append_key(&keys, &offsets, self._iter.key())
+            count += 1
+
+        if checked < count:
+            n_unchecked = self.find_out_of_range(
+                &keys, &offsets, count - checked, False)
+            if checked + n_unchecked < count:
+                before_start = True
+                count = checked + n_unchecked
+                truncate_entries(buf, count)
+
+        self.state = BEFORE_START if before_start else IN_BETWEEN
+        return count
+
+    cdef count_remaining(self):
+        """Count the remaining entries (moving forward) without
+        creating Python objects for them."""
+        cdef uint64_t count = 0
+        cdef EntryBuffer buf
+
+        if self._iter is NULL:
+            raise RuntimeError("Database or iterator is closed")
+
+        if self.batch_bounds and self.has_stop:
+            # Python comparator: collect (empty) entries in chunks, so
+            # that the bounds are checked in batches; see .collect().
+            while True:
+                clear_entries(&buf)
+                self.collect(SCAN_CHUNK_SIZE, &buf)
+                count += buf.key_offsets.size() - 1
+                if buf.key_offsets.size() - 1 < SCAN_CHUNK_SIZE:
+                    return count
+
+        if not self.step_next():
+            return 0
+
+        with nogil:
+            while True:
+                count += 1
+                self._iter.Next()
+                if not self._iter.Valid() or (
+                        self.has_stop and not self.before_stop(
+                            self._iter.key())):
+                    self.state = AFTER_STOP
+                    break
+
+        raise_for_status(self._iter.status())
+
+        if self.db._stats is not NULL:
+            stats_record(self.db, STATS_ITERATE, 0, count, 0, 0)
+        return count
+
+    cdef delete_remaining(self, WriteOptions write_options,
+                          size_t max_batch_size):
+        """Delete the remaining entries (moving forward).
+
+        Deletions are written in batches, each holding keys of
+        (slightly more than) `max_batch_size` bytes in total. The
+        iterator reads from an implicit snapshot, so it does not see
+        its own deletions.
+        """
+        cdef leveldb.WriteBatch* write_batch
+        cdef uint64_t count = 0
+        cdef uint64_t n_bytes = 0
+        cdef size_t batch_size = 0
+        cdef Slice key
+        cdef Status st
+        cdef c_bool more = True
+        cdef uint64_t start
+
+        if self._iter is NULL:
+            raise RuntimeError("Database or iterator is closed")
+
+        if not self.step_next():
+            return 0
+
+        start = stats_start(self.db)
+        write_batch = new leveldb.WriteBatch()
+        try:
+            with nogil:
+                while more:
+                    key = self._iter.key()
+                    write_batch.Delete(key)
+                    batch_size += key.size()
+                    count += 1
+                    self._iter.Next()
+                    more = self._iter.Valid() and (
+                        not self.has_stop or self.before_stop(
+                            self._iter.key()))
+                    if batch_size >= max_batch_size or not more:
+                        st = self.db._db.Write(write_options, write_batch)
+                        if not st.ok():
+                            break
+                        write_batch.Clear()
+                        n_bytes += batch_size
+                        batch_size = 0
+        finally:
+            del write_batch
+
+        self.state = AFTER_STOP
+        raise_for_status(st)
+        raise_for_status(self._iter.status())
+
+        stats_record(self.db, STATS_DELETE, start, count, n_bytes, 0)
+        return count
+
+    cdef list remaining_keys(self):
+        """Return the remaining keys as a list.
+
+        Keys are collected in chunks without the GIL, and only the key
+        strings themselves are created as Python objects.
+        """
+        cdef EntryBuffer buf
+        cdef list out = []
+        cdef size_t i, n
+
+        while True:
+            clear_entries(&buf)
+            self.collect(SCAN_CHUNK_SIZE, &buf)
+            n = buf.key_offsets.size() - 1
+            for i in range(n):
+                out.append(
+                    buf.keys.data()[buf.key_offsets[i]:buf.key_offsets[i + 1]])
+            if n < SCAN_CHUNK_SIZE:
+                return out
+
     cdef real_next(self):
+        if not self.step_next():
+            raise StopIteration
+        return self.current()
+
+    cdef int step_next(self) except -1:
+        """Move to the next entry, if any.
+
+        Returns 1 if the iterator is positioned at the entry to return,
+        or 0 if the iterator is exhausted.
+        """
         if self._iter is NULL:
             raise RuntimeError("Database or iterator is closed")
 
@@ -845,7 +3636,7 @@ cdef class Iterator(BaseIterator):
                 self._iter.Next()
             if not self._iter.Valid():
                 self.state = AFTER_STOP
-                raise StopIteration
+                return 0
         elif self.state == IN_BETWEEN_ALREADY_POSITIONED:
             self.state = IN_BETWEEN
         elif self.state == BEFORE_START:
@@ -857,32 +3648,47 @@ cdef class Iterator(BaseIterator):
                     self._iter.Seek(self.start_slice)
             if not self._iter.Valid():
                 # Iterator is empty
-                raise StopIteration
+                return 0
             if self.start is not None and not self.include_start:
                 # Start key is excluded, so skip past it if the db
                 # contains it.
-                if self.comparator.Compare(self._iter.key(),
-                                           self.start_slice) == 0:
+                if self.compare(self._iter.key(), self.start_slice) == 0:
                     with nogil:
                         self._iter.Next()
                     if not self._iter.Valid():
-                        raise StopIteration
+                        return 0
             self.state = IN_BETWEEN
         elif self.state == AFTER_STOP:
-            raise StopIteration
+            return 0
 
         raise_for_status(self._iter.status())
 
         # Check range boundaries
-        if self.stop is not None:
-            n = 1 if self.include_stop else 0
-            if self.comparator.Compare(self._iter.key(), self.stop_slice) >= n:
-                self.state = AFTER_STOP
-                raise StopIteration
+        if self.has_stop and not self.before_stop(self._iter.key()):
+            self.state = AFTER_STOP
+            return 0
 
-        return self.current()
+        return 1
 
     cdef real_prev(self):
+        if not self.step_prev():
+            raise StopIteration
+
+        # Unlike .real_next(), first obtain the value, then move the
+        # iterator pointer (not the other way around), so that
+        # repeatedly calling it.prev() and next(it) will work as
+        # designed.
+        out = self.current()
+        self.finish_prev()
+        return out
+
+    cdef int step_prev(self) except -1:
+        """Move to the previous entry, if any.
+
+        Returns 1 if the iterator is positioned at the entry to return,
+        or 0 if the iterator is exhausted. The caller must call
+        .finish_prev() after reading the current entry.
+        """
         if self._iter is NULL:
             raise RuntimeError("Database or iterator is closed")
 
@@ -895,10 +3701,10 @@ cdef class Iterator(BaseIterator):
             if not self._iter.Valid():
                 # The .seek() resulted in the first key in the database
                 self.state = BEFORE_START
-                raise StopIteration
+                return 0
             raise_for_status(self._iter.status())
         elif self.state == BEFORE_START:
-            raise StopIteration
+            return 0
         elif self.state == AFTER_STOP:
             if self.stop is None:
                 # No stop key, seek to last entry
@@ -921,27 +3727,25 @@ cdef class Iterator(BaseIterator):
                         self._iter.SeekToLast()
 
                 # Make sure the iterator is not past the stop key
-                if self._iter.Valid() and self.comparator.Compare(self._iter.key(), self.stop_slice) > 0:
+                if self._iter.Valid() and self.compare(self._iter.key(), self.stop_slice) > 0:
                     with nogil:
                         self._iter.Prev()
 
             if not self._iter.Valid():
                 # No entries left
-                raise StopIteration
+                return 0
 
             # After all the stepping back, we might even have ended up
             # *before* the start key. In this case the iterator does not
             # yield any items.
-            if self.start is not None and self.comparator.Compare(self.start_slice, self._iter.key()) >= 0:
-                raise StopIteration
+            if self.start is not None and self.compare(self.start_slice, self._iter.key()) >= 0:
+                return 0
 
             raise_for_status(self._iter.status())
 
-        # Unlike .real_next(), first obtain the value, then move the
-        # iterator pointer (not the other way around), so that
-        # repeatedly calling it.prev() and next(it) will work as
-        # designed.
-        out = self.current()
+        return 1
+
+    cdef int finish_prev(self) except -1:
         with nogil:
             self._iter.Prev()
         if not self._iter.Valid():
@@ -953,9 +3757,7 @@ cdef class Iterator(BaseIterator):
                 self.state = IN_BETWEEN
             else:
                 # Check range boundaries
-                n = 0 if self.include_start else 1
-                if self.comparator.Compare(
-                        self._iter.key(), self.start_slice) >= n:
+                if self.after_start(self._iter.key()):
                     # Iterator is valid and within range boundaries
                     self.state = IN_BETWEEN
                 else:
@@ -964,7 +3766,7 @@ cdef class Iterator(BaseIterator):
                     self.state = BEFORE_START
 
         raise_for_status(self._iter.status())
-        return out
+        return 0
 
     def seek_to_start(self):
         if self._iter is NULL:
@@ -1017,6 +3819,7 @@ cdef class RawIterator(BaseIterator):
     def seek_to_first(self):
         if self._iter is NULL:
             raise RuntimeError("Database or iterator is closed")
+        self.check_exports()
 
         with nogil:
             self._iter.SeekToFirst()
@@ -1026,6 +3829,7 @@ cdef class RawIterator(BaseIterator):
     def seek_to_last(self):
         if self._iter is NULL:
             raise RuntimeError("Database or iterator is closed")
+        self.check_exports()
 
         with nogil:
             self._iter.SeekToLast()
@@ -1035,6 +3839,7 @@ cdef class RawIterator(BaseIterator):
     def seek(self, bytes target not None):
         if self._iter is NULL:
             raise RuntimeError("Database or iterator is closed")
+        self.check_exports()
 
         cdef Slice target_slice = Slice(target, len(target))
         with nogil:
@@ -1045,6 +3850,7 @@ cdef class RawIterator(BaseIterator):
     def next(self):
         if self._iter is NULL:
             raise RuntimeError("Database or iterator is closed")
+        self.check_exports()
 
         if not self._iter.Valid():
             raise IteratorInvalidError()
@@ -1057,6 +3863,7 @@ cdef class RawIterator(BaseIterator):
     def prev(self):
         if self._iter is NULL:
             raise RuntimeError("Database or iterator is closed")
+        self.check_exports()
 
         if not self._iter.Valid():
             raise IteratorInvalidError()
@@ -1088,9 +3895,123 @@ cdef class RawIterator(BaseIterator):
         value_slice = self._iter.value()
         return value_slice.data()[:value_slice.size()]
 
+    def value_view(self):
+        if self._iter is NULL:
+            raise RuntimeError("Database or iterator is closed")
+
+        if not self._iter.Valid():
+            raise IteratorInvalidError()
+
+        # The returned view points into memory owned by the LevelDB
+        # iterator, which stays valid until the iterator is moved. The
+        # buffer counts its exports, and the iterator refuses to move
+        # (or close) while any of them are alive.
+        cdef Slice value_slice = self._iter.value()
+        cdef ValueBuffer buf = ValueBuffer.__new__(ValueBuffer)
+        buf.data = value_slice.data()
+        buf.size = value_slice.size()
+        buf.owner = self
+        return memoryview(buf)
+
     def item(self):
         return self.key(), self.value()
 
+    def seek_many(self, targets not None, size_t n_per_target=1):
+        if self._iter is NULL:
+            raise RuntimeError("Database or iterator is closed")
+        self.check_exports()
+
+        if n_per_target < 1:
+            raise ValueError("'n_per_target' must be a positive integer")
+
+        cdef list target_list = []
+        cdef vector[Slice] target_slices
+
+        # Keep references to all targets, so that the slices pointing
+        # into them remain valid while the GIL is released.
+        for target in targets:
+            if not isinstance(target, bytes):
+                raise TypeError("targets must be byte strings")
+            target_list.append(target)
+            target_slices.push_back(Slice(<bytes>target, len(target)))
+
+        cdef EntryBuffer buf
+        cdef vector[size_t] ends
+        cdef Comparator* comparator = <leveldb.Comparator*>self.db.options.comparator
+        cdef size_t i, j, n = target_slices.size()
+        cdef c_bool positioned
+        cdef Slice sl
+
+        buf.key_offsets.push_back(0)
+        buf.value_offsets.push_back(0)
+
+        with nogil:
+            for i in range(n):
+                # For sorted targets, the next result is often at or
+                # close to the current position, in which case a few
+                # Next() calls are cheaper than a full Seek().
+                positioned = False
+                if i > 0 and self._iter.status().ok():
+                    if self._iter.Valid():
+                        if comparator.Compare(self._iter.key(),
+                                              target_slices[i]) < 0:
+                            for j in range(MAX_SEQUENTIAL_STEPS):
+                                self._iter.Next()
+                                if not self._iter.Valid():
+                                    positioned = self._iter.status().ok()
+                                    break
+                                if comparator.Compare(self._iter.key(),
+                                                      target_slices[i]) >= 0:
+                                    positioned = True
+                                    break
+                        elif n_per_target == 1:
+                            # The current entry is the first one at or
+                            # after the previous target.
+                            positioned = comparator.Compare(
+                                target_slices[i - 1], target_slices[i]) <= 0
+                    elif n_per_target == 1:
+                        # Nothing at or after the previous target.
+                        positioned = comparator.Compare(
+                            target_slices[i - 1], target_slices[i]) <= 0
+
+                if not positioned:
+                    self._iter.Seek(target_slices[i])
+
+                for j in range(n_per_target):
+                    if not self._iter.Valid():
+                        break
+                    if j > 0:
+                        self._iter.Next()
+                        if not self._iter.Valid():
+                            break
+                    append_key(&buf.keys, &buf.key_offsets, self._iter.key())
+                    sl = self._iter.value()
+                    buf.values.append(sl.data(), sl.size())
+                    buf.value_offsets.push_back(buf.values.size())
+
+                if not self._iter.status().ok():
+                    break
+                ends.push_back(buf.key_offsets.size() - 1)
+
+        raise_for_status(self._iter.status())
+
+        cdef list out = []
+        cdef list entries
+        cdef size_t begin = 0
+        for i in range(n):
+            entries = []
+            for j in range(begin, ends[i]):
+                entries.append((
+                    buf.keys.data()[buf.key_offsets[j]:buf.key_offsets[j + 1]],
+                    buf.values.data()[buf.value_offsets[j]:buf.value_offsets[j + 1]]))
+            begin = ends[i]
+            if n_per_target == 1:
+                out.append(entries[0] if entries else None)
+            else:
+                out.append(entries)
+
+        return out
+
 
 #
 # Snapshot
@@ -1147,13 +4068,41 @@ cdef class Snapshot:
 
         return db_get(self.db, key, default, read_options)
 
+    def get_view(self, bytes key not None, default=None, *,
+                 bool verify_checksums=False, bool fill_cache=True):
+        if self.db._db is NULL or self._snapshot is NULL:
+            raise RuntimeError("Database or snapshot is closed")
+
+        cdef ReadOptions read_options
+        read_options.verify_checksums = verify_checksums
+        read_options.fill_cache = fill_cache
+        read_options.snapshot = self._snapshot
+
+        if self.prefix is not None:
+            key = self.prefix + key
+
+        return db_get_view(self.db, key, default, read_options)
+
+    def get_many(self, keys not None, default=None, *,
+                 bool verify_checksums=False, bool fill_cache=True):
+        if self.db._db is NULL or self._snapshot is NULL:
+            raise RuntimeError("Database or snapshot is closed")
+
+        cdef ReadOptions read_options
+        read_options.verify_checksums = verify_checksums
+        read_options.fill_cache = fill_cache
+        read_options.snapshot = self._snapshot
+
+        return db_get_many(self.db, keys, self.prefix, default, read_options)
+
     def __iter__(self):
         return self.iterator()
 
     def iterator(self, *, reverse=False, start=None, stop=None,
                  include_start=True, include_stop=False, prefix=None,
                  include_key=True, include_value=True,
-                 bool verify_checksums=False, bool fill_cache=True):
+                 bool verify_checksums=False, bool fill_cache=True,
+                 chunk_size=None):
         if self.db._db is NULL or self._snapshot is NULL:
             raise RuntimeError("Database or snapshot is closed")
 
@@ -1162,7 +4111,41 @@ cdef class Snapshot:
             stop=stop, include_start=include_start, include_stop=include_stop,
             prefix=prefix, include_key=include_key,
             include_value=include_value, verify_checksums=verify_checksums,
-            fill_cache=fill_cache, snapshot=self)
+            fill_cache=fill_cache, snapshot=self, chunk_size=chunk_size)
+
+    def count(self, *, start=None, stop=None, include_start=True,
+              include_stop=False, prefix=None, bool verify_checksums=False,
+              bool fill_cache=True):
+        if self.db._db is NULL or self._snapshot is NULL:
+            raise RuntimeError("Database or snapshot is closed")
+
+        cdef Iterator it = Iterator(
+            db=self.db, db_prefix=self.prefix, reverse=False, start=start,
+            stop=stop, include_start=include_start, include_stop=include_stop,
+            prefix=prefix, include_key=False, include_value=False,
+            verify_checksums=verify_checksums, fill_cache=fill_cache,
+            snapshot=self)
+        try:
+            return it.count_remaining()
+        finally:
+            it.close()
+
+    def keys(self, *, reverse=False, start=None, stop=None,
+             include_start=True, include_stop=False, prefix=None,
+             bool verify_checksums=False, bool fill_cache=True):
+        if self.db._db is NULL or self._snapshot is NULL:
+            raise RuntimeError("Database or snapshot is closed")
+
+        cdef Iterator it = Iterator(
+            db=self.db, db_prefix=self.prefix, reverse=reverse, start=start,
+            stop=stop, include_start=include_start, include_stop=include_stop,
+            prefix=prefix, include_key=True, include_value=False,
+            verify_checksums=verify_checksums, fill_cache=fill_cache,
+            snapshot=self)
+        try:
+            return it.remaining_keys()
+        finally:
+            it.close()
 
     def raw_iterator(self, *, bool verify_checksums=False,
                      bool fill_cache=True):
@@ -1174,3 +4157,127 @@ cdef class Snapshot:
             verify_checksums=verify_checksums,
             fill_cache=fill_cache,
             snapshot=self)
+
+
+#
+# Process pool scanning
+#
+
+def scan_chunk(fn, bool raw, bool include_key, bool include_value,
+               tuple columns):
+    # Runs in a worker process. Chunks arrive in the columnar format of
+    # Iterator.next_columns(), i.e. as a few large buffers, so that
+    # only the worker creates Python objects for individual entries.
+    if raw:
+        return fn(columns)
+
+    key_offsets, key_data, value_offsets, value_data = columns
+    n = len(key_offsets if include_key else value_offsets) - 1
+    if include_key:
+        keys = [key_data[key_offsets[i]:key_offsets[i + 1]]
+                for i in range(n)]
+    if include_value:
+        values = [value_data[value_offsets[i]:value_offsets[i + 1]]
+                  for i in range(n)]
+
+    if include_key and include_value:
+        return fn(list(zip(keys, values)))
+    return fn(keys if include_key else values)
+
+
+@cython.final
+cdef class ProcessPoolScanner:
+    cdef object pool
+    cdef readonly int processes
+    cdef int max_pending
+
+    def __init__(self, processes=None, *, initializer=None, initargs=(),
+                 context=None, max_pending=None):
+        if processes is None:
+            processes = multiprocessing.cpu_count()
+        if processes < 1:
+            raise ValueError("'processes' must be a positive integer")
+        if max_pending is None:
+            max_pending = 2 * processes
+        if max_pending < 1:
+            raise ValueError("'max_pending' must be a positive integer")
+
+        self.processes = processes
+        self.max_pending = max_pending
+
+        # The worker processes never use Plyvel handles; they only
+        # receive copies of the scanned data.
+        if context is not None:
+            self.pool = multiprocessing.get_context(context).Pool(
+                processes, initializer, initargs)
+        else:
+            self.pool = multiprocessing.Pool(processes, initializer, initargs)
+
+    def __repr__(self):
+        return '<plyvel.ProcessPoolScanner with %d process(es)%s at 0x%s>' % (
+            self.processes,
+            ' (closed)' if self.pool is None else '',
+            hex(id(self)),
+        )
+
+    def close(self):
+        if self.pool is None:
+            return  # nothing to do
+
+        self.pool.close()
+        self.pool.join()
+        self.pool = None
+
+    property closed:
+        def __get__(self):
+            return self.pool is None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+        return False  # propagate exceptions
+
+    def scan(self, source not None, fn not None, *, start=None, stop=None,
+             prefix=None, bool include_key=True, bool include_value=True,
+             bool raw=False, size_t chunk_size=1000,
+             bool verify_checksums=False, bool fill_cache=True):
+        if self.pool is None:
+            raise RuntimeError("Scanner is closed")
+        if not include_key and not include_value:
+            raise TypeError(
+                "'include_key' and 'include_value' cannot both be false")
+        if chunk_size < 1:
+            raise ValueError("'chunk_size' must be a positive integer")
+
+        # A single iterator reads all chunks, so the results are
+        # consistent with each other, as if read from a snapshot.
+        it = source.iterator(
+            start=start, stop=stop, prefix=prefix, include_key=include_key,
+            include_value=include_value, verify_checksums=verify_checksums,
+            fill_cache=fill_cache)
+        pool = self.pool
+        max_pending = self.max_pending
+
+        def results():
+            # Chunks are read (without holding the GIL) while earlier
+            # chunks are being processed. At most max_pending chunks are
+            # in flight, which bounds memory usage for slow consumers.
+            pending = collections.deque()
+            try:
+                while True:
+                    columns = it.next_columns(chunk_size)
+                    if len(columns[0] if include_key else columns[2]) == 1:
+                        break
+                    pending.append(pool.apply_async(
+                        scan_chunk,
+                        (fn, raw, include_key, include_value, columns)))
+                    if len(pending) >= max_pending:
+                        yield pending.popleft().get()
+                while pending:
+                    yield pending.popleft().get()
+            finally:
+                it.close()
+
+        return results()
@@ -0,0 +1,173 @@
+"""
+asyncio front-end for Plyvel.
+
+This module requires Python 3.7+, and is not imported by the main
+plyvel package; use ``import plyvel.aio`` explicitly.
+"""
+
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+
+class AsyncDB(object):
+    """Asynchronous wrapper around a DB (or PrefixedDB) instance.
+
+    All blocking LevelDB calls run on a dedicated, bounded thread pool,
+    so that they do not block the event loop.
+    """
+
+    def __init__(self, db, *, executor=None, max_workers=4):
+        self.db = db
+        self._owns_executor = executor is None
+        if executor is None:
+            executor = ThreadPoolExecutor(max_workers=max_workers)
+        self._executor = executor
+
+    def __repr__(self):
+        return '<plyvel.aio.AsyncDB wrapping %r at 0x%s>' % (
+            self.db,
+            hex(id(self)),
+        )
+
+    def _run(self, func, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return loop.run_in_executor(
+            self._executor, functools.partial(func, *args, **kwargs))
+
+    async def close(self):
+        # Both calls wait for work in progress (pending calls, and for
+        # DB.close() e.g. background writes and compactions), so run
+        # them outside the event loop.
+        loop = asyncio.get_running_loop()
+        if self._owns_executor:
+            await loop.run_in_executor(
+                None, functools.partial(self._executor.shutdown, wait=True))
+        close = getattr(self.db, 'close', None)
+        if close is not None:
+            await loop.run_in_executor(None, close)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+        return False  # propagate exceptions
+
+    async def get(self, key, default=None, **kwargs):
+        return await self._run(self.db.get, key, default, **kwargs)
+
+    async def get_many(self, keys, default=None, **kwargs):
+        # Materialize the keys first, since arbitrary iterables should
+        # not be consumed from another thread.
+        return await self._run(self.db.get_many, list(keys), default, **kwargs)
+
+    async def put(self, key, value, **kwargs):
+        return await self._run(self.db.put, key, value, **kwargs)
+
+    async def delete(self, key, **kwargs):
+        return await self._run(self.db.delete, key, **kwargs)
+
+    def write_batch(self, **kwargs):
+        return AsyncWriteBatch(self, self.db.write_batch(**kwargs))
+
+    def iterator(self, *, chunk_size=1000, **kwargs):
+        return AsyncIterator(self, self.db.iterator(**kwargs), chunk_size)
+
+    def __aiter__(self):
+        return self.iterator()
+
+
+class AsyncWriteBatch(object):
+    """Asynchronous wrapper around a WriteBatch instance.
+
+    Adding operations to the batch only touches memory, so .put() and
+    .delete() are regular methods; only writing the batch is
+    asynchronous.
+    """
+
+    def __init__(self, async_db, write_batch):
+        self._async_db = async_db
+        self._write_batch = write_batch
+
+    def put(self, key, value):
+        self._write_batch.put(key, value)
+
+    def delete(self, key):
+        self._write_batch.delete(key)
+
+    def clear(self):
+        self._write_batch.clear()
+
+    async def write(self):
+        await self._async_db._run(self._write_batch.write)
+
+    async def __aenter__(self):
+        self._write_batch.__enter__()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self._async_db._run(
+            self._write_batch.__exit__, exc_type, exc_val, exc_tb)
+        return False  # propagate exceptions
+
+
+class AsyncIterator(object):
+    """Asynchronous iterator that prefetches chunks of entries.
+
+    While the entries of one chunk are consumed, the next chunk is
+    already being fetched on the thread pool.
+    """
+
+    def __init__(self, async_db, iterator, chunk_size):
+        if chunk_size < 1:
+            raise ValueError("'chunk_size' must be a positive integer")
+        self._async_db = async_db
+        self._iterator = iterator
+        self._chunk_size = chunk_size
+        self._chunk = []
+        self._pos = 0
+        self._pending = None
+        self._exhausted = False
+
+    def _fetch(self):
+        return self._async_db._run(
+            self._iterator.next_chunk, self._chunk_size)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self._pos >= len(self._chunk):
+            if self._exhausted:
+                raise StopAsyncIteration
+            if self._pending is None:
+                self._pending = self._fetch()
+            self._chunk = await self._pending
+            self._pos = 0
+            self._pending = None
+            if len(self._chunk) < self._chunk_size:
+                # A short chunk means the iterator is exhausted.
+                self._exhausted = True
+            else:
+                self._pending = self._fetch()
+            if not self._chunk:
+                raise StopAsyncIteration
+
+        entry = self._chunk[self._pos]
+        self._pos += 1
+        return entry
+
+    async def close(self):
+        if self._pending is not None:
+            # Do not close the iterator while a chunk is being fetched.
+            await asyncio.wait([self._pending])
+            self._pending = None
+        self._iterator.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+        return False  # propagate exceptions
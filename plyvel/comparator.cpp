@@ -4,6 +4,8 @@
 
 #include "Python.h"
 
+#include <algorithm>
+#include <cstring>
 #include <iostream>
 
 #include <leveldb/comparator.h>
@@ -16,11 +18,16 @@ class PlyvelCallbackComparator : public leveldb::Comparator
 {
 public:
 
-    PlyvelCallbackComparator(const char* name, PyObject* comparator) :
+    PlyvelCallbackComparator(const char* name, PyObject* comparator,
+                             PyObject* separator, PyObject* successor) :
         name(name),
-        comparator(comparator)
+        comparator(comparator),
+        separator(separator == Py_None ? NULL : separator),
+        successor(successor == Py_None ? NULL : successor)
     {
         Py_INCREF(comparator);
+        Py_XINCREF(this->separator);
+        Py_XINCREF(this->successor);
         zero = PyLong_FromLong(0);
 
         /* LevelDB uses a background thread for compaction, and with custom
@@ -32,6 +39,8 @@ public:
     ~PlyvelCallbackComparator()
     {
         Py_DECREF(comparator);
+        Py_XDECREF(separator);
+        Py_XDECREF(successor);
         Py_DECREF(zero);
     }
 
@@ -92,21 +101,305 @@ public:
     }
 
     const char* Name() const { return name.c_str(); }
-    void FindShortestSeparator(std::string*, const leveldb::Slice&) const { }
-    void FindShortSuccessor(std::string*) const { }
+
+    void FindShortestSeparator(std::string* start, const leveldb::Slice& limit) const
+    {
+        PyObject* bytes_start;
+        PyObject* bytes_limit;
+        PyObject* result;
+        PyGILState_STATE gstate;
+
+        if (separator == NULL)
+            return;
+
+        gstate = PyGILState_Ensure();
+
+        bytes_start = PyBytes_FromStringAndSize(start->data(), start->size());
+        bytes_limit = PyBytes_FromStringAndSize(limit.data(), limit.size());
+
+        if ((bytes_start == NULL) || (bytes_limit == NULL)) {
+            this->bailout("Plyvel comparator could not allocate byte strings");
+        }
+
+        result = PyObject_CallFunctionObjArgs(separator, bytes_start, bytes_limit, 0);
+
+        if (result == NULL) {
+            this->bailout("Exception raised from custom Plyvel comparator separator function");
+        }
+
+        /* Only use the result if it is a valid, shorter separator, i.e.
+         * start <= result < limit. Anything else is ignored, since a bogus
+         * separator would corrupt the sstable index. */
+        if (PyBytes_Check(result)) {
+            leveldb::Slice r(PyBytes_AS_STRING(result), PyBytes_GET_SIZE(result));
+            if (r.size() < start->size()
+                    && this->Compare(*start, r) <= 0
+                    && this->Compare(r, limit) < 0) {
+                start->assign(r.data(), r.size());
+            }
+        }
+
+        Py_DECREF(result);
+        Py_DECREF(bytes_start);
+        Py_DECREF(bytes_limit);
+
+        PyGILState_Release(gstate);
+    }
+
+    void FindShortSuccessor(std::string* key) const
+    {
+        PyObject* bytes_key;
+        PyObject* result;
+        PyGILState_STATE gstate;
+
+        if (successor == NULL)
+            return;
+
+        gstate = PyGILState_Ensure();
+
+        bytes_key = PyBytes_FromStringAndSize(key->data(), key->size());
+
+        if (bytes_key == NULL) {
+            this->bailout("Plyvel comparator could not allocate byte strings");
+        }
+
+        result = PyObject_CallFunctionObjArgs(successor, bytes_key, 0);
+
+        if (result == NULL) {
+            this->bailout("Exception raised from custom Plyvel comparator successor function");
+        }
+
+        /* Only use the result if it is a valid, shorter successor, i.e.
+         * result >= key. */
+        if (PyBytes_Check(result)) {
+            leveldb::Slice r(PyBytes_AS_STRING(result), PyBytes_GET_SIZE(result));
+            if (r.size() < key->size() && this->Compare(*key, r) <= 0) {
+                key->assign(r.data(), r.size());
+            }
+        }
+
+        Py_DECREF(result);
+        Py_DECREF(bytes_key);
+
+        PyGILState_Release(gstate);
+    }
 
 private:
 
     std::string name;
     PyObject* comparator;
+    PyObject* separator;
+    PyObject* successor;
     PyObject* zero;
 };
 
 
 /*
- * This function is the only API used by the Plyvel Cython code.
+ * Native comparators that never call into Python code.
  */
-leveldb::Comparator* NewPlyvelCallbackComparator(const char* name, PyObject* comparator)
+
+static int CompareBytewise(const char* a, size_t a_len, const char* b, size_t b_len)
+{
+    const size_t min_len = (a_len < b_len) ? a_len : b_len;
+    int r = memcmp(a, b, min_len);
+    if (r == 0) {
+        if (a_len < b_len) {
+            r = -1;
+        } else if (a_len > b_len) {
+            r = +1;
+        }
+    }
+    return r;
+}
+
+
+class PlyvelNativeComparator : public leveldb::Comparator
+{
+public:
+    void FindShortestSeparator(std::string*, const leveldb::Slice&) const { }
+    void FindShortSuccessor(std::string*) const { }
+};
+
+
+/* Reverse bytewise order. */
+class ReverseBytewiseComparator : public PlyvelNativeComparator
+{
+public:
+    int Compare(const leveldb::Slice& a, const leveldb::Slice& b) const
+    {
+        return -a.compare(b);
+    }
+
+    void FindShortestSeparator(std::string* start, const leveldb::Slice& limit) const
+    {
+        /* Here start >= limit in bytewise order. The shortest prefix of
+         * start that differs from limit is still greater than limit. */
+        const size_t min_len = std::min(start->size(), limit.size());
+        size_t diff_index = 0;
+        while (diff_index < min_len && (*start)[diff_index] == limit[diff_index])
+            diff_index++;
+
+        if (diff_index >= start->size())
+            return;  /* start is a prefix of (or equal to) limit */
+
+        if (diff_index + 1 < start->size())
+            start->resize(diff_index + 1);
+    }
+
+    void FindShortSuccessor(std::string* key) const
+    {
+        /* Any prefix of key sorts at or after key. */
+        if (key->size() > 1)
+            key->resize(1);
+    }
+
+    const char* Name() const { return "plyvel.ReverseBytewiseComparator"; }
+};
+
+
+/* Keys are big-endian unsigned integers of arbitrary length. Leading
+ * zero bytes do not affect the numeric value; keys with the same value
+ * are ordered by length, so that distinct keys never compare equal. */
+class BigEndianUIntComparator : public PlyvelNativeComparator
+{
+public:
+    int Compare(const leveldb::Slice& a, const leveldb::Slice& b) const
+    {
+        size_t a_skip = 0, b_skip = 0;
+        while (a_skip < a.size() && a[a_skip] == '\0')
+            a_skip++;
+        while (b_skip < b.size() && b[b_skip] == '\0')
+            b_skip++;
+
+        const size_t a_len = a.size() - a_skip;
+        const size_t b_len = b.size() - b_skip;
+        if (a_len != b_len)
+            return (a_len < b_len) ? -1 : +1;
+
+        int r = memcmp(a.data() + a_skip, b.data() + b_skip, a_len);
+        if (r == 0 && a.size() != b.size())
+            r = (a.size() < b.size()) ? -1 : +1;
+        return r;
+    }
+
+    const char* Name() const { return "plyvel.BigEndianUIntComparator"; }
+};
+
+
+/* Shorter keys sort first; keys of the same length sort bytewise. This
+ * is the same order as bytewise ordering of keys prefixed by their
+ * (fixed width, big-endian) length. */
+class LengthPrefixedComparator : public PlyvelNativeComparator
+{
+public:
+    int Compare(const leveldb::Slice& a, const leveldb::Slice& b) const
+    {
+        if (a.size() != b.size())
+            return (a.size() < b.size()) ? -1 : +1;
+        return memcmp(a.data(), b.data(), a.size());
+    }
+
+    const char* Name() const { return "plyvel.LengthPrefixedComparator"; }
+};
+
+
+/* Keys are tuples of byte strings, each encoded as a varint32 length
+ * followed by the data (like LevelDB's length-prefixed slices). Tuples
+ * are compared element by element, using bytewise ordering for the
+ * elements; a tuple sorts before any longer tuple it is a prefix of.
+ *
+ * Malformed input must still be totally ordered. Everything from the
+ * point where decoding fails is treated as a final, malformed element,
+ * which sorts after any well-formed element; malformed elements are
+ * compared bytewise. Varints must use the shortest encoding, so that
+ * distinct keys never compare equal. */
+class TupleComparator : public PlyvelNativeComparator
+{
+public:
+    int Compare(const leveldb::Slice& a, const leveldb::Slice& b) const
+    {
+        const char* p = a.data();
+        const char* p_limit = p + a.size();
+        const char* q = b.data();
+        const char* q_limit = q + b.size();
+
+        while (p < p_limit && q < q_limit) {
+            const char* p_elem;
+            const char* q_elem;
+            uint32_t p_len, q_len;
+
+            const bool p_ok = DecodeElement(p, p_limit, &p_elem, &p_len);
+            const bool q_ok = DecodeElement(q, q_limit, &q_elem, &q_len);
+            if (!p_ok || !q_ok) {
+                if (p_ok)
+                    return -1;
+                if (q_ok)
+                    return +1;
+                return CompareBytewise(p, p_limit - p, q, q_limit - q);
+            }
+
+            int r = CompareBytewise(p_elem, p_len, q_elem, q_len);
+            if (r != 0)
+                return r;
+
+            p = p_elem + p_len;
+            q = q_elem + q_len;
+        }
+
+        if (p < p_limit)
+            return +1;
+        if (q < q_limit)
+            return -1;
+        return 0;
+    }
+
+    const char* Name() const { return "plyvel.TupleComparator"; }
+
+private:
+
+    static bool DecodeElement(const char* p, const char* limit,
+                              const char** elem, uint32_t* len)
+    {
+        uint32_t result = 0;
+        for (uint32_t shift = 0; shift <= 28 && p < limit; shift += 7) {
+            uint32_t byte = static_cast<unsigned char>(*p++);
+            if (byte & 128) {
+                result |= ((byte & 127) << shift);
+            } else {
+                /* Reject overlong encodings and values beyond 32 bits */
+                if ((byte == 0 && shift > 0) || (shift == 28 && byte > 15))
+                    return false;
+                result |= (byte << shift);
+                if (result > static_cast<size_t>(limit - p))
+                    return false;
+                *elem = p;
+                *len = result;
+                return true;
+            }
+        }
+        return false;
+    }
+};
+
+
+/*
+ * These functions are the only API used by the Plyvel Cython code.
+ */
+leveldb::Comparator* NewPlyvelCallbackComparator(const char* name, PyObject* comparator,
+                                                 PyObject* separator, PyObject* successor)
+{
+    return new PlyvelCallbackComparator(name, comparator, separator, successor);
+}
+
+leveldb::Comparator* NewPlyvelNativeComparator(const char* name)
 {
-    return new PlyvelCallbackComparator(name, comparator);
+    if (strcmp(name, "reverse-bytewise") == 0)
+        return new ReverseBytewiseComparator();
+    if (strcmp(name, "big-endian-uint") == 0)
+        return new BigEndianUIntComparator();
+    if (strcmp(name, "length-prefixed") == 0)
+        return new LengthPrefixedComparator();
+    if (strcmp(name, "tuple") == 0)
+        return new TupleComparator();
+    return NULL;
 }
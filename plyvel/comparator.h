@@ -3,6 +3,8 @@
 
 #include <leveldb/comparator.h>
 
-leveldb::Comparator* NewPlyvelCallbackComparator(const char* name, PyObject* comparator);
+leveldb::Comparator* NewPlyvelCallbackComparator(const char* name, PyObject* comparator,
+                                                 PyObject* separator, PyObject* successor);
+leveldb::Comparator* NewPlyvelNativeComparator(const char* name);
 
 #endif
@@ -6,4 +6,6 @@ from leveldb cimport Comparator
 
 cdef extern from "comparator.h":
 
-    Comparator* NewPlyvelCallbackComparator(const_char* name, object comparator) nogil
+    Comparator* NewPlyvelCallbackComparator(const_char* name, object comparator,
+                                            object separator, object successor) nogil
+    Comparator* NewPlyvelNativeComparator(const_char* name) nogil
@@ -0,0 +1,260 @@
+/*
+ * Custom LevelDB environment for Plyvel.
+ *
+ * This wraps the default environment, and adds a pool of background
+ * threads for compactions, and a token bucket that limits the I/O
+ * bandwidth of these background threads. I/O from other threads (i.e.
+ * reads and writes by the application) is never throttled.
+ */
+
+#include "env.h"
+
+
+namespace {
+
+/* Whether the current thread is a PlyvelEnv background thread. */
+thread_local bool in_background_thread = false;
+
+/* Maximum burst size, expressed as the amount of I/O allowed in this
+ * many microseconds. */
+const uint64_t kBurstMicros = 100000;
+
+
+class RateLimitedRandomAccessFile : public leveldb::RandomAccessFile
+{
+public:
+
+    RateLimitedRandomAccessFile(PlyvelEnv* env,
+                                leveldb::RandomAccessFile* target)
+        : env(env), target(target) {}
+
+    ~RateLimitedRandomAccessFile()
+    {
+        delete target;
+    }
+
+    leveldb::Status Read(uint64_t offset, size_t n, leveldb::Slice* result,
+                         char* scratch) const
+    {
+        if (in_background_thread) {
+            env->RequestIO(n, false);
+        }
+        return target->Read(offset, n, result, scratch);
+    }
+
+private:
+
+    PlyvelEnv* env;
+    leveldb::RandomAccessFile* target;
+};
+
+
+class RateLimitedWritableFile : public leveldb::WritableFile
+{
+public:
+
+    RateLimitedWritableFile(PlyvelEnv* env, leveldb::WritableFile* target)
+        : env(env), target(target) {}
+
+    ~RateLimitedWritableFile()
+    {
+        delete target;
+    }
+
+    leveldb::Status Append(const leveldb::Slice& data)
+    {
+        if (in_background_thread) {
+            env->RequestIO(data.size(), true);
+        }
+        return target->Append(data);
+    }
+
+    leveldb::Status Close()
+    {
+        return target->Close();
+    }
+
+    leveldb::Status Flush()
+    {
+        return target->Flush();
+    }
+
+    leveldb::Status Sync()
+    {
+        return target->Sync();
+    }
+
+private:
+
+    PlyvelEnv* env;
+    leveldb::WritableFile* target;
+};
+
+}  // namespace
+
+
+PlyvelEnv::PlyvelEnv(int background_threads, uint64_t bytes_per_second)
+    : leveldb::EnvWrapper(leveldb::Env::Default()),
+      background_threads(background_threads),
+      shutting_down(false),
+      bytes_per_second(bytes_per_second),
+      available(0),
+      last_refill(0),
+      bytes_read(0),
+      bytes_written(0),
+      throttled_micros(0)
+{
+}
+
+
+PlyvelEnv::~PlyvelEnv()
+{
+    {
+        std::lock_guard<std::mutex> lock(queue_mutex);
+        shutting_down = true;
+    }
+    queue_cond.notify_all();
+    for (size_t i = 0; i < threads.size(); i++) {
+        threads[i].join();
+    }
+}
+
+
+leveldb::Status PlyvelEnv::NewRandomAccessFile(
+    const std::string& fname, leveldb::RandomAccessFile** result)
+{
+    leveldb::Status st = target()->NewRandomAccessFile(fname, result);
+    if (st.ok()) {
+        *result = new RateLimitedRandomAccessFile(this, *result);
+    }
+    return st;
+}
+
+
+leveldb::Status PlyvelEnv::NewWritableFile(const std::string& fname,
+                                           leveldb::WritableFile** result)
+{
+    leveldb::Status st = target()->NewWritableFile(fname, result);
+    if (st.ok()) {
+        *result = new RateLimitedWritableFile(this, *result);
+    }
+    return st;
+}
+
+
+leveldb::Status PlyvelEnv::NewAppendableFile(const std::string& fname,
+                                             leveldb::WritableFile** result)
+{
+    leveldb::Status st = target()->NewAppendableFile(fname, result);
+    if (st.ok()) {
+        *result = new RateLimitedWritableFile(this, *result);
+    }
+    return st;
+}
+
+
+void PlyvelEnv::Schedule(void (*function)(void* arg), void* arg)
+{
+    std::lock_guard<std::mutex> lock(queue_mutex);
+
+    // Threads are started lazily, like the default environment does.
+    if (threads.empty()) {
+        for (int i = 0; i < background_threads; i++) {
+            threads.push_back(std::thread(&PlyvelEnv::BackgroundThread, this));
+        }
+    }
+
+    queue.push_back(std::make_pair(function, arg));
+    queue_cond.notify_one();
+}
+
+
+void PlyvelEnv::BackgroundThread()
+{
+    in_background_thread = true;
+
+    while (true) {
+        std::unique_lock<std::mutex> lock(queue_mutex);
+        while (queue.empty() && !shutting_down) {
+            queue_cond.wait(lock);
+        }
+        if (queue.empty()) {
+            return;  // shutting down
+        }
+        void (*function)(void*) = queue.front().first;
+        void* arg = queue.front().second;
+        queue.pop_front();
+        lock.unlock();
+
+        function(arg);
+    }
+}
+
+
+void PlyvelEnv::SetRateLimit(uint64_t bytes_per_second)
+{
+    std::lock_guard<std::mutex> lock(limiter_mutex);
+    this->bytes_per_second = bytes_per_second;
+    available = 0;
+    last_refill = NowMicros();
+}
+
+
+uint64_t PlyvelEnv::RateLimit()
+{
+    std::lock_guard<std::mutex> lock(limiter_mutex);
+    return bytes_per_second;
+}
+
+
+/*
+ * Account for `n` bytes of background I/O, and sleep if this exceeds
+ * the rate limit. Requests larger than the available tokens are never
+ * split; instead, the bucket goes into debt, and the caller sleeps
+ * until that debt has been paid off.
+ */
+void PlyvelEnv::RequestIO(size_t n, bool write)
+{
+    uint64_t wait_micros = 0;
+    {
+        std::lock_guard<std::mutex> lock(limiter_mutex);
+        if (write) {
+            bytes_written += n;
+        } else {
+            bytes_read += n;
+        }
+        if (bytes_per_second == 0) {
+            return;
+        }
+
+        uint64_t now = NowMicros();
+        double burst = (double) bytes_per_second * kBurstMicros / 1e6;
+        if (now > last_refill) {
+            available += (double) bytes_per_second * (now - last_refill) / 1e6;
+            if (available > burst) {
+                available = burst;
+            }
+        }
+        last_refill = now;
+
+        available -= n;
+        if (available < 0) {
+            wait_micros = (uint64_t) (-available * 1e6 / bytes_per_second);
+            throttled_micros += wait_micros;
+        }
+    }
+
+    if (wait_micros > 0) {
+        SleepForMicroseconds((int) wait_micros);
+    }
+}
+
+
+void PlyvelEnv::GetStats(uint64_t* bytes_read, uint64_t* bytes_written,
+                         uint64_t* throttled_micros)
+{
+    std::lock_guard<std::mutex> lock(limiter_mutex);
+    *bytes_read = this->bytes_read;
+    *bytes_written = this->bytes_written;
+    *throttled_micros = this->throttled_micros;
+}
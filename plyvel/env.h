@@ -0,0 +1,59 @@
+#ifndef PLYVEL_ENV_H
+#define PLYVEL_ENV_H
+
+#include <stdint.h>
+#include <condition_variable>
+#include <deque>
+#include <mutex>
+#include <string>
+#include <thread>
+#include <utility>
+#include <vector>
+
+#include <leveldb/env.h>
+#include <leveldb/status.h>
+
+class PlyvelEnv : public leveldb::EnvWrapper
+{
+public:
+
+    PlyvelEnv(int background_threads, uint64_t bytes_per_second);
+    ~PlyvelEnv();
+
+    leveldb::Status NewRandomAccessFile(const std::string& fname,
+                                        leveldb::RandomAccessFile** result);
+    leveldb::Status NewWritableFile(const std::string& fname,
+                                    leveldb::WritableFile** result);
+    leveldb::Status NewAppendableFile(const std::string& fname,
+                                      leveldb::WritableFile** result);
+    void Schedule(void (*function)(void* arg), void* arg);
+
+    void SetRateLimit(uint64_t bytes_per_second);
+    uint64_t RateLimit();
+    void RequestIO(size_t n, bool write);
+    void GetStats(uint64_t* bytes_read, uint64_t* bytes_written,
+                  uint64_t* throttled_micros);
+
+private:
+
+    void BackgroundThread();
+
+    // Background work queue
+    int background_threads;
+    std::mutex queue_mutex;
+    std::condition_variable queue_cond;
+    std::deque<std::pair<void (*)(void*), void*> > queue;
+    std::vector<std::thread> threads;
+    bool shutting_down;
+
+    // Token bucket for background I/O
+    std::mutex limiter_mutex;
+    uint64_t bytes_per_second;
+    double available;
+    uint64_t last_refill;
+    uint64_t bytes_read;
+    uint64_t bytes_written;
+    uint64_t throttled_micros;
+};
+
+#endif
@@ -0,0 +1,15 @@
+# distutils: language = c++
+
+from libc.stdint cimport uint64_t
+from libcpp cimport bool
+
+from leveldb cimport Env
+
+cdef extern from "env.h":
+
+    cdef cppclass PlyvelEnv(Env):
+        PlyvelEnv(int background_threads, uint64_t bytes_per_second) nogil
+        void SetRateLimit(uint64_t bytes_per_second) nogil
+        uint64_t RateLimit() nogil
+        void GetStats(uint64_t* bytes_read, uint64_t* bytes_written,
+                      uint64_t* throttled_micros) nogil
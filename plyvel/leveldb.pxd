@@ -62,7 +62,7 @@ cdef extern from "leveldb/options.h" namespace "leveldb":
         bool create_if_missing
         bool error_if_exists
         bool paranoid_checks
-        # Env* env
+        Env* env
         # Logger* info_log
         size_t write_buffer_size
         int max_open_files
@@ -71,6 +71,7 @@ cdef extern from "leveldb/options.h" namespace "leveldb":
         int block_restart_interval
         size_t max_file_size
         CompressionType compression
+        bool reuse_logs
         FilterPolicy* filter_policy
         Options() nogil
 
@@ -138,6 +139,14 @@ cdef extern from "leveldb/comparator.h" namespace "leveldb":
     Comparator* BytewiseComparator() nogil
 
 
+cdef extern from "leveldb/env.h" namespace "leveldb":
+
+    cdef cppclass Env:
+        uint64_t NowMicros() nogil
+
+    Env* Env_Default "leveldb::Env::Default"() nogil
+
+
 cdef extern from "leveldb/filter_policy.h" namespace "leveldb":
 
     cdef cppclass FilterPolicy:
@@ -151,7 +160,7 @@ cdef extern from "leveldb/filter_policy.h" namespace "leveldb":
 cdef extern from "leveldb/cache.h" namespace "leveldb":
 
     cdef cppclass Cache:
-        # Treat as opaque structure
-        pass
+        void Prune() nogil
+        size_t TotalCharge() nogil
 
     Cache* NewLRUCache(size_t capacity) nogil
@@ -0,0 +1,72 @@
+/*
+ * Support code for reading the key range of a LevelDB table file.
+ *
+ * The "leveldb.sstables" property describes the key range of each
+ * table file, but it only escapes non-printable bytes, so keys that
+ * contain literal escape sequences cannot be decoded reliably. Reading
+ * the first and last key of the (immutable) table file itself gives
+ * the exact range.
+ */
+
+#include "table_reader.h"
+
+#include <leveldb/iterator.h>
+#include <leveldb/options.h>
+#include <leveldb/table.h>
+
+
+namespace {
+
+/* Table files contain "internal keys": the user key, followed by a
+ * fixed 64-bit trailer with a sequence number and a value type. */
+const size_t kTrailerSize = 8;
+
+
+leveldb::Status ExtractUserKey(const leveldb::Iterator* it, std::string* key)
+{
+    if (!it->Valid()) {
+        if (!it->status().ok())
+            return it->status();
+        return leveldb::Status::Corruption("empty table file");
+    }
+    leveldb::Slice internal_key = it->key();
+    if (internal_key.size() < kTrailerSize)
+        return leveldb::Status::Corruption("malformed internal key");
+    key->assign(internal_key.data(), internal_key.size() - kTrailerSize);
+    return leveldb::Status::OK();
+}
+
+}  // namespace
+
+
+leveldb::Status ReadTableKeyRange(leveldb::Env* env, const std::string& fname,
+                                  uint64_t file_size, std::string* smallest,
+                                  std::string* largest)
+{
+    leveldb::RandomAccessFile* file = NULL;
+    leveldb::Status st = env->NewRandomAccessFile(fname, &file);
+    if (!st.ok())
+        return st;
+
+    // Seeking to the first or last entry does not compare keys, so the
+    // default options (and comparator) suffice.
+    leveldb::Options options;
+    options.env = env;
+    leveldb::Table* table = NULL;
+    st = leveldb::Table::Open(options, file, file_size, &table);
+    if (st.ok()) {
+        leveldb::ReadOptions read_options;
+        read_options.fill_cache = false;
+        leveldb::Iterator* it = table->NewIterator(read_options);
+        it->SeekToFirst();
+        st = ExtractUserKey(it, smallest);
+        if (st.ok()) {
+            it->SeekToLast();
+            st = ExtractUserKey(it, largest);
+        }
+        delete it;
+        delete table;
+    }
+    delete file;
+    return st;
+}
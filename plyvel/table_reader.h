@@ -0,0 +1,14 @@
+#ifndef PLYVEL_TABLE_READER_H
+#define PLYVEL_TABLE_READER_H
+
+#include <stdint.h>
+#include <string>
+
+#include <leveldb/env.h>
+#include <leveldb/status.h>
+
+leveldb::Status ReadTableKeyRange(leveldb::Env* env, const std::string& fname,
+                                  uint64_t file_size, std::string* smallest,
+                                  std::string* largest);
+
+#endif
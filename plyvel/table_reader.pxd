@@ -0,0 +1,11 @@
+# distutils: language = c++
+
+from libc.stdint cimport uint64_t
+from libcpp.string cimport string
+
+from leveldb cimport Env, Status
+
+cdef extern from "table_reader.h":
+
+    Status ReadTableKeyRange(Env* env, string& fname, uint64_t file_size,
+                             string* smallest, string* largest) nogil
@@ -0,0 +1,287 @@
+/*
+ * Support code for writing LevelDB table files directly (bulk loading).
+ *
+ * LevelDB stores "internal keys" in its table files: the user key,
+ * followed by a fixed 64-bit trailer with a sequence number and a value
+ * type. The table files written here use the same format, so that
+ * leveldb::RepairDB() can register them in a new manifest afterwards.
+ */
+
+#include <cstdio>
+#include <vector>
+
+#include "table_writer.h"
+
+
+namespace {
+
+/* Same values as used by LevelDB itself (see db/dbformat.h). */
+const uint64_t kMaxSequenceNumber = ((uint64_t) 1 << 56) - 1;
+const uint64_t kTypeValue = 1;
+const uint64_t kValueTypeForSeek = kTypeValue;
+
+/* All entries are written with this sequence number. */
+const uint64_t kBulkLoadSequenceNumber = 1;
+
+
+void AppendTrailer(std::string* dst, uint64_t sequence, uint64_t type)
+{
+    uint64_t packed = (sequence << 8) | type;
+    char buf[8];
+    for (int i = 0; i < 8; i++) {
+        buf[i] = (char) ((packed >> (8 * i)) & 0xff);
+    }
+    dst->append(buf, 8);
+}
+
+
+uint64_t DecodeTrailer(const leveldb::Slice& internal_key)
+{
+    const unsigned char* p = (const unsigned char*)
+        internal_key.data() + internal_key.size() - 8;
+    uint64_t result = 0;
+    for (int i = 7; i >= 0; i--) {
+        result = (result << 8) | p[i];
+    }
+    return result;
+}
+
+
+leveldb::Slice ExtractUserKey(const leveldb::Slice& internal_key)
+{
+    return leveldb::Slice(internal_key.data(), internal_key.size() - 8);
+}
+
+
+/* Equivalent of leveldb::InternalKeyComparator. */
+class InternalKeyComparator : public leveldb::Comparator
+{
+public:
+
+    InternalKeyComparator(const leveldb::Comparator* user_comparator) :
+        user_comparator(user_comparator) {}
+
+    int Compare(const leveldb::Slice& a, const leveldb::Slice& b) const
+    {
+        int r = user_comparator->Compare(ExtractUserKey(a), ExtractUserKey(b));
+        if (r == 0) {
+            // Higher sequence numbers sort first
+            uint64_t a_trailer = DecodeTrailer(a);
+            uint64_t b_trailer = DecodeTrailer(b);
+            if (a_trailer > b_trailer) {
+                r = -1;
+            } else if (a_trailer < b_trailer) {
+                r = +1;
+            }
+        }
+        return r;
+    }
+
+    const char* Name() const
+    {
+        return "leveldb.InternalKeyComparator";
+    }
+
+    void FindShortestSeparator(std::string* start,
+                               const leveldb::Slice& limit) const
+    {
+        leveldb::Slice user_start = ExtractUserKey(*start);
+        leveldb::Slice user_limit = ExtractUserKey(limit);
+        std::string tmp(user_start.data(), user_start.size());
+        user_comparator->FindShortestSeparator(&tmp, user_limit);
+        if (tmp.size() < user_start.size() &&
+            user_comparator->Compare(user_start, tmp) < 0) {
+            AppendTrailer(&tmp, kMaxSequenceNumber, kValueTypeForSeek);
+            start->swap(tmp);
+        }
+    }
+
+    void FindShortSuccessor(std::string* key) const
+    {
+        leveldb::Slice user_key = ExtractUserKey(*key);
+        std::string tmp(user_key.data(), user_key.size());
+        user_comparator->FindShortSuccessor(&tmp);
+        if (tmp.size() < user_key.size() &&
+            user_comparator->Compare(user_key, tmp) < 0) {
+            AppendTrailer(&tmp, kMaxSequenceNumber, kValueTypeForSeek);
+            key->swap(tmp);
+        }
+    }
+
+private:
+
+    const leveldb::Comparator* user_comparator;
+};
+
+
+/* Equivalent of leveldb::InternalFilterPolicy. */
+class InternalFilterPolicy : public leveldb::FilterPolicy
+{
+public:
+
+    InternalFilterPolicy(const leveldb::FilterPolicy* user_policy) :
+        user_policy(user_policy) {}
+
+    const char* Name() const
+    {
+        return user_policy->Name();
+    }
+
+    void CreateFilter(const leveldb::Slice* keys, int n,
+                      std::string* dst) const
+    {
+        std::vector<leveldb::Slice> user_keys(n);
+        for (int i = 0; i < n; i++) {
+            user_keys[i] = ExtractUserKey(keys[i]);
+        }
+        user_policy->CreateFilter(n > 0 ? &user_keys[0] : NULL, n, dst);
+    }
+
+    bool KeyMayMatch(const leveldb::Slice& key,
+                     const leveldb::Slice& filter) const
+    {
+        return user_policy->KeyMayMatch(ExtractUserKey(key), filter);
+    }
+
+private:
+
+    const leveldb::FilterPolicy* user_policy;
+};
+
+}  // namespace
+
+
+PlyvelTableWriter::PlyvelTableWriter(const std::string& dbname,
+                                     const leveldb::Options& options) :
+    dbname(dbname),
+    options(options),
+    user_comparator(options.comparator),
+    internal_comparator(new InternalKeyComparator(options.comparator)),
+    internal_filter_policy(NULL),
+    env(leveldb::Env::Default()),
+    file(NULL),
+    builder(NULL),
+    num_files(0),
+    num_entries(0),
+    has_last_key(false)
+{
+    this->options.comparator = internal_comparator;
+    if (options.filter_policy != NULL) {
+        internal_filter_policy = new InternalFilterPolicy(options.filter_policy);
+        this->options.filter_policy = internal_filter_policy;
+    }
+}
+
+
+PlyvelTableWriter::~PlyvelTableWriter()
+{
+    if (builder != NULL) {
+        builder->Abandon();
+        delete builder;
+    }
+    delete file;
+    delete internal_comparator;
+    delete internal_filter_policy;
+}
+
+
+leveldb::Status PlyvelTableWriter::Open()
+{
+    env->CreateDir(dbname);  // Ignore error, like leveldb::DB::Open() does
+    std::vector<std::string> children;
+    leveldb::Status st = env->GetChildren(dbname, &children);
+    if (!st.ok()) {
+        return st;
+    }
+    for (size_t i = 0; i < children.size(); i++) {
+        if (children[i] != "." && children[i] != "..") {
+            return leveldb::Status::InvalidArgument(
+                dbname, "exists (bulk loading requires a new database)");
+        }
+    }
+    return st;
+}
+
+
+bool PlyvelTableWriter::InOrder(const leveldb::Slice& key) const
+{
+    return !has_last_key || user_comparator->Compare(last_key, key) < 0;
+}
+
+
+leveldb::Status PlyvelTableWriter::Add(const leveldb::Slice& key,
+                                       const leveldb::Slice& value)
+{
+    leveldb::Status st;
+    if (builder == NULL) {
+        st = NewTable();
+        if (!st.ok()) {
+            return st;
+        }
+    }
+
+    last_key.assign(key.data(), key.size());
+    has_last_key = true;
+    internal_key.assign(key.data(), key.size());
+    AppendTrailer(&internal_key, kBulkLoadSequenceNumber, kTypeValue);
+    builder->Add(internal_key, value);
+    num_entries++;
+
+    if (builder->FileSize() >= options.max_file_size) {
+        st = FinishTable();
+    }
+    return st;
+}
+
+
+leveldb::Status PlyvelTableWriter::Finish()
+{
+    if (builder == NULL) {
+        return leveldb::Status::OK();
+    }
+    return FinishTable();
+}
+
+
+uint64_t PlyvelTableWriter::NumEntries() const
+{
+    return num_entries;
+}
+
+
+uint64_t PlyvelTableWriter::NumFiles() const
+{
+    return num_files;
+}
+
+
+leveldb::Status PlyvelTableWriter::NewTable()
+{
+    // Table files are numbered from 1; leveldb::RepairDB() continues
+    // with the next number for the files it creates itself.
+    char buf[100];
+    snprintf(buf, sizeof(buf), "/%06llu.ldb",
+             (unsigned long long) ++num_files);
+    leveldb::Status st = env->NewWritableFile(dbname + buf, &file);
+    if (st.ok()) {
+        builder = new leveldb::TableBuilder(options, file);
+    }
+    return st;
+}
+
+
+leveldb::Status PlyvelTableWriter::FinishTable()
+{
+    leveldb::Status st = builder->Finish();
+    delete builder;
+    builder = NULL;
+    if (st.ok()) {
+        st = file->Sync();
+    }
+    if (st.ok()) {
+        st = file->Close();
+    }
+    delete file;
+    file = NULL;
+    return st;
+}
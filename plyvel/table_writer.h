@@ -0,0 +1,50 @@
+#ifndef PLYVEL_TABLE_WRITER_H
+#define PLYVEL_TABLE_WRITER_H
+
+#include <stdint.h>
+#include <string>
+
+#include <leveldb/comparator.h>
+#include <leveldb/env.h>
+#include <leveldb/filter_policy.h>
+#include <leveldb/options.h>
+#include <leveldb/slice.h>
+#include <leveldb/status.h>
+#include <leveldb/table_builder.h>
+
+class PlyvelTableWriter
+{
+public:
+
+    PlyvelTableWriter(const std::string& dbname,
+                      const leveldb::Options& options);
+    ~PlyvelTableWriter();
+
+    leveldb::Status Open();
+    bool InOrder(const leveldb::Slice& key) const;
+    leveldb::Status Add(const leveldb::Slice& key, const leveldb::Slice& value);
+    leveldb::Status Finish();
+    uint64_t NumEntries() const;
+    uint64_t NumFiles() const;
+
+private:
+
+    leveldb::Status NewTable();
+    leveldb::Status FinishTable();
+
+    std::string dbname;
+    leveldb::Options options;
+    const leveldb::Comparator* user_comparator;
+    leveldb::Comparator* internal_comparator;
+    leveldb::FilterPolicy* internal_filter_policy;
+    leveldb::Env* env;
+    leveldb::WritableFile* file;
+    leveldb::TableBuilder* builder;
+    uint64_t num_files;
+    uint64_t num_entries;
+    std::string last_key;
+    bool has_last_key;
+    std::string internal_key;
+};
+
+#endif
@@ -0,0 +1,18 @@
+# distutils: language = c++
+
+from libc.stdint cimport uint64_t
+from libcpp cimport bool
+from libcpp.string cimport string
+
+from leveldb cimport Options, Slice, Status
+
+cdef extern from "table_writer.h":
+
+    cdef cppclass PlyvelTableWriter:
+        PlyvelTableWriter(string& dbname, Options& options) nogil
+        Status Open() nogil
+        bool InOrder(Slice& key) nogil
+        Status Add(Slice& key, Slice& value) nogil
+        Status Finish() nogil
+        uint64_t NumEntries() nogil
+        uint64_t NumFiles() nogil
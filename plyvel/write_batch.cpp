@@ -0,0 +1,43 @@
+/*
+ * Write batch support code for Plyvel.
+ */
+
+#include <leveldb/slice.h>
+#include <leveldb/status.h>
+#include <leveldb/write_batch.h>
+
+#include "write_batch.h"
+
+
+/*
+ * LevelDB does not offer a public API to concatenate write batches, so
+ * this replays all updates from one batch into another one instead.
+ */
+class AppendHandler : public leveldb::WriteBatch::Handler
+{
+public:
+
+    AppendHandler(leveldb::WriteBatch* dst) : dst(dst) {}
+
+    void Put(const leveldb::Slice& key, const leveldb::Slice& value)
+    {
+        dst->Put(key, value);
+    }
+
+    void Delete(const leveldb::Slice& key)
+    {
+        dst->Delete(key);
+    }
+
+private:
+
+    leveldb::WriteBatch* dst;
+};
+
+
+leveldb::Status AppendWriteBatch(leveldb::WriteBatch* dst,
+                                 const leveldb::WriteBatch* src)
+{
+    AppendHandler handler(dst);
+    return src->Iterate(&handler);
+}
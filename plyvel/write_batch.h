@@ -0,0 +1,10 @@
+#ifndef PLYVEL_WRITE_BATCH_H
+#define PLYVEL_WRITE_BATCH_H
+
+#include <leveldb/status.h>
+#include <leveldb/write_batch.h>
+
+leveldb::Status AppendWriteBatch(leveldb::WriteBatch* dst,
+                                 const leveldb::WriteBatch* src);
+
+#endif
@@ -0,0 +1,7 @@
+# distutils: language = c++
+
+from leveldb cimport Status, WriteBatch
+
+cdef extern from "write_batch.h":
+
+    Status AppendWriteBatch(WriteBatch* dst, const WriteBatch* src) nogil
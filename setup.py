@@ -14,14 +14,16 @@ def get_file_contents(filename):
         return fp.read()
 
 
-extra_compile_args = ['-Wall', '-g']
+extra_compile_args = ['-Wall', '-g', '-std=c++11']
 if platform.system() == 'Darwin':
     extra_compile_args += ['-mmacosx-version-min=10.7', '-stdlib=libc++']
 
 ext_modules = [
     Extension(
         'plyvel._plyvel',
-        sources=['plyvel/_plyvel.cpp', 'plyvel/comparator.cpp'],
+        sources=['plyvel/_plyvel.cpp', 'plyvel/comparator.cpp',
+                 'plyvel/env.cpp', 'plyvel/table_reader.cpp',
+                 'plyvel/table_writer.cpp', 'plyvel/write_batch.cpp'],
         libraries=['leveldb'],
         extra_compile_args=extra_compile_args,
     )
@@ -0,0 +1,6 @@
+import sys
+
+# The asyncio tests use syntax that older Python versions cannot parse.
+collect_ignore = []
+if sys.version_info < (3, 7):
+    collect_ignore.append('test_aio.py')
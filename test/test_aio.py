@@ -0,0 +1,103 @@
+# encoding: UTF-8
+
+"""
+Tests for the asyncio front-end.
+
+This module uses async/await syntax, so it is not collected on Python
+versions older than 3.7; see conftest.py.
+"""
+
+import asyncio
+import shutil
+import tempfile
+
+import pytest
+
+import plyvel
+import plyvel.aio
+
+
+#
+# Fixtures
+#
+
+@pytest.fixture
+def db(request):
+    name = tempfile.mkdtemp()
+    db = plyvel.DB(name, create_if_missing=True, error_if_exists=True)
+
+    def finalize():
+        db.close()
+        shutil.rmtree(name)
+
+    request.addfinalizer(finalize)
+    return db
+
+
+#
+# Actual tests
+#
+
+def test_aio(db):
+    loop = asyncio.new_event_loop()
+    run = loop.run_until_complete
+    adb = plyvel.aio.AsyncDB(db, max_workers=2)
+
+    # Basic operations
+    assert run(adb.get(b'a')) is None
+    assert run(adb.get(b'a', b'default')) == b'default'
+    run(adb.put(b'a', b'1'))
+    run(adb.put(b'b', b'2', sync=True))
+    assert run(adb.get(b'a')) == b'1'
+    assert run(adb.get_many(iter([b'a', b'b', b'c']))) == [b'1', b'2', None]
+    run(adb.delete(b'a'))
+    assert run(adb.get(b'a', fill_cache=False)) is None
+    with pytest.raises(TypeError):
+        run(adb.get('a'))
+
+    # Write batches
+    wb = adb.write_batch()
+    for i in range(100):
+        wb.put('{0:03d}'.format(i).encode('ascii'), b'')
+    wb.delete(b'b')
+    run(wb.write())
+    assert db.get(b'099') == b''
+    assert db.get(b'b') is None
+
+    async def transaction():
+        async with adb.write_batch(transaction=True) as wb:
+            wb.put(b'never', b'')
+            raise ValueError()
+
+    with pytest.raises(ValueError):
+        run(transaction())
+    assert db.get(b'never') is None
+
+    # Iterators
+    async def collect(it):
+        out = []
+        async with it:
+            async for entry in it:
+                out.append(entry)
+        return out
+
+    expected = list(db.iterator(include_value=False))
+    for chunk_size in (1, 7, 100, 1000):
+        it = adb.iterator(chunk_size=chunk_size, include_value=False)
+        assert run(collect(it)) == expected
+    it = adb.iterator(reverse=True, start=b'090', chunk_size=3)
+    assert [k for k, v in run(collect(it))] == expected[90:][::-1]
+    assert len(run(collect(adb.__aiter__()))) == 100
+    with pytest.raises(ValueError):
+        adb.iterator(chunk_size=0)
+
+    # Prefixed databases
+    adb_p = plyvel.aio.AsyncDB(db.prefixed_db(b'09'))
+    assert run(adb_p.get(b'9')) == b''
+    assert len(run(collect(adb_p.iterator()))) == 10
+    run(adb_p.close())
+    assert not db.closed
+
+    run(adb.close())
+    assert db.closed
+    loop.close()
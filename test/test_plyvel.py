@@ -20,6 +20,9 @@ if sys.version_info < (3, 0):
     from future_builtins import zip
     range = xrange  # noqa: F821 (python 2 only)
 
+# Array typecodes for 64-bit integers; Python 2 has no 'Q' and 'q'.
+UINT64, INT64 = ('L', 'l') if sys.version_info < (3, 0) else ('Q', 'q')
+
 
 #
 # Fixtures
@@ -87,7 +90,7 @@ def test_open_many_options(db_dir):
         paranoid_checks=True, write_buffer_size=16 * 1024 * 1024,
         max_open_files=512, lru_cache_size=64 * 1024 * 1024,
         block_size=2 * 1024, block_restart_interval=32,
-        compression='snappy', bloom_filter_bits=10)
+        compression='snappy', bloom_filter_bits=10, reuse_logs=True)
 
 
 def test_invalid_open(db_dir):
@@ -162,6 +165,149 @@ def test_large_lru_cache(db_dir):
     plyvel.DB(db_dir, create_if_missing=True, lru_cache_size=2 * 1024**3)
 
 
+def test_shared_cache(db_dir):
+    cache = plyvel.Cache(4 * 1024**2)
+    assert cache.capacity == 4 * 1024**2
+    assert cache.usage == 0
+    assert 'plyvel.Cache' in repr(cache)
+
+    dbs = []
+    for i in range(3):
+        db = plyvel.DB(os.path.join(db_dir, str(i)), create_if_missing=True,
+                       block_cache=cache)
+        with db.write_batch() as wb:
+            for j in range(1000):
+                wb.put('{0:04d}'.format(j).encode('ascii'), b'x' * 100)
+        db.compact_range()
+        dbs.append(db)
+
+    for db in dbs:
+        assert len(list(db)) == 1000
+    assert 0 < cache.usage <= cache.capacity
+    cache.prune()
+
+    # Closing databases must leave the shared cache intact
+    dbs[0].close()
+    del dbs[0]
+    assert len(list(dbs[0])) == 1000
+    for db in dbs:
+        db.close()
+    del db, dbs
+    assert cache.usage >= 0
+
+    with pytest.raises(TypeError):
+        plyvel.DB(db_dir, block_cache=cache, lru_cache_size=1024)
+    with pytest.raises(TypeError):
+        plyvel.DB(db_dir, block_cache=1024)
+
+    plyvel.repair_db(os.path.join(db_dir, '1'), block_cache=cache)
+
+
+def test_shared_cache_gc(db_dir):
+    import gc
+
+    cache = plyvel.Cache(4 * 1024**2)
+    db1 = plyvel.DB(os.path.join(db_dir, '1'), create_if_missing=True,
+                    block_cache=cache)
+    db2 = plyvel.DB(os.path.join(db_dir, '2'), create_if_missing=True,
+                    block_cache=cache)
+    db2.put(b'k', b'v')
+    db2.compact_range()
+
+    # Collecting a database in a reference cycle must leave the shared
+    # cache intact for the other database.
+    cycle = [db1]
+    cycle.append(cycle)
+    del db1, cycle
+    gc.collect()
+    assert db2.get(b'k') == b'v'
+    db2.close()
+
+    # Not initialized
+    cache = plyvel.Cache.__new__(plyvel.Cache)
+    with pytest.raises(RuntimeError):
+        cache.usage
+    with pytest.raises(RuntimeError):
+        cache.prune()
+
+
+def test_env(db_dir):
+    env = plyvel.Env(background_threads=2)
+    assert env.background_threads == 2
+    assert env.rate_limit is None
+    assert 'plyvel.Env' in repr(env)
+
+    # Two databases sharing the environment, compacting concurrently
+    dbs = []
+    for i in range(2):
+        db = plyvel.DB(os.path.join(db_dir, str(i)), create_if_missing=True,
+                       env=env, compression=None)
+        with db.write_batch() as wb:
+            for j in range(1000):
+                wb.put('{0:04d}'.format(j).encode('ascii'), b'x' * 100)
+        dbs.append(db)
+    for db in dbs:
+        db.compact_range()
+    stats = env.stats()
+    assert stats['bytes_written'] > 2 * 100 * 1000
+    assert stats['throttled_us'] == 0
+
+    # Background I/O is throttled, and the rate limit can be changed
+    env.rate_limit = 1024 * 1024
+    assert env.rate_limit == 1024 * 1024
+    db = dbs[0]
+    with db.write_batch() as wb:
+        for j in range(1000):
+            wb.put('{0:04d}'.format(j).encode('ascii'), b'y' * 300)
+    db.compact_range()
+    assert env.stats()['throttled_us'] > 0
+    assert db.get(b'0000') == b'y' * 300
+    env.rate_limit = None
+
+    # Closing databases must leave the shared environment intact
+    for db in dbs:
+        db.close()
+    del db, dbs
+    db = plyvel.DB(os.path.join(db_dir, '0'), env=env)
+    assert db.get(b'0000') == b'y' * 300
+    db.close()
+
+    with pytest.raises(ValueError):
+        plyvel.Env(background_threads=0)
+    with pytest.raises(ValueError):
+        plyvel.Env(rate_limit=0)
+    with pytest.raises(TypeError):
+        plyvel.DB(db_dir, env=1024)
+
+    # Not initialized
+    env = plyvel.Env.__new__(plyvel.Env)
+    with pytest.raises(RuntimeError):
+        env.rate_limit
+    with pytest.raises(RuntimeError):
+        env.rate_limit = 1024
+    with pytest.raises(RuntimeError):
+        env.stats()
+    with pytest.raises(RuntimeError):
+        plyvel.DB(db_dir, env=env)
+
+
+def test_env_gc(db_dir):
+    import gc
+
+    # Collecting a database in a reference cycle must keep its (only)
+    # reference to the environment until the database is closed.
+    db = plyvel.DB(db_dir, create_if_missing=True,
+                   env=plyvel.Env(background_threads=2))
+    db.put(b'k', b'v')
+    cycle = [db]
+    cycle.append(cycle)
+    del db, cycle
+    gc.collect()
+    db = plyvel.DB(db_dir)
+    assert db.get(b'k') == b'v'
+    db.close()
+
+
 def test_put(db):
     db.put(b'foo', b'bar')
     db.put(b'foo', b'bar', sync=False)
@@ -200,6 +346,57 @@ def test_get(db):
     pytest.raises(TypeError, db.get, b'foo', b'default', True)
 
 
+def test_get_many(db):
+    db.put(b'a', b'1')
+    db.put(b'b', b'2')
+    assert db.get_many([]) == []
+    assert db.get_many([b'a', b'b']) == [b'1', b'2']
+    assert db.get_many([b'b', b'x', b'a']) == [b'2', None, b'1']
+    assert db.get_many([b'x'], b'default') == [b'default']
+    assert db.get_many([b'x'], default=b'default') == [b'default']
+    assert db.get_many(iter([b'a']), fill_cache=False) == [b'1']
+    assert db.get_many((b'a',), verify_checksums=True) == [b'1']
+
+    pytest.raises(TypeError, db.get_many, None)
+    pytest.raises(TypeError, db.get_many, [1])
+    pytest.raises(TypeError, db.get_many, ['a'])
+
+    sn = db.snapshot()
+    db.put(b'a', b'new')
+    assert sn.get_many([b'a', b'b']) == [b'1', b'2']
+    assert db.get_many([b'a', b'b']) == [b'new', b'2']
+    sn.close()
+    with pytest.raises(RuntimeError):
+        sn.get_many([b'a'])
+
+
+def test_get_view(db):
+    value = b'the-value' * 1000
+    db.put(b'key', value)
+
+    view = db.get_view(b'key')
+    assert isinstance(view, memoryview)
+    assert view.readonly
+    assert view == value
+    assert bytes(view[:9]) == b'the-value'
+    assert db.get_view(b'nope') is None
+    assert db.get_view(b'nope', b'x') == b'x'
+    assert db.get_view(b'nope', default=b'x') == b'x'
+
+    # The view does not depend on the database state
+    db.delete(b'key')
+    assert view.tobytes() == value
+
+    db.put(b'pkey', b'foo')
+    assert db.prefixed_db(b'p').get_view(b'key') == b'foo'
+    sn = db.snapshot()
+    db.delete(b'pkey')
+    assert sn.get_view(b'pkey') == b'foo'
+    assert db.prefixed_db(b'p').snapshot().get_view(b'key') is None
+
+    pytest.raises(TypeError, db.get_view, 'key')
+
+
 def test_delete(db):
     # Put and delete a key
     key = b'key-that-will-be-deleted'
@@ -264,6 +461,309 @@ def test_write_batch(db):
     batch.write()
 
 
+def test_value_cache(db):
+    assert db.value_cache_stats() is None
+    with pytest.raises(ValueError):
+        db.enable_value_cache(0)
+    with pytest.raises(ValueError):
+        db.enable_value_cache(10, ttl=0)
+
+    db.put(b'a', b'1')
+    db.enable_value_cache(2)
+    assert db.get(b'a') == b'1'
+    assert db.get(b'a') == b'1'
+    assert db.get(b'x') is None
+    assert db.get(b'x', b'default') == b'default'
+    stats = db.value_cache_stats()
+    assert stats['hits'] == 2
+    assert stats['misses'] == 2
+    assert stats['size'] == 2
+    assert stats['max_entries'] == 2
+    assert stats['ttl'] is None
+
+    # Writes through the same database invalidate entries
+    db.put(b'a', b'2')
+    db.put(b'x', b'3')
+    assert db.get(b'a') == b'2'
+    assert db.get(b'x') == b'3'
+    db.delete(b'a')
+    assert db.get(b'a') is None
+
+    with db.write_batch() as wb:
+        wb.put(b'a', b'4')
+        wb.delete(b'x')
+    assert db.get(b'a') == b'4'
+    assert db.get(b'x') is None
+
+    db_p = db.prefixed_db(b'p-')
+    assert db_p.get(b'a') is None
+    with db_p.write_batch() as wb:
+        wb.put_many([(b'a', b'5')])
+    assert db_p.get(b'a') == b'5'
+    import array
+    with db.write_batch() as wb:
+        wb.put_packed(array.array(UINT64, [0, 1]), b'a',
+                      array.array(UINT64, [0, 1]), b'6')
+    assert db.get(b'a') == b'6'
+
+    if sys.version_info >= (3,):
+        with db.async_writer() as writer:
+            writer.put(b'a', b'async').result()
+        assert db.get(b'a') == b'async'
+
+    writer = db.group_commit_writer(max_delay=0)
+    writer.put(b'a', b'7')
+    assert db.get(b'a') == b'7'
+
+    # Least recently used entries are evicted
+    db.value_cache_stats(reset=True)
+    db.get(b'x')
+    db.get(b'a')
+    db.get(b'y')
+    db.get(b'a')
+    stats = db.value_cache_stats(reset=True)
+    assert stats['size'] == 2
+    assert stats['evictions'] == 1
+    assert stats['hits'] == 2
+    assert db.value_cache_stats()['hits'] == 0
+
+    # Snapshots bypass the cache
+    sn = db.snapshot()
+    db.put(b'a', b'8')
+    assert sn.get(b'a') == b'7'
+    assert db.get(b'a') == b'8'
+
+    # Expiration
+    db.enable_value_cache(10, ttl=0.05)
+    assert db.get(b'a') == b'8'
+    assert db.get(b'a') == b'8'
+    time.sleep(0.1)
+    assert db.get(b'a') == b'8'
+    stats = db.value_cache_stats()
+    assert stats['hits'] == 1
+    assert stats['expirations'] == 1
+    assert stats['ttl'] == 0.05
+
+    db.disable_value_cache()
+    assert db.value_cache_stats() is None
+    assert db.get(b'a') == b'8'
+
+    # Hits are included in the operation statistics
+    db.enable_value_cache(10)
+    db.enable_stats()
+    for _ in range(5):
+        assert db.get(b'a') == b'8'
+    assert db.get(b'x') is None
+    assert db.get(b'x') is None
+    get_stats = db.stats()['get']
+    assert get_stats['calls'] == 7
+    assert get_stats['bytes'] == 5
+    assert get_stats['not_found'] == 2
+    assert db.value_cache_stats()['hits'] == 5
+    db.disable_stats()
+
+
+def test_write_batch_many(db):
+    import array
+
+    wb = db.write_batch()
+    wb.put_many([(b'a', b'1'), (b'b', bytearray(b'2'))])
+    wb.put_many((k, v) for k, v in [(b'c', memoryview(b'3'))])
+    wb.put_many({b'd': b'4'}.items())
+    wb.delete_many([b'b', b'x'])
+    wb.delete_many(iter([]))
+    wb.write()
+    assert list(db) == [(b'a', b'1'), (b'c', b'3'), (b'd', b'4')]
+
+    pytest.raises(TypeError, wb.put_many, [(b'a', None)])
+    pytest.raises(TypeError, wb.put_many, [('a', b'')])
+    pytest.raises(ValueError, wb.put_many, [b'a'])
+    pytest.raises(TypeError, wb.delete_many, [1])
+    pytest.raises(TypeError, wb.put_many, None)
+
+    # Prefixed databases
+    with db.prefixed_db(b'p-').write_batch() as wb:
+        wb.put_many([(b'a', b'5'), (b'b', b'6')])
+        wb.delete_many([b'a'])
+    assert db.get(b'p-a') is None
+    assert db.get(b'p-b') == b'6'
+
+    # Packed buffers, round-tripped from an iterator
+    key_offsets, keys, value_offsets, values = \
+        db.iterator().next_columns()
+    db_copy = db.prefixed_db(b'copy-')
+    with db_copy.write_batch() as wb:
+        wb.put_packed(key_offsets, keys, value_offsets, values)
+    assert list(db_copy) == [
+        (b'a', b'1'), (b'c', b'3'), (b'd', b'4'), (b'p-b', b'6')]
+
+    with db.write_batch() as wb:
+        wb.put_packed(
+            array.array(UINT64, [0]), b'', array.array(UINT64, [0]), b'')
+        wb.put_packed(
+            array.array(UINT64, [0, 1, 1]), bytearray(b'z'),
+            array.array(INT64, [0, 0, 3]), memoryview(b'abc'))
+    assert db.get(b'z') == b''
+    assert db.get(b'') == b'abc'
+
+    wb = db.write_batch()
+    Q = array.array
+    with pytest.raises(TypeError):
+        wb.put_packed(Q('I', [0, 1]), b'a', Q(UINT64, [0, 1]), b'b')
+    with pytest.raises(TypeError):
+        wb.put_packed([0, 1], b'a', Q(UINT64, [0, 1]), b'b')
+    with pytest.raises(ValueError):
+        wb.put_packed(Q(UINT64, []), b'', Q(UINT64, []), b'')
+    with pytest.raises(ValueError):
+        wb.put_packed(Q(UINT64, [0, 1]), b'a', Q(UINT64, [0, 1, 1]), b'b')
+    with pytest.raises(ValueError):
+        wb.put_packed(Q(UINT64, [1, 1]), b'a', Q(UINT64, [0, 1]), b'b')
+    with pytest.raises(ValueError):
+        wb.put_packed(Q(UINT64, [0, 2]), b'a', Q(UINT64, [0, 1]), b'b')
+    with pytest.raises(ValueError):
+        wb.put_packed(Q(UINT64, [0, 1, 0]), b'a', Q(UINT64, [0, 1, 1]), b'b')
+
+
+def test_group_commit_writer(db):
+    writer = db.group_commit_writer(max_delay=0.01, max_batch_size=1000)
+    assert 'GroupCommitWriter' in repr(writer)
+    assert writer.max_delay == 0.01
+    assert writer.max_batch_size == 1000
+
+    writer.put(b'a', b'1')
+    writer.put(b'b', bytearray(b'2'))
+    writer.delete(b'a')
+    assert db.get(b'a') is None
+    assert db.get(b'b') == b'2'
+
+    wb = db.prefixed_db(b'p-').write_batch()
+    wb.put(b'c', b'3')
+    wb.delete(b'd')
+    writer.write(wb)
+    assert db.get(b'p-c') == b'3'
+
+    # The batch is cleared after writing it
+    writer.write(wb)
+    assert db.get(b'p-c') == b'3'
+
+    with pytest.raises(TypeError):
+        writer.put('a', b'')
+    with pytest.raises(TypeError):
+        writer.write(None)
+    with pytest.raises(ValueError):
+        db.group_commit_writer(max_delay=-1)
+
+    # Concurrent writers
+    db.enable_stats()
+    writer = db.group_commit_writer(max_delay=0.05)
+    n_threads = 8
+    n_writes = 5
+
+    def work(i):
+        for j in range(n_writes):
+            writer.put(('t%d-%d' % (i, j)).encode('ascii'), b'x')
+
+    threads = [
+        threading.Thread(target=work, args=(i,)) for i in range(n_threads)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sum(1 for _ in db.iterator(prefix=b't')) == n_threads * n_writes
+    stats = db.stats()['write']
+    assert 0 < stats['count'] < n_threads * n_writes
+
+    # Closing the database waits for a write in progress; later
+    # writes fail cleanly.
+    errors = []
+
+    def work_until_closed(i):
+        try:
+            for j in range(1000):
+                writer.put(('c%d-%d' % (i, j)).encode('ascii'), b'x')
+        except RuntimeError as exc:
+            errors.append(exc)
+
+    writer = db.group_commit_writer(max_delay=0.001, sync=False)
+    threads = [
+        threading.Thread(target=work_until_closed, args=(i,))
+        for i in range(4)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.01)
+    db.close()
+    for thread in threads:
+        thread.join()
+    assert all('closed' in str(exc) for exc in errors)
+    with pytest.raises(RuntimeError):
+        writer.put(b'a', b'')
+
+
+@pytest.mark.skipif(sys.version_info < (3,), reason="requires Python 3")
+def test_async_writer(db):
+    with db.async_writer() as writer:
+        assert 'AsyncWriter' in repr(writer)
+        futures = [writer.put(b'a', b'1'), writer.put(b'b', b'2')]
+        futures.append(writer.delete(b'a'))
+        wb = db.prefixed_db(b'p-').write_batch()
+        wb.put(b'c', b'3')
+        futures.append(writer.write(wb))
+        for future in futures:
+            assert future.result(timeout=5) is None
+
+        writer.put(b'd', b'4')
+        writer.flush()
+        assert db.get(b'd') == b'4'
+
+        with pytest.raises(TypeError):
+            writer.put(None, b'')
+
+    assert writer.closed
+    assert db.get(b'a') is None
+    assert db.get(b'b') == b'2'
+    assert db.get(b'p-c') == b'3'
+    with pytest.raises(RuntimeError):
+        writer.put(b'a', b'')
+    writer.close()  # no-op
+
+    # Backpressure: the pending data never grows (much) beyond the limit.
+    writer = db.async_writer(max_pending_bytes=100)
+    assert writer.max_pending_bytes == 100
+    for i in range(1000):
+        writer.put(('key-%d' % i).encode('ascii'), b'x' * 10)
+        assert writer.pending_bytes < 100 + 20
+    writer.close()
+    assert writer.pending_bytes == 0
+    assert sum(1 for _ in db.iterator(prefix=b'key-')) == 1000
+
+    # An unclosed writer can be garbage collected (after writing its
+    # updates), which stops its thread.
+    import weakref
+    writer = db.async_writer()
+    future = writer.put(b'e', b'5')
+    ref = weakref.ref(writer)
+    del writer
+    assert future.result(timeout=5) is None
+    for _ in range(100):
+        if ref() is None:
+            break
+        time.sleep(0.01)
+    assert ref() is None
+    assert db.get(b'e') == b'5'
+
+    # Closing the database first writes all queued updates.
+    writer = db.async_writer()
+    futures = [writer.put(('q-%d' % i).encode('ascii'), b'x' * 100)
+               for i in range(1000)]
+    db.close()
+    assert writer.closed
+    assert all(f.done() and f.exception() is None for f in futures)
+    with pytest.raises(RuntimeError):
+        writer.put(b'a', b'')
+    writer.close()
+
+
 def test_write_batch_context_manager(db):
     key = b'batch-key'
     assert db.get(key) is None
@@ -327,6 +827,34 @@ def test_iterator_closing(db):
     pytest.raises(RuntimeError, next, it)
 
 
+def test_iterator_tracking(db_dir):
+    import gc
+    import weakref
+
+    db = plyvel.DB(db_dir, create_if_missing=True)
+    db.put(b'k', b'v')
+
+    # Open iterators are closed with the database, regardless of the
+    # order in which other iterators were closed or collected before.
+    iterators = [db.iterator() if i % 2 else db.raw_iterator()
+                 for i in range(10)]
+    for i in (0, 9, 4, 5):
+        iterators[i].close()
+    del iterators[7]
+    cycle = [db.iterator()]
+    cycle.append(cycle)
+    ref = weakref.ref(cycle[0])
+    del cycle
+    gc.collect()
+    assert ref() is None
+
+    db.close()
+    for it in iterators:
+        with pytest.raises(RuntimeError):
+            next(it) if isinstance(it, plyvel._plyvel.Iterator) else it.key()
+        it.close()
+
+
 def test_iterator_return(db):
     db.put(b'key', b'value')
 
@@ -733,6 +1261,242 @@ def test_iterator_prefix(db):
       prefix=b'a', include_start=False, include_stop=True)
 
 
+def test_iterator_chunks(db):
+    for i in range(100):
+        key = value = '{0:03d}'.format(i).encode('ascii')
+        db.put(b'a' + key, value)
+        db.put(b'b' + key, value)
+
+    def chunks(it, n):
+        out = []
+        while True:
+            chunk = it.next_chunk(n)
+            if not chunk:
+                return out
+            assert len(chunk) <= n
+            out.extend(chunk)
+
+    combinations = [
+        dict(),
+        dict(reverse=True),
+        dict(start=b'a050'),
+        dict(start=b'a050', include_start=False, reverse=True),
+        dict(stop=b'b010', include_stop=True),
+        dict(start=b'a090', stop=b'b010', reverse=True),
+        dict(prefix=b'b', include_value=False),
+        dict(prefix=b'a0', include_key=False),
+        dict(prefix=b'c'),
+    ]
+    for kwargs in combinations:
+        expected = list(db.iterator(**kwargs))
+        for n in (1, 7, 100, 1000):
+            assert chunks(db.iterator(**kwargs), n) == expected
+            chunked = list(db.iterator(chunk_size=n, **kwargs))
+            assert all(0 < len(chunk) <= n for chunk in chunked)
+            assert sum(chunked, []) == expected
+
+    # Chunks on prefixed databases and snapshots
+    db_b = db.prefixed_db(b'b')
+    expected = list(db_b.iterator(start=b'050'))
+    assert chunks(db_b.iterator(start=b'050'), 8) == expected
+    sn = db.snapshot()
+    db.delete(b'a000')
+    assert sn.iterator(chunk_size=2).next_chunk(2) == [
+        (b'a000', b'000'), (b'a001', b'001')]
+
+    # Chunks can be mixed with regular stepping
+    it = db.iterator(include_value=False)
+    assert next(it) == b'a001'
+    assert it.next_chunk(2) == [b'a002', b'a003']
+    assert next(it) == b'a004'
+    assert it.prev() == b'a004'
+    assert it.next_chunk(0) == []
+
+    with pytest.raises(ValueError):
+        db.iterator(chunk_size=0)
+
+    it.close()
+    with pytest.raises(RuntimeError):
+        it.next_chunk(1)
+
+
+def test_iterator_chunks_comparator(db_dir):
+    calls = [0]
+
+    def comparator(a, b):
+        calls[0] += 1
+        return (a > b) - (a < b)
+
+    db = plyvel.DB(db_dir, create_if_missing=True, comparator=comparator,
+                   comparator_name=b'CountingComparator')
+    with db.write_batch() as wb:
+        for i in range(1000):
+            key = '{0:04d}'.format(i).encode('ascii')
+            wb.put(b'a' + key, b'')
+            wb.put(b'b' + key, b'')
+
+    combinations = [
+        dict(start=b'a0100', stop=b'a0900'),
+        dict(start=b'a0100', stop=b'a0900', include_stop=True, reverse=True),
+        dict(start=b'a0100', include_start=False, reverse=True),
+        dict(stop=b'b0010'),
+        dict(prefix=b'b05'),
+        dict(prefix=b'b05', reverse=True),
+    ]
+    for kwargs in combinations:
+        expected = list(db.iterator(include_value=False, **kwargs))
+        for n in (1, 3, 100, 5000):
+            it = db.iterator(include_value=False, **kwargs)
+            chunks = []
+            while True:
+                chunk = it.next_chunk(n)
+                if not chunk:
+                    break
+                chunks.extend(chunk)
+            assert chunks == expected
+
+            # Chunks can be mixed with regular stepping
+            it = db.iterator(include_value=False, **kwargs)
+            chunk = it.next_chunk(n)
+            assert it.prev() == chunk[-1]
+            assert list(it) == expected[len(chunk) - 1:]
+
+        assert db.keys(**kwargs) == expected
+        if not kwargs.get('reverse'):
+            assert db.count(**kwargs) == len(expected)
+
+    # Chunks do not check the bounds for each single entry. Note that
+    # LevelDB itself also invokes the comparator while iterating.
+    for kwargs in combinations[:2]:
+        calls[0] = 0
+        n = len(list(db.iterator(**kwargs)))
+        calls_stepping = calls[0]
+        calls[0] = 0
+        assert len(db.iterator(**kwargs).next_chunk(n + 10)) == n
+        assert calls[0] < calls_stepping - n // 2
+
+    db.close()
+
+
+def test_iterator_columns(db):
+    import array
+    import struct
+
+    for i in range(100):
+        key = '{0:03d}'.format(i).encode('ascii')
+        db.put(key, struct.pack('<d', i / 2.0))
+
+    # Offsets and data for both keys and values
+    key_offsets, keys, value_offsets, values = \
+        db.iterator(start=b'010', stop=b'020').next_columns()
+    assert isinstance(key_offsets, array.array)
+    assert list(key_offsets) == list(range(0, 33, 3))
+    assert keys == b''.join(
+        '{0:03d}'.format(i).encode('ascii') for i in range(10, 20))
+    assert list(value_offsets) == list(range(0, 88, 8))
+    assert len(values) == 80
+    assert key_offsets.itemsize == 8
+
+    # Batches of a limited size, in reverse
+    it = db.iterator(reverse=True, include_key=False)
+    key_offsets, keys, value_offsets, values = it.next_columns(30)
+    assert key_offsets is None and keys is None
+    assert len(value_offsets) == 31
+    assert len(it.next_columns(60)[2]) == 61
+    assert len(it.next_columns(60)[2]) == 11
+    assert list(it.next_columns(60)[2]) == [0]
+
+    # Fixed-width values as a typed array
+    key_offsets, keys, value_offsets, values = db.iterator(
+        stop=b'004').next_columns(value_typecode='d')
+    assert value_offsets is None
+    assert isinstance(values, array.array)
+    assert list(values) == [0.0, 0.5, 1.0, 1.5]
+
+    db.put(b'999', b'odd')
+    with pytest.raises(ValueError):
+        db.iterator().next_columns(value_typecode='d')
+    with pytest.raises(TypeError):
+        db.iterator(include_value=False).next_columns(value_typecode='d')
+
+    # Prefixed databases
+    key_offsets, keys, value_offsets, values = db.prefixed_db(
+        b'09').iterator(include_value=False).next_columns()
+    assert keys == b'0123456789'
+    assert values is None
+
+
+def test_count_and_keys(db):
+    for i in range(2000):
+        db.put('{0:04d}'.format(i).encode('ascii'), b'')
+
+    assert db.count() == 2000
+    assert db.count(start=b'0100', stop=b'0200') == 100
+    assert db.count(start=b'0100', stop=b'0200', include_start=False,
+                    include_stop=True) == 100
+    assert db.count(prefix=b'01') == 100
+    assert db.count(start=b'9') == 0
+    with pytest.raises(TypeError):
+        db.count(prefix=b'01', start=b'0100')
+
+    keys = db.keys()
+    assert len(keys) == 2000
+    assert keys == list(db.iterator(include_value=False))
+    assert db.keys(prefix=b'019') == [
+        '{0:04d}'.format(i).encode('ascii') for i in range(190, 200)]
+    assert db.keys(reverse=True, stop=b'0003') == [b'0002', b'0001', b'0000']
+    assert db.keys(start=b'9') == []
+
+    # Prefixed databases and snapshots
+    db_01 = db.prefixed_db(b'01')
+    assert db_01.count() == 100
+    assert db_01.count(start=b'50') == 50
+    assert db_01.keys(stop=b'03') == [b'00', b'01', b'02']
+    with db.snapshot() as snapshot:
+        db.delete(b'0000')
+        assert snapshot.count() == 2000
+        assert db.count() == 1999
+        assert snapshot.keys(stop=b'0001') == [b'0000']
+        assert db.snapshot().keys(stop=b'0001') == []
+
+
+def test_delete_range(db):
+    for i in range(2000):
+        db.put('{0:04d}'.format(i).encode('ascii'), b'')
+
+    db.enable_value_cache(100)
+    assert db.get(b'0100') == b''
+
+    # Small batches, so that multiple batches are written
+    assert db.delete_range(b'0100', b'0200', max_batch_size=50) == 100
+    assert db.get(b'0100') is None
+    assert db.count() == 1900
+    assert db.keys(start=b'0098', stop=b'0202') == [
+        b'0098', b'0099', b'0200', b'0201']
+
+    assert db.delete_range(b'0100', b'0200') == 0
+    assert db.delete_range(start=b'0200', stop=b'0202', include_start=False,
+                           include_stop=True) == 2
+    assert db.delete_range(prefix=b'03', compact=True) == 100
+    assert db.count(start=b'0200', stop=b'0400') == 98
+
+    with pytest.raises(ValueError):
+        db.delete_range(max_batch_size=0)
+
+    # Prefixed databases
+    db_1 = db.prefixed_db(b'1')
+    assert db_1.delete_range(b'000', b'010') == 10
+    assert db_1.count() == 990
+    assert db_1.clear(sync=True) == 990
+    assert db_1.count() == 0
+    assert db.count() == 798
+
+    with db.snapshot() as snapshot:
+        assert db.delete_range() == 798
+        assert db.count() == 0
+        assert snapshot.count() == 798
+
+
 def test_snapshot(db):
     db.put(b'a', b'a')
     db.put(b'b', b'b')
@@ -804,6 +1568,90 @@ def test_property(db):
         assert isinstance(db.get_property(prop), bytes)
 
 
+def test_stats(db):
+    # Disabled by default
+    assert db.stats() is None
+    db.put(b'a', b'1')
+    db.reset_stats()
+    db.disable_stats()
+
+    db.enable_stats()
+    db.enable_stats()  # no-op
+    stats = db.stats()
+    assert stats['get']['count'] == 0
+    assert sum(stats['get']['latency_us']) == 0
+
+    db.put(b'a', b'123')
+    db.put(b'b', b'')
+    db.delete(b'b')
+    assert db.get(b'a') == b'123'
+    assert db.get(b'b') is None
+    assert db.get_view(b'a') == b'123'
+    assert db.prefixed_db(b'a').get(b'') == b'123'
+    assert db.get_many([b'a', b'x', b'y']) == [b'123', None, None]
+    with db.write_batch() as wb:
+        wb.put(b'c', b'4567')
+        wb.delete(b'd')
+    list(db.iterator())
+    db.iterator().next_chunk(10)
+
+    stats = db.stats(reset=True)
+    assert stats['put']['count'] == 2
+    assert stats['put']['bytes'] == 5
+    assert stats['delete']['count'] == 1
+    assert stats['get']['count'] == 4
+    assert stats['get']['not_found'] == 1
+    assert stats['get']['not_found_ratio'] == 0.25
+    assert stats['put']['not_found_ratio'] == 0.0
+    assert stats['get']['bytes'] == 9
+    assert stats['get']['calls'] == 4
+    assert sum(stats['get']['latency_us']) == 4
+    assert stats['get_many'] == dict(
+        stats['get_many'], count=3, not_found=2, bytes=3, calls=1)
+    assert stats['write']['count'] == 1
+    assert stats['write']['bytes'] == 6
+    assert stats['iterate']['count'] == 4
+    assert stats['iterate']['bytes'] == 2 * (4 + 5)
+    assert stats['cache']['memory_usage'] > 0
+    assert 'block_cache_usage' not in stats['cache']
+
+    assert db.stats()['get']['count'] == 0
+    assert db.stats()['cache']['memory_usage_delta'] == 0
+    db.get(b'a')
+    db.reset_stats()
+    assert db.stats()['get']['count'] == 0
+
+    db.disable_stats()
+    db.get(b'a')
+    assert db.stats() is None
+
+
+def test_stats_cache(db_dir):
+    db = plyvel.DB(db_dir, create_if_missing=True,
+                   lru_cache_size=1024 * 1024)
+    for i in range(1000):
+        db.put(('key-%04d' % i).encode('ascii'), b'x' * 100)
+    db.compact_range()
+
+    db.enable_stats()
+    stats = db.stats()['cache']
+    assert stats['block_cache_usage_delta'] == 0
+
+    # Reads from table files fill the block cache
+    for i in range(1000):
+        db.get(('key-%04d' % i).encode('ascii'))
+    stats = db.stats(reset=True)['cache']
+    assert stats['block_cache_usage'] > 0
+    assert stats['block_cache_usage_delta'] > 0
+    assert stats['memory_usage_delta'] > 0
+
+    # Cached blocks are not read again
+    for i in range(1000):
+        db.get(('key-%04d' % i).encode('ascii'))
+    assert db.stats()['cache']['block_cache_usage_delta'] == 0
+    db.close()
+
+
 def test_compaction(db):
     db.compact_range()
     db.compact_range(start=b'a', stop=b'b')
@@ -811,6 +1659,137 @@ def test_compaction(db):
     db.compact_range(stop=b'b')
 
 
+def test_level_info(db):
+    levels = db.level_info()
+    assert len(levels) == 7
+    assert levels[0] == {'level': 0, 'num_files': 0, 'size': 0, 'files': []}
+
+    # Keys with non-printable bytes and escape-like sequences
+    for i in range(1000):
+        db.put(b'\x00\\x41\xff' + '{0:04d}'.format(i).encode('ascii'),
+               b'x' * 100)
+    db.compact_range()
+
+    levels = db.level_info()
+    files = [f for level in levels for f in level['files']]
+    assert sum(level['num_files'] for level in levels) == len(files) > 0
+    assert sum(level['size'] for level in levels) == sum(
+        f['size'] for f in files) > 0
+    assert min(f['smallest_key'] for f in files) == b'\x00\\x41\xff0000'
+    assert max(f['largest_key'] for f in files) == b'\x00\\x41\xff0999'
+    for f in files:
+        assert f['number'] > 0
+        assert f['smallest_key'] <= f['largest_key']
+
+    # An escape sequence for a non-printable byte can also be literal key
+    # text; such keys are still reported exactly.
+    db.put(b'\\x01-literal', b'')
+    db.put(b'\x01-byte', b'')
+    db.compact_range()
+    levels = db.level_info()
+    files = [f for level in levels for f in level['files']]
+    assert min(f['smallest_key'] for f in files) == b'\x00\\x41\xff0000'
+    assert max(f['largest_key'] for f in files) == b'\\x01-literal'
+    assert db.level_info() == levels
+
+    stats = db.compaction_stats()
+    assert [level['level'] for level in stats] == list(range(7))
+    for level, level_stats in zip(levels, stats):
+        assert level_stats['num_files'] == level['num_files']
+        assert level_stats['size'] == level['size']
+        assert level_stats['time'] >= 0
+        assert level_stats['bytes_read'] >= 0
+        assert level_stats['bytes_written'] >= 0
+
+
+def test_compaction_scheduler(db_dir):
+    db = plyvel.DB(db_dir, create_if_missing=True, compression=None,
+                   write_buffer_size=256 * 1024)
+
+    def fill(value):
+        for i in range(0, 20000, 1000):
+            with db.write_batch() as wb:
+                for j in range(i, i + 1000):
+                    wb.put('{0:05d}'.format(j).encode('ascii'), value * 100)
+
+    def total_size():
+        return sum(level['size'] for level in db.level_info())
+
+    # Overwrite all data, so that half of the data on disk is garbage
+    fill(b'a')
+    db.compact_range()
+    fill(b'b')
+    size_before = total_size()
+
+    scheduler = db.compaction_scheduler(
+        min_garbage=1, max_duty_cycle=1, interval=0.01, paused=True)
+    assert scheduler.is_paused
+    assert 'paused' in repr(scheduler)
+    with pytest.raises(RuntimeError):
+        db.compaction_scheduler()
+
+    plan = scheduler.plan()
+    assert plan
+    assert plan[0]['garbage'] > 0
+    assert plan[0]['garbage'] >= plan[-1]['garbage']
+    assert plan[0]['start'] <= plan[0]['stop']
+    assert scheduler.stats()['slices'] == 0
+
+    scheduler.resume()
+    for _ in range(500):
+        if not scheduler.plan():
+            break
+        time.sleep(0.01)
+    scheduler.pause()
+    assert not scheduler.plan()
+    assert scheduler.stats()['slices'] > 0
+    assert total_size() < size_before
+    assert db.get(b'00000') == b'b' * 100
+
+    scheduler.close()
+    assert scheduler.closed
+    scheduler.close()
+
+    # Closing the database stops the scheduler
+    scheduler = db.compaction_scheduler(interval=0.01)
+    db.close()
+    assert scheduler.closed
+
+    # So does dropping an unclosed database with a scheduler
+    import gc
+    other = plyvel.DB(db_dir)
+    other.compaction_scheduler(paused=True)
+    del other
+    gc.collect()
+    plyvel.DB(db_dir).close()
+
+    with pytest.raises(ValueError):
+        plyvel.DB(db_dir).compaction_scheduler(max_duty_cycle=0)
+
+
+def test_compaction_scheduler_unflushed_delete_range(db_dir):
+    db = plyvel.DB(db_dir, create_if_missing=True, compression=None)
+    with db.write_batch() as wb:
+        for i in range(50000):
+            wb.put('{0:05d}'.format(i).encode('ascii'), b'x' * 100)
+    db.compact_range()
+    size_before = db.approximate_size(b'0', b'9')
+
+    # Deleted ranges are compacted on an idle database, even though the
+    # tombstones are still in the memtable.
+    scheduler = db.compaction_scheduler(min_garbage=1, interval=0.2)
+    db.delete_range(stop=b'30000')
+    for _ in range(500):
+        if scheduler.stats()['slices']:
+            break
+        time.sleep(0.01)
+    assert scheduler.stats()['slices'] > 0
+    assert db.approximate_size(b'0', b'9') < size_before * 0.6
+    assert db.get(b'29999') is None
+    assert db.get(b'30000') == b'x' * 100
+    db.close()
+
+
 def test_approximate_sizes(db_dir):
     # Write some data to a fresh database
     db = plyvel.DB(db_dir, create_if_missing=True, error_if_exists=True)
@@ -848,6 +1827,108 @@ def test_approximate_sizes(db_dir):
     assert len(db.approximate_sizes(*ranges)) == len(ranges)
 
 
+def test_parallel_scan(db_dir):
+    db = plyvel.DB(db_dir, create_if_missing=True)
+    with db.write_batch() as wb:
+        for i in range(20000):
+            wb.put('{0:05d}'.format(i).encode('ascii'), b'x' * 100)
+    db.compact_range()
+
+    # Default: per-partition lists of entries, in key order
+    partitions = db.parallel_scan(workers=4)
+    assert 1 < len(partitions) <= 4
+    assert sum(partitions, []) == list(db)
+
+    # Custom function, applied to an entry iterator for each partition
+    def count(it):
+        return sum(1 for _ in it)
+
+    assert sum(db.parallel_scan(workers=3, fn=count, ordered=False)) == 20000
+    assert sum(db.parallel_scan(workers=1, fn=count)) == 20000
+
+    # Range arguments
+    partitions = db.parallel_scan(
+        start=b'01000', stop=b'03000', workers=4, include_value=False)
+    assert sum(partitions, []) == list(
+        db.iterator(start=b'01000', stop=b'03000', include_value=False))
+    partitions = db.parallel_scan(prefix=b'123', workers=2)
+    assert len(sum(partitions, [])) == 100
+    with pytest.raises(TypeError):
+        db.parallel_scan(prefix=b'1', start=b'1')
+    with pytest.raises(ValueError):
+        db.parallel_scan(workers=0)
+
+    # The scan uses a snapshot taken before scanning starts
+    def count_and_write(it):
+        db.put(b'99999', b'')
+        return count(it)
+
+    assert sum(db.parallel_scan(workers=2, fn=count_and_write)) == 20000
+
+    db.close()
+    with pytest.raises(RuntimeError):
+        db.parallel_scan()
+
+    # Without size information (all data is still in the memtable), the
+    # range is split at evenly spaced keys.
+    db = plyvel.DB(os.path.join(db_dir, 'memtable'), create_if_missing=True)
+    for i in range(5000):
+        db.put('{0:05d}'.format(i).encode('ascii'), b'')
+    assert db.parallel_scan(workers=2, fn=count) == [2500, 2500]
+    assert db.parallel_scan(start=b'01000', workers=4, fn=count) == [
+        1000, 1000, 1000, 1000]
+    assert db.parallel_scan(start=b'04998', workers=4, fn=count) == [1, 1]
+    db.close()
+
+
+def test_process_pool_scanner(db):
+    for i in range(1000):
+        key = '{0:04d}'.format(i).encode('ascii')
+        db.put(key, key[::-1])
+
+    # Functions run in worker processes, so they must be picklable;
+    # builtins are used here. Results are per chunk, in key order.
+    with plyvel.ProcessPoolScanner(2, max_pending=2) as scanner:
+        assert scanner.processes == 2
+        chunks = list(scanner.scan(db, list, chunk_size=64))
+        assert len(chunks) == 16
+        assert sum(chunks, []) == list(db)
+
+        assert sum(scanner.scan(db, len, start=b'0100', stop=b'0200',
+                                chunk_size=7)) == 100
+        assert sum(scanner.scan(db, list, include_value=False), []) == (
+            db.keys())
+        assert sum(scanner.scan(db, list, prefix=b'012',
+                                include_key=False), []) == [
+            '012{0}'.format(i).encode('ascii')[::-1] for i in range(10)]
+        assert sum(scanner.scan(db.prefixed_db(b'099'), list), []) == [
+            ('{0}'.format(i).encode('ascii'),
+             '{0}990'.format(i).encode('ascii')) for i in range(10)]
+        assert list(scanner.scan(db.snapshot(), len)) == [1000]
+
+        # Raw mode passes the columnar buffers of Iterator.next_columns()
+        chunks = list(scanner.scan(db, tuple, raw=True, chunk_size=500))
+        assert len(chunks) == 2
+        key_offsets, key_data, value_offsets, value_data = chunks[1]
+        assert list(key_offsets[:3]) == [0, 4, 8]
+        assert key_data[:8] == b'05000501'
+
+        # Errors in workers are propagated
+        with pytest.raises(TypeError):
+            list(scanner.scan(db, int))
+
+        with pytest.raises(TypeError):
+            scanner.scan(db, list, include_key=False, include_value=False)
+        with pytest.raises(ValueError):
+            scanner.scan(db, list, chunk_size=0)
+
+    assert scanner.closed
+    with pytest.raises(RuntimeError):
+        scanner.scan(db, list)
+    with pytest.raises(ValueError):
+        plyvel.ProcessPoolScanner(0)
+
+
 def test_repair_db(db_dir):
     db = plyvel.DB(db_dir, create_if_missing=True)
     db.put(b'foo', b'bar')
@@ -859,6 +1940,57 @@ def test_repair_db(db_dir):
     assert db.get(b'foo') == b'bar'
 
 
+def test_bulk_load(db_dir):
+    def items(n):
+        for i in range(n):
+            yield ('{0:06d}'.format(i).encode('ascii'), b'x' * (i % 500))
+
+    # Small files, to make sure that multiple tables are written
+    name = os.path.join(db_dir, 'loaded')
+    plyvel.bulk_load(name, items(20000), max_file_size=64 * 1024,
+                     block_size=1024, bloom_filter_bits=10)
+    assert len([fn for fn in os.listdir(name) if fn.endswith('.ldb')]) > 1
+    db = plyvel.DB(name, bloom_filter_bits=10)
+    assert list(db) == list(items(20000))
+    assert db.get(b'012345') == b'x' * (12345 % 500)
+    assert db.get(b'0123456') is None
+    db.put(b'000000', b'updated')
+    db.put(b'999999', b'new')
+    assert db.get(b'000000') == b'updated'
+    assert db.get(b'999999') == b'new'
+    db.close()
+
+    # Existing databases (or other files) are not touched
+    with pytest.raises(plyvel.Error):
+        plyvel.bulk_load(name, [])
+
+    # Empty databases
+    name = os.path.join(db_dir, 'empty')
+    plyvel.bulk_load(name, iter([]))
+    db = plyvel.DB(name)
+    assert list(db) == []
+    db.close()
+
+    # Custom comparators
+    name = os.path.join(db_dir, 'reversed')
+    plyvel.bulk_load(name, [(b'b', b'2'), (b'a', bytearray(b'1'))],
+                     comparator='reverse-bytewise')
+    db = plyvel.DB(name, comparator='reverse-bytewise')
+    assert list(db) == [(b'b', b'2'), (b'a', b'1')]
+    db.close()
+
+    with pytest.raises(ValueError):
+        plyvel.bulk_load(os.path.join(db_dir, 'unsorted'),
+                         [(b'b', b''), (b'a', b'')])
+    with pytest.raises(ValueError):
+        plyvel.bulk_load(os.path.join(db_dir, 'duplicates'),
+                         [(b'a', b''), (b'a', b'')])
+    with pytest.raises(TypeError):
+        plyvel.bulk_load(os.path.join(db_dir, 'invalid'), [('a', b'')])
+    with pytest.raises(TypeError):
+        plyvel.bulk_load(os.path.join(db_dir, 'invalid2'), [(b'a', None)])
+
+
 def test_destroy_db(db_dir):
     db_dir = os.path.join(db_dir, 'subdir')
     db = plyvel.DB(db_dir, create_if_missing=True)
@@ -965,6 +2097,177 @@ def test_comparator(db_dir):
     assert actual == expected
 
 
+def test_comparator_key_shortening(db_dir):
+    calls = []
+
+    class Comparator(object):
+        def __call__(self, a, b):
+            return (a > b) - (a < b)
+
+        def find_shortest_separator(self, start, limit):
+            calls.append('separator')
+            # Shortest prefix of start that is still smaller than limit,
+            # with its last byte incremented.
+            a, b = bytearray(start), bytearray(limit)
+            for i in range(min(len(a), len(b))):
+                if a[i] != b[i]:
+                    if a[i] < 0xff and a[i] + 1 < b[i]:
+                        return bytes(a[:i] + bytearray([a[i] + 1]))
+                    break
+            return start
+
+        def find_short_successor(self, key):
+            calls.append('successor')
+            return b'\xff'
+
+    def bogus(*args):
+        calls.append('bogus')
+        return b''
+
+    keys = [('{0:05d}'.format(i) * 10).encode('ascii') for i in range(10000)]
+    for comparator in (Comparator(), Comparator()):
+        path = os.path.join(db_dir, str(len(calls)))
+        if calls:
+            # Invalid results must be ignored
+            comparator.find_shortest_separator = bogus
+            comparator.find_short_successor = bogus
+        db = plyvel.DB(path, create_if_missing=True, block_size=256,
+                       comparator=comparator, comparator_name=b'Py')
+        with db.write_batch() as wb:
+            for key in keys:
+                wb.put(key, b'')
+        db.compact_range()
+        assert calls
+        assert list(db.iterator(include_value=False)) == keys
+        for key in keys[::97]:
+            assert db.get(key) == b''
+            assert next(db.iterator(start=key, include_value=False)) == key
+        db.close()
+
+    assert 'bogus' in calls
+
+    # Native comparators use their own key shortening
+    path = os.path.join(db_dir, 'reverse')
+    db = plyvel.DB(path, create_if_missing=True, block_size=256,
+                   comparator='reverse-bytewise')
+    with db.write_batch() as wb:
+        for key in keys:
+            wb.put(key, b'')
+    db.compact_range()
+    assert list(db.iterator(include_value=False)) == keys[::-1]
+    for key in keys[::97]:
+        assert db.get(key) == b''
+        assert next(db.iterator(start=key, include_value=False)) == key
+    db.close()
+
+
+def test_native_comparators(db_dir):
+    def check(name, keys, expected, suffix=''):
+        path = os.path.join(db_dir, name + suffix)
+        db = plyvel.DB(path, create_if_missing=True, comparator=name)
+        with db.write_batch() as wb:
+            for key in keys:
+                wb.put(key, key)
+        assert list(db.iterator(include_value=False)) == expected
+        assert list(db.iterator(include_value=False, reverse=True)) == \
+            expected[::-1]
+        for key in keys:
+            assert db.get(key) == key
+        db.compact_range()
+        assert list(db.iterator(include_value=False)) == expected
+        db.close()
+
+        # The comparator name is stored in the database
+        with pytest.raises(plyvel.Error):
+            plyvel.DB(path)
+        db = plyvel.DB(path, comparator=name.encode('ascii'))
+        assert list(db.iterator(include_value=False)) == expected
+        db.close()
+
+    keys = [b'', b'a', b'ab', b'b', b'\x00', b'\xff']
+    check('reverse-bytewise', keys, sorted(keys, reverse=True))
+
+    keys = [b'\x01\x00', b'\x02', b'\x00\x02', b'', b'\x00', b'\xff',
+            b'\x00\x01\x00', b'\x01']
+    check('big-endian-uint', keys, [
+        b'', b'\x00', b'\x01', b'\x02', b'\x00\x02', b'\xff', b'\x01\x00',
+        b'\x00\x01\x00'])
+
+    keys = [b'bb', b'a', b'ccc', b'b', b'', b'aaaa']
+    check('length-prefixed', keys, [
+        b'', b'a', b'b', b'bb', b'ccc', b'aaaa'])
+
+    def encode(*elements):
+        return b''.join(bytearray([len(e)]) + e for e in elements)
+
+    keys = [
+        encode(b'b'),
+        encode(b'a', b'z'),
+        encode(b'ab'),
+        encode(b'a'),
+        encode(b'a', b''),
+        encode(),
+        b'\x05ab',  # malformed
+    ]
+    check('tuple', keys, [
+        encode(),
+        encode(b'a'),
+        encode(b'a', b''),
+        encode(b'a', b'z'),
+        encode(b'ab'),
+        encode(b'b'),
+        b'\x05ab',
+    ])
+
+    # Malformed parts (a truncated element, an overlong varint) sort after
+    # well-formed elements, so that mixed keys are ordered consistently.
+    check('tuple', [b'\x01b', b'\x02', b'\x02aa', b'\x01a\x05', b'\x80\x00',
+                    b'\x00'],
+          [b'\x00', b'\x01a\x05', b'\x02aa', b'\x01b', b'\x02', b'\x80\x00'],
+          suffix='-malformed')
+
+    def tuple_sort_key(key):
+        key = bytearray(key)
+        out = []
+        pos = 0
+        while pos < len(key):
+            length = shift = 0
+            end = pos
+            while end < len(key) and shift <= 28:
+                byte = key[end]
+                end += 1
+                length |= (byte & 127) << shift
+                if not byte & 128:
+                    break
+                shift += 7
+            else:
+                break
+            if (byte == 0 and shift > 0) or (shift == 28 and byte > 15):
+                break
+            if length > len(key) - end:
+                break
+            out.append((0, bytes(key[end:end + length])))
+            pos = end + length
+        if pos < len(key):
+            out.append((1, bytes(key[pos:])))
+        return out
+
+    random.seed(2)
+    alphabet = bytearray(b'\x00\x01\x02\x03ab\x80\x81')
+    keys = set(
+        bytes(bytearray(random.choice(alphabet)
+                        for _ in range(random.randrange(6))))
+        for _ in range(500))
+    check('tuple', list(keys), sorted(keys, key=tuple_sort_key),
+          suffix='-random')
+
+    with pytest.raises(ValueError):
+        plyvel.DB(db_dir, create_if_missing=True, comparator='does-not-exist')
+    with pytest.raises(TypeError):
+        plyvel.DB(db_dir, create_if_missing=True, comparator='tuple',
+                  comparator_name=b'tuple')
+
+
 def test_prefixed_db(db):
     for prefix in (b'a', b'b'):
         for i in range(1000):
@@ -988,6 +2291,8 @@ def test_prefixed_db(db):
     assert db_a.get(key, default=b'v') == b'v'
     db_a.put(key, b'foo')
     assert db.get(b'a123') == b'foo'
+    assert db_a.get_many([key, b'nope']) == [b'foo', None]
+    assert db_a.snapshot().get_many([key]) == [b'foo']
 
     # Iterators
     assert len(list(db_a)) == 1000
@@ -1100,6 +2405,97 @@ def test_raw_iterator(db):
         it.key()
 
 
+def test_raw_iterator_value_view(db):
+    db.put(b'a', b'foo')
+    db.put(b'b', b'bar')
+
+    it = db.raw_iterator()
+    it.seek_to_first()
+    view = it.value_view()
+    assert isinstance(view, memoryview)
+    assert view.readonly
+    assert view == b'foo'
+    assert it.value_view() == it.value()
+    del view
+
+    it.seek_to_last()
+    with pytest.raises(TypeError):
+        it.value_view()[0] = 1
+    it.next()
+    with pytest.raises(plyvel.IteratorInvalidError):
+        it.value_view()
+
+    # The iterator cannot move or close while views point into it
+    it.seek_to_first()
+    view = it.value_view()
+    sliced = view[1:]
+    view.release()
+    for method in (it.next, it.prev, it.seek_to_first, it.seek_to_last,
+                   it.close, db.close):
+        with pytest.raises(BufferError):
+            method()
+    with pytest.raises(BufferError):
+        it.seek(b'b')
+    with pytest.raises(BufferError):
+        it.seek_many([b'b'])
+    assert sliced == b'oo'
+    assert not db.closed
+    sliced.release()
+    it.next()
+    assert it.key() == b'b'
+    view = it.value_view()
+    del view
+    db.close()
+    with pytest.raises(RuntimeError):
+        it.value_view()
+
+
+def test_raw_iterator_seek_many(db):
+    for i in range(0, 1000, 2):
+        key = '{0:03d}'.format(i).encode('ascii')
+        db.put(key, key + b'-value')
+
+    def expected(target, n):
+        it = db.raw_iterator()
+        it.seek(target)
+        entries = []
+        while it.valid() and len(entries) < n:
+            entries.append(it.item())
+            it.next()
+        return entries
+
+    random.seed(1)
+    targets = sorted(
+        '{0:03d}'.format(random.randrange(1005)).encode('ascii')
+        for _ in range(300))
+    targets += [b'500', b'5001', b'', b'999x']  # unsorted tail
+
+    it = db.raw_iterator()
+    results = it.seek_many(targets)
+    assert len(results) == len(targets)
+    for target, result in zip(targets, results):
+        entries = expected(target, 1)
+        assert result == (entries[0] if entries else None)
+    assert it.seek_many([b'001', b'003']) == [
+        (b'002', b'002-value'), (b'004', b'004-value')]
+    assert it.seek_many([]) == []
+
+    for n in (2, 5):
+        results = it.seek_many(targets, n_per_target=n)
+        assert results == [expected(target, n) for target in targets]
+    assert it.seek_many([b'996', b'997'], n_per_target=3) == [
+        [(b'996', b'996-value'), (b'998', b'998-value')],
+        [(b'998', b'998-value')]]
+
+    with pytest.raises(TypeError):
+        it.seek_many([b'001', u'002'])
+    with pytest.raises(ValueError):
+        it.seek_many([b'001'], n_per_target=0)
+    it.close()
+    with pytest.raises(RuntimeError):
+        it.seek_many([b'001'])
+
+
 def test_raw_iterator_empty_db(db):
     it = db.raw_iterator()
     assert not it.valid()